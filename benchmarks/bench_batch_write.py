@@ -0,0 +1,69 @@
+"""
+Throughput of the batch operation against the in-process stand-in driver
+
+Compares one transaction per row (what per-statement create calls amount to)
+with UNWIND batches at a fixed size and with adaptive sizing under a
+transaction memory cap.
+
+Usage: python -m benchmarks.bench_batch_write [--rows N]
+"""
+import argparse
+import time
+
+from benchmarks.fake_neo4j import FakeDriver
+from tools.batch_writer import BatchWriter
+from tools.neo4j_connector import Neo4jConnectorTool
+
+TEMPLATE = "CREATE (p:Person {id: row.id, name: row.name})"
+
+
+def run_per_row(driver, rows):
+    writer = BatchWriter(TEMPLATE, rows, 1)
+    writer.sizing.maximum = 1
+    started = time.perf_counter()
+    with driver.session() as session:
+        writer.run(session)
+    return {"chunks": writer.chunks, "batch_size": 1, "batch_size_shrinks": 0, "retries": 0}, time.perf_counter() - started
+
+
+def run_case(tool, driver, rows, batch_size):
+    started = time.perf_counter()
+    response = None
+    for message in tool._execute_batch_operation(driver, "neo4j", TEMPLATE, rows, batch_size):
+        response = message.message.json_object
+    elapsed = time.perf_counter() - started
+    return response, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--commit-latency", type=float, default=0.002, help="simulated seconds per commit")
+    parser.add_argument("--row-cost", type=float, default=0.000002, help="simulated seconds per written row")
+    args = parser.parse_args()
+
+    tool = Neo4jConnectorTool.from_credentials({})
+    rows = [{"id": i, "name": f"person-{i}"} for i in range(args.rows)]
+    single_rows = rows[: max(args.rows // 20, 1)]
+
+    cases = [
+        ("one tx per row", single_rows, None, None),
+        ("adaptive from 1000", rows, 1000, None),
+        ("adaptive from 100", rows, 100, None),
+        ("adaptive, 3000-row tx cap", rows, 8000, 3000),
+    ]
+    for label, case_rows, batch_size, cap in cases:
+        driver = FakeDriver(lambda i: [], [], 0, commit_latency=args.commit_latency,
+                            write_cost_per_row=args.row_cost, max_rows_per_tx=cap)
+        if batch_size is None:
+            response, elapsed = run_per_row(driver, case_rows)
+        else:
+            response, elapsed = run_case(tool, driver, case_rows, batch_size)
+        print(f"{label:<28} rows={len(case_rows):<7} chunks={response['chunks']:<6} "
+              f"final batch_size={response['batch_size']:<6} shrinks={response['batch_size_shrinks']} "
+              f"retries={response['retries']} failed tx={driver.stats.queries - driver.stats.commits} "
+              f"rows/s={len(case_rows) / elapsed:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Peak memory of the export operation versus one JSON message
+
+The JSON read path holds every serialized row plus the response message;
+export streams rows from the cursor into gzip NDJSON chunks, so its peak
+memory stays roughly one chunk wide however many rows come back. When
+pyarrow is installed the arrow and parquet export formats are measured too.
+
+Usage: python -m benchmarks.bench_export [--rows N] [--chunk-bytes N]
+"""
+import argparse
+import json
+import os
+import time
+import tracemalloc
+
+from benchmarks.fake_neo4j import FakeDriver
+from tools.arrow_writer import ARROW_FORMATS, arrow_available
+from tools.neo4j_connector import Neo4jConnectorTool
+
+QUERY = "MATCH (p:Person) RETURN p.id, p.name, p.bio, p.score"
+
+
+def _row(index):
+    return [index, f"person-{index}", f"biography of person {index} " * 4, index * 0.5]
+
+
+def measure(messages):
+    tracemalloc.start()
+    started = time.perf_counter()
+    blobs = 0
+    blob_bytes = 0
+    rows = 0
+    for message in messages:
+        blob = getattr(message.message, "blob", None)
+        if blob is not None:
+            blobs += 1
+            blob_bytes += len(blob)
+        else:
+            rows = message.message.json_object["count"]
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"blobs": blobs, "blob_bytes": blob_bytes, "rows": rows, "elapsed_s": round(elapsed, 3), "peak_mib": round(peak / 2**20, 2)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--chunk-bytes", type=int, default=4 * 1024 * 1024)
+    args = parser.parse_args()
+    os.environ["NEO4J_EXPORT_CHUNK_BYTES"] = str(args.chunk_bytes)
+
+    tool = Neo4jConnectorTool.from_credentials({})
+    keys = ["p.id", "p.name", "p.bio", "p.score"]
+
+    for rows in (args.rows // 10, args.rows):
+        driver = FakeDriver(_row, keys, rows)
+        read = measure(tool._execute_read_operation(driver, "neo4j", QUERY, rows))
+        driver = FakeDriver(_row, keys, rows)
+        export = measure(tool._execute_export_operation(driver, "neo4j", QUERY, rows))
+        print(f"rows={rows:<8} json message: peak={read['peak_mib']:>8.2f} MiB  time={read['elapsed_s']}s")
+        print(f"{'':<13} export:       peak={export['peak_mib']:>8.2f} MiB  time={export['elapsed_s']}s  "
+              f"chunks={export['blobs']} gz={export['blob_bytes'] / 2**20:.2f} MiB rows={export['rows']}")
+        if not arrow_available():
+            continue
+        for output_format in ARROW_FORMATS:
+            driver = FakeDriver(_row, keys, rows)
+            export = measure(tool._execute_export_operation(driver, "neo4j", QUERY, rows, output_format))
+            print(f"{'':<13} {output_format + ':':<13} peak={export['peak_mib']:>8.2f} MiB  time={export['elapsed_s']}s  "
+                  f"chunks={export['blobs']} size={export['blob_bytes'] / 2**20:.2f} MiB rows={export['rows']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Latency of the fanout operation as the concurrency limit grows
+
+Every query pays a simulated network round-trip per PULL, so running them
+one after another (concurrency 1) costs the sum of the round-trips while the
+async engine overlaps them.
+
+Usage: python -m benchmarks.bench_fanout [--queries N] [--round-trip S]
+"""
+import argparse
+import time
+
+from benchmarks.fake_neo4j import FakeAsyncDriver
+from tools.async_engine import AsyncFanOutEngine
+from tools.neo4j_connector import Neo4jConnectorTool
+from tools.statement_pipeline import parse_statements
+
+
+def _row(index):
+    return [index, f"doc-{index}", index * 0.25]
+
+
+def run_case(tool, engine, statements, max_results, concurrency, repeat):
+    started = time.perf_counter()
+    response = None
+    for _ in range(repeat):
+        for message in tool._execute_fanout_operation(
+            engine, "neo4j://fake", "neo4j", "secret", "neo4j", statements, max_results, concurrency
+        ):
+            response = message.message.json_object
+    return response, (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=8)
+    parser.add_argument("--rows", type=int, default=200, help="rows each query could produce")
+    parser.add_argument("--max-results", type=int, default=50)
+    parser.add_argument("--round-trip", type=float, default=0.02, help="simulated seconds per PULL")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tool = Neo4jConnectorTool.from_credentials({})
+    driver = FakeAsyncDriver(_row, ["d.id", "d.title", "d.score"], args.rows, args.round_trip)
+    engine = AsyncFanOutEngine(driver_factory=lambda uri, username, password: driver)
+    statements = parse_statements([f"MATCH (d:Doc) WHERE d.topic = {i} RETURN d.id, d.title, d.score" for i in range(args.queries)])
+
+    print(f"{args.queries} queries, round-trip={args.round_trip * 1000:.0f} ms")
+    try:
+        for concurrency in (1, 2, 4, 8):
+            response, elapsed = run_case(tool, engine, statements, args.max_results, concurrency, args.repeat)
+            rows = sum(outcome["count"] for outcome in response["statements"])
+            print(f"concurrency={concurrency:<3} wall={elapsed * 1000:8.2f} ms  rows={rows}")
+    finally:
+        engine.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Compare the read path with and without limit pushdown
+
+Usage: python -m benchmarks.bench_limit_pushdown [--rows N] [--max-results N]
+"""
+import argparse
+import time
+
+from benchmarks.fake_neo4j import FakeDriver
+from tools.neo4j_connector import Neo4jConnectorTool
+
+
+def _row(index):
+    return [index, f"node-{index}", index * 0.5, [index, index + 1, index + 2]]
+
+
+def run_case(tool, driver, max_results, limit_pushdown, repeat):
+    driver.stats.reset()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for _message in tool._execute_read_operation(
+            driver, "neo4j", "MATCH (n) RETURN n.id, n.name, n.score, n.tags", max_results, limit_pushdown
+        ):
+            pass
+    elapsed = (time.perf_counter() - started) / repeat
+    return {
+        "rows_transferred": driver.stats.rows_transferred // repeat,
+        "pull_requests": driver.stats.pull_requests // repeat,
+        "wall_ms": round(elapsed * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50_000, help="rows the fake server could produce")
+    parser.add_argument("--max-results", type=int, default=100)
+    parser.add_argument("--round-trip", type=float, default=0.0005, help="simulated seconds per PULL")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    tool = Neo4jConnectorTool.from_credentials({})
+    driver = FakeDriver(_row, ["n.id", "n.name", "n.score", "n.tags"], args.rows, args.round_trip)
+
+    print(f"max_results={args.max_results}, server rows={args.rows}")
+    for label, pushdown in (("before (drain + discard)", False), ("after (limit pushdown)", True)):
+        stats = run_case(tool, driver, args.max_results, pushdown, args.repeat)
+        print(f"{label:<26} rows transferred={stats['rows_transferred']:<6} "
+              f"pulls={stats['pull_requests']:<3} wall={stats['wall_ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Microbenchmark for record serialization
+
+Compares the previous recursive isinstance-chain serializer against the
+table-driven engine on scalar-heavy, node-heavy and deeply nested records.
+
+Usage: python -m benchmarks.bench_serializer [--records N]
+"""
+import argparse
+import time
+import warnings
+
+from neo4j import Record
+from neo4j.graph import Graph, Node, Relationship
+from neo4j.time import Date, DateTime, Duration, Time
+
+from benchmarks.fake_neo4j import make_node, make_relationship
+from tools.serializer import Neo4jSerializer
+
+
+def legacy_serialize(value):
+    """
+    The recursive serializer this engine replaced, kept as a baseline
+    """
+    if isinstance(value, (DateTime, Date, Time)):
+        return value.iso_format()
+    elif isinstance(value, Duration):
+        return str(value)
+    elif isinstance(value, Node):
+        return {
+            "id": value.id,
+            "labels": list(value.labels),
+            "properties": {k: legacy_serialize(v) for k, v in value.items()},
+        }
+    elif isinstance(value, Relationship):
+        return {
+            "id": value.id,
+            "type": value.type,
+            "start_node": value.start_node.id if value.start_node else None,
+            "end_node": value.end_node.id if value.end_node else None,
+            "properties": {k: legacy_serialize(v) for k, v in value.items()},
+        }
+    elif isinstance(value, dict):
+        return {k: legacy_serialize(v) for k, v in value.items()}
+    elif isinstance(value, list):
+        return [legacy_serialize(item) for item in value]
+    else:
+        return value
+
+
+def legacy_record(record):
+    record_dict = dict(record)
+    return {k: legacy_serialize(v) for k, v in record_dict.items()}
+
+
+def scalar_records(count):
+    keys = [f"col_{i}" for i in range(20)]
+    return [
+        Record(zip(keys, [i, f"value-{i}", i * 1.5, i % 2 == 0, None] * 3 + [[1, 2, 3], ["a", "b"], i, "x", 0.1]))
+        for i in range(count)
+    ]
+
+
+def node_records(count):
+    graph = Graph()
+    records = []
+    for i in range(count):
+        a = make_node(graph, 2 * i, ("Person",), {"name": f"p{i}", "age": i, "born": Date(1990, 1, 1 + i % 28)})
+        b = make_node(graph, 2 * i + 1, ("Person", "Employee"), {"name": f"q{i}", "tags": ["x", "y"]})
+        r = make_relationship(graph, i, a, b, "KNOWS", {"since": DateTime(2020, 1, 1, 12, 0, 0)})
+        records.append(Record(zip(["a", "r", "b"], [a, r, b])))
+    return records
+
+
+def nested_records(count, depth=6):
+    def build(level, i):
+        if level == 0:
+            return [i, f"leaf-{i}", Duration(days=i % 7), Time(12, 30)]
+        return {"level": level, "children": [build(level - 1, i), build(level - 1, i + 1)]}
+
+    return [Record(zip(["tree"], [build(depth, i)])) for i in range(count)]
+
+
+def measure(function, records, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for record in records:
+            function(record)
+    elapsed = time.perf_counter() - started
+    return elapsed / (repeat * len(records)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore", DeprecationWarning)
+    engine = Neo4jSerializer()
+    cases = {
+        "scalar-heavy": scalar_records(args.records),
+        "node-heavy": node_records(args.records),
+        "deeply nested": nested_records(max(args.records // 10, 1)),
+    }
+    for name, records in cases.items():
+        assert [engine.serialize_record(r) for r in records] == [legacy_record(r) for r in records]
+        before = measure(legacy_record, records, args.repeat)
+        after = measure(engine.serialize_record, records, args.repeat)
+        print(f"{name:<14} legacy={before:8.2f} us/record  engine={after:8.2f} us/record  speedup={before / after:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Cold-start cost of the plugin: module import time and time to the first
+successful invocation
+
+Each run starts a fresh interpreter that imports ``dify_plugin``, then the
+provider and tool modules, then runs one ``query`` invocation against the
+stand-in driver. The neo4j driver is loaded lazily, so its import cost is
+reported separately and lands on the first invocation rather than on startup.
+
+Usage: python -m benchmarks.bench_startup [--runs N]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+_PROBE = r"""
+import json, sys, time
+started = time.perf_counter()
+import dify_plugin
+sdk_loaded = time.perf_counter()
+import provider.neo4j
+import tools.neo4j_connector
+modules_loaded = time.perf_counter()
+neo4j_at_import = "neo4j" in sys.modules
+import neo4j
+neo4j_loaded = time.perf_counter()
+
+from benchmarks.fake_neo4j import FakeDriver
+from tools.driver_registry import DriverRegistry, set_driver_registry
+driver = FakeDriver(lambda index: [index, f"name-{index}"], ["n.id", "n.name"], 10)
+set_driver_registry(DriverRegistry(driver_factory=lambda uri, username, password: driver))
+tool = tools.neo4j_connector.Neo4jConnectorTool.from_credentials(
+    {"uri": "bolt://startup:7687", "username": "neo4j", "password": "startup", "database": "neo4j"}
+)
+for message in tool._invoke({"operation_type": "query", "query": "MATCH (n) RETURN n.id, n.name"}):
+    assert message.message.json_object["status"] == "success"
+first_invocation = time.perf_counter()
+print(json.dumps({
+    "sdk_import_ms": (sdk_loaded - started) * 1000,
+    "plugin_import_ms": (modules_loaded - sdk_loaded) * 1000,
+    "neo4j_import_ms": (neo4j_loaded - modules_loaded) * 1000,
+    "first_invocation_ms": (first_invocation - neo4j_loaded) * 1000,
+    "ready_ms": (first_invocation - started) * 1000,
+    "neo4j_loaded_at_import": neo4j_at_import,
+}))
+"""
+
+FIELDS = ("sdk_import_ms", "plugin_import_ms", "neo4j_import_ms", "first_invocation_ms", "ready_ms", "process_ms")
+
+
+def run_once(root):
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE], cwd=root, capture_output=True, text=True, check=True,
+    )
+    elapsed = time.perf_counter() - started
+    # 插件 SDK 会向 stdout 打印日志，取最后一行 JSON
+    sample = json.loads(completed.stdout.strip().splitlines()[-1])
+    sample["process_ms"] = elapsed * 1000
+    return sample
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    # 第一次运行写入字节码缓存，不计入结果
+    run_once(root)
+    samples = [run_once(root) for _ in range(args.runs)]
+
+    print(f"{args.runs} cold starts (median ms)")
+    for field in FIELDS:
+        print(f"{field:<22} {statistics.median(sample[field] for sample in samples):9.1f}")
+    print(f"{'neo4j_loaded_at_import':<22} {any(sample['neo4j_loaded_at_import'] for sample in samples)!s:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""
+In-process stand-in for the Neo4j driver used by the offline benchmarks
+
+The fake server produces rows lazily, honours a trailing ``LIMIT n`` in the
+query text and ships records in ``fetch_size`` batches, counting every row
+that crosses the simulated wire.
+"""
+import asyncio
+import re
+import time
+
+from neo4j import Address, Bookmarks, Record, SummaryCounters
+from neo4j.exceptions import Neo4jError
+from neo4j.graph import Graph, Node
+
+_TRAILING_LIMIT = re.compile(r"\bLIMIT\s+(\d+)\s*;?\s*$", re.IGNORECASE)
+
+DEFAULT_FETCH_SIZE = 1000
+
+
+def make_node(graph: Graph, index: int, labels=("Person",), properties=None) -> Node:
+    """
+    Build a real ``neo4j.graph.Node`` without a server
+    """
+    return Node(graph, f"4:fake:{index}", index, labels, properties or {})
+
+
+def make_relationship(graph: Graph, index: int, start: Node, end: Node, rel_type="KNOWS", properties=None):
+    """
+    Build a real ``neo4j.graph.Relationship`` between two nodes
+    """
+    relationship = graph.relationship_type(rel_type)(graph, f"5:fake:{index}", index, properties or {})
+    relationship._start_node = start
+    relationship._end_node = end
+    return relationship
+
+
+class FakeStats:
+    def __init__(self):
+        self.rows_produced = 0
+        self.rows_transferred = 0
+        self.pull_requests = 0
+        self.queries = 0
+        self.explains = 0
+        self.commits = 0
+        self.retries = 0
+
+    def reset(self):
+        self.__init__()
+
+
+class FakeServerInfo:
+    def __init__(self, address=None):
+        self.address = address
+
+
+class FakeSummary:
+    def __init__(self, query_type="r", statistics=None, result_available_after=0, result_consumed_after=0, address=None, plan=None, profile=None):
+        self.query_type = query_type
+        self.plan = plan
+        self.profile = profile
+        self.server = FakeServerInfo(address)
+        self.counters = SummaryCounters(statistics or {})
+        self.result_available_after = result_available_after
+        self.result_consumed_after = result_consumed_after
+
+
+class FakeResult:
+    def __init__(self, server, query, parameters, fetch_size):
+        self._server = server
+        self._keys = server.keys
+        self._fetch_size = fetch_size if fetch_size and fetch_size > 0 else None
+        self._remaining = server.row_count(query)
+        self._available_after = server.plan(query)
+        self._statistics = server.statistics
+        batch = (parameters or {}).get("rows")
+        if isinstance(batch, list):
+            self._remaining = 0
+            self._statistics = server.write_rows(batch)
+        # EXPLAIN 只返回计划，不产生行；PROFILE 正常执行并附带计划
+        self._explain = query.startswith("EXPLAIN ")
+        self._profile = query.startswith("PROFILE ")
+        if self._explain:
+            self._remaining = 0
+            server.stats.explains += 1
+        self._next_index = 0
+        self._buffer = []
+
+    def keys(self):
+        return tuple(self._keys)
+
+    def _pull(self, wait=True):
+        stats = self._server.stats
+        stats.pull_requests += 1
+        if wait and self._server.round_trip:
+            time.sleep(self._server.round_trip)
+        batch = self._remaining if self._fetch_size is None else min(self._fetch_size, self._remaining)
+        for _ in range(batch):
+            values = self._server.row_factory(self._next_index)
+            self._buffer.append(Record(zip(self._keys, values)))
+            self._next_index += 1
+        self._remaining -= batch
+        stats.rows_produced += batch
+        stats.rows_transferred += batch
+
+    def __iter__(self):
+        while True:
+            if not self._buffer:
+                if not self._remaining:
+                    return
+                self._pull()
+            yield self._buffer.pop(0)
+
+    def consume(self):
+        # DISCARD：丢弃缓冲区，服务端不再产生剩余的行
+        self._buffer.clear()
+        self._remaining = 0
+        plan = self._server.plan_tree if self._explain or self._profile else None
+        return FakeSummary(
+            self._server.query_type, self._statistics, self._available_after, address=self._server.address,
+            plan=plan, profile=plan if self._profile else None,
+        )
+
+
+class FakeTransaction:
+    def __init__(self, session):
+        self._session = session
+
+    def run(self, query, parameters=None, **kwargs):
+        return self._session.run(query, parameters, **kwargs)
+
+    def commit(self):
+        server = self._session._server
+        if server.commit_latency:
+            time.sleep(server.commit_latency)
+        server.stats.commits += 1
+        server.bookmarks = [f"FB:fake:{server.stats.queries}"]
+
+    def rollback(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+class FakeSession:
+    def __init__(self, server, fetch_size=DEFAULT_FETCH_SIZE, **config):
+        self._server = server
+        self._fetch_size = fetch_size
+        self.config = config
+
+    def run(self, query, parameters=None, **kwargs):
+        self._server.stats.queries += 1
+        return FakeResult(self._server, query, parameters, self._fetch_size)
+
+    def execute_read(self, work, *args, **kwargs):
+        return work(FakeTransaction(self), *args, **kwargs)
+
+    def begin_transaction(self, **kwargs):
+        return FakeTransaction(self)
+
+    def execute_write(self, work, *args, **kwargs):
+        # 与真实驱动一样重放可重试的错误（真实驱动按时间窗口，这里按次数）
+        attempts = 0
+        while True:
+            tx = FakeTransaction(self)
+            try:
+                value = work(tx, *args, **kwargs)
+            except Neo4jError as e:
+                if not e.is_retryable() or attempts >= self._server.write_retries:
+                    raise
+                attempts += 1
+                self._server.stats.retries += 1
+                continue
+            tx.commit()
+            return value
+
+    def last_bookmarks(self):
+        return Bookmarks.from_raw_values(self._server.bookmarks)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class FakeDriver:
+    """
+    Minimal driver surface: ``session``, ``verify_connectivity`` and ``close``
+    """
+
+    def __init__(self, row_factory, keys, total_rows, round_trip=0.0,
+                 query_type="r", statistics=None, plan_time_ms=0,
+                 commit_latency=0.0, write_cost_per_row=0.0, max_rows_per_tx=None, plan_tree=None,
+                 write_retries=5):
+        self.row_factory = row_factory
+        self.keys = list(keys)
+        self.total_rows = total_rows
+        self.round_trip = round_trip
+        self.query_type = query_type
+        self.statistics = statistics or {}
+        self.stats = FakeStats()
+        # 模拟服务端的执行计划缓存：首次见到的查询文本需要规划
+        self.plan_time_ms = plan_time_ms
+        self._planned = set()
+        # 模拟写入：每次提交的固定延迟、每行的写入开销和事务内存上限
+        self.commit_latency = commit_latency
+        self.write_cost_per_row = write_cost_per_row
+        self.max_rows_per_tx = max_rows_per_tx
+        # execute_write 对可重试错误的重放次数
+        self.write_retries = write_retries
+        self.address = Address(("localhost", 7687))
+        # EXPLAIN/PROFILE 返回的计划树，与服务端元数据的格式相同
+        self.plan_tree = plan_tree
+        self.bookmarks = []
+
+    def row_count(self, query):
+        match = _TRAILING_LIMIT.search(query)
+        if match:
+            return min(self.total_rows, int(match.group(1)))
+        return self.total_rows
+
+    def plan(self, query):
+        if query in self._planned:
+            return 1
+        self._planned.add(query)
+        return 1 + self.plan_time_ms
+
+    def write_rows(self, rows):
+        if self.max_rows_per_tx is not None and len(rows) > self.max_rows_per_tx:
+            raise Neo4jError._hydrate_neo4j(
+                code="Neo.TransientError.General.MemoryPoolOutOfMemoryError",
+                message=f"transaction of {len(rows)} rows exceeded the memory pool",
+            )
+        if self.write_cost_per_row:
+            time.sleep(self.write_cost_per_row * len(rows))
+        self.stats.rows_produced += len(rows)
+        return {"nodes-created": len(rows), "properties-set": 2 * len(rows), "labels-added": len(rows)}
+
+    def session(self, **config):
+        return FakeSession(self, **config)
+
+    def verify_connectivity(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeAsyncResult:
+    def __init__(self, result):
+        self._result = result
+
+    async def keys(self):
+        return self._result.keys()
+
+    async def _records(self):
+        result = self._result
+        while True:
+            if not result._buffer:
+                if not result._remaining:
+                    return
+                # 异步等待网络往返，其他查询可以同时进行
+                if result._server.round_trip:
+                    await asyncio.sleep(result._server.round_trip)
+                result._pull(wait=False)
+            yield result._buffer.pop(0)
+
+    def __aiter__(self):
+        return self._records()
+
+    async def consume(self):
+        return self._result.consume()
+
+
+class FakeAsyncTransaction:
+    def __init__(self, session):
+        self._session = session
+
+    async def run(self, query, parameters=None, **kwargs):
+        return FakeAsyncResult(self._session.run(query, parameters, **kwargs))
+
+
+class FakeAsyncSession(FakeSession):
+    async def execute_read(self, work, *args, **kwargs):
+        return await work(FakeAsyncTransaction(self), *args, **kwargs)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+
+class FakeAsyncDriver(FakeDriver):
+    """
+    Async counterpart of ``FakeDriver`` for the fan-out engine
+    """
+
+    def session(self, **config):
+        return FakeAsyncSession(self, **config)
+
+    async def verify_connectivity(self):
+        pass
+
+    async def close(self):
+        pass
@@ -0,0 +1,192 @@
+"""
+End-to-end benchmark suite against the in-process stand-in driver
+
+Drives ``Neo4jConnectorTool._invoke`` for the read and write paths and the
+serializer on its own, for every synthetic workload, and reports throughput,
+latency percentiles and peak traced memory. Results are written as JSON so a
+later run can be compared against them; with ``--baseline`` the run exits
+non-zero when a scenario's median latency regressed beyond ``--threshold``.
+
+Usage: python -m benchmarks.run_benchmarks [--rows N] [--iterations N]
+           [--workloads scalars,nodes,...] [--output FILE] [--baseline FILE]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import warnings
+from datetime import datetime, timezone
+
+from neo4j import Record
+
+from benchmarks.fake_neo4j import FakeDriver
+from benchmarks.workloads import WORKLOADS
+from tools.driver_registry import DriverRegistry, set_driver_registry
+from tools.neo4j_connector import Neo4jConnectorTool
+from tools.serializer import Neo4jSerializer
+
+PATHS = ("read", "write", "serialize")
+CREDENTIALS = {"uri": "bolt://benchmark:7687", "username": "neo4j", "password": "benchmark", "database": "neo4j"}
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    position = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[position]
+
+
+def invoke(tool, parameters):
+    for message in tool._invoke(parameters):
+        payload = getattr(message.message, "json_object", None)
+        if payload is None:
+            raise RuntimeError(message.message.text)
+        return payload
+
+
+def make_case(path, keys, row_factory, args):
+    """
+    Return a zero-argument callable running one iteration of the scenario
+    """
+    if path == "serialize":
+        records = [Record(zip(keys, row_factory(i))) for i in range(args.rows)]
+        serializer = Neo4jSerializer()
+
+        def run():
+            return [serializer.serialize_record(record) for record in records]
+
+        return run
+
+    driver = FakeDriver(row_factory, keys, args.rows)
+    set_driver_registry(DriverRegistry(driver_factory=lambda uri, username, password: driver))
+    tool = Neo4jConnectorTool.from_credentials(CREDENTIALS)
+    if path == "read":
+        parameters = {"operation_type": "query", "query": "MATCH (n) RETURN n", "max_results": args.rows}
+    else:
+        parameters = {"operation_type": "create", "query": "CREATE (n:Bench) RETURN n"}
+
+    def run():
+        invoke(tool, parameters)
+
+    return run
+
+
+def measure(run, iterations, warmup):
+    for _ in range(warmup):
+        run()
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        began = time.perf_counter()
+        run()
+        samples.append(time.perf_counter() - began)
+    total = time.perf_counter() - started
+
+    # 单独一轮测内存，避免 tracemalloc 的开销影响耗时
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return samples, total, peak
+
+
+def run_suite(args):
+    results = {}
+    for name in args.workloads:
+        keys, row_factory = WORKLOADS[name](depth=args.depth, width=args.width)
+        for path in args.paths:
+            run = make_case(path, keys, row_factory, args)
+            samples, total, peak = measure(run, args.iterations, args.warmup)
+            results[f"{path}:{name}"] = {
+                "iterations": args.iterations,
+                "rows_per_iteration": args.rows,
+                "ops_per_second": round(args.iterations / total, 2),
+                "rows_per_second": round(args.iterations * args.rows / total, 1),
+                "latency_ms": {
+                    "p50": round(percentile(samples, 0.50) * 1000, 3),
+                    "p90": round(percentile(samples, 0.90) * 1000, 3),
+                    "p99": round(percentile(samples, 0.99) * 1000, 3),
+                    "max": round(max(samples) * 1000, 3),
+                },
+                "peak_memory_kib": round(peak / 1024, 1),
+            }
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Print the median-latency change per scenario; returns the regressed names
+    """
+    regressions = []
+    print(f"\n{'scenario':<24} {'baseline p50':>13} {'p50':>10} {'change':>8}")
+    for scenario, current in results.items():
+        previous = baseline.get(scenario)
+        if previous is None:
+            continue
+        before = previous["latency_ms"]["p50"]
+        after = current["latency_ms"]["p50"]
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(scenario)
+            flag = "  REGRESSION"
+        print(f"{scenario:<24} {before:>11.3f}ms {after:>8.3f}ms {change:>+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100, help="records returned per invocation")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--workloads", default=",".join(WORKLOADS), help="comma-separated subset of: " + ", ".join(WORKLOADS))
+    parser.add_argument("--paths", default=",".join(PATHS), help="comma-separated subset of: " + ", ".join(PATHS))
+    parser.add_argument("--width", type=int, default=8, help="properties or columns per entity")
+    parser.add_argument("--depth", type=int, default=5, help="nesting depth of the nested workload")
+    parser.add_argument("--trace-sample-rate", type=float, default=0.0, help="NEO4J_TRACE_SAMPLE_RATE during the run (0, the shipped default)")
+    parser.add_argument("--output", help="JSON results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed p50 slowdown before flagging, e.g. 0.10")
+    args = parser.parse_args()
+    args.workloads = [name.strip() for name in args.workloads.split(",") if name.strip()]
+    args.paths = [path.strip() for path in args.paths.split(",") if path.strip()]
+    unknown = [name for name in args.workloads if name not in WORKLOADS] + [path for path in args.paths if path not in PATHS]
+    if unknown:
+        parser.error(f"unknown workload or path: {', '.join(unknown)}")
+
+    warnings.simplefilter("ignore", DeprecationWarning)
+    os.environ["NEO4J_TRACE_SAMPLE_RATE"] = str(args.trace_sample_rate)
+    results = run_suite(args)
+
+    print(f"{'scenario':<24} {'ops/s':>9} {'rows/s':>11} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'peak KiB':>10}")
+    for scenario, stats in results.items():
+        latency = stats["latency_ms"]
+        print(f"{scenario:<24} {stats['ops_per_second']:>9.1f} {stats['rows_per_second']:>11.0f} "
+              f"{latency['p50']:>9.3f} {latency['p90']:>9.3f} {latency['p99']:>9.3f} {stats['peak_memory_kib']:>10.1f}")
+
+    output = args.output or os.path.join(
+        "benchmarks", "results", datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ") + ".json"
+    )
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    document = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {key: getattr(args, key) for key in ("rows", "iterations", "warmup", "width", "depth", "trace_sample_rate")},
+        "results": results,
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
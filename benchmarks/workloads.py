@@ -0,0 +1,97 @@
+"""
+Synthetic row factories for the stand-in driver
+
+Each workload returns ``(keys, row_factory)`` where ``row_factory(index)``
+builds the values of one record: plain scalars, temporals, nodes,
+relationships, paths or deeply nested maps and lists.
+"""
+from neo4j.graph import Graph, Path
+from neo4j.time import Date, DateTime, Duration, Time
+
+from benchmarks.fake_neo4j import make_node, make_relationship
+
+
+def scalars(width=8, **_):
+    keys = [f"c{i}" for i in range(width)]
+
+    def row(index):
+        return [(index, f"value-{index}", index * 0.5, index % 2 == 0)[column % 4] for column in range(width)]
+
+    return keys, row
+
+
+def temporals(width=4, **_):
+    keys = [f"t{i}" for i in range(width)]
+
+    def row(index):
+        values = (
+            DateTime(2024, 1 + index % 12, 1 + index % 28, 12, index % 60, 0),
+            Date(2020, 1 + index % 12, 1 + index % 28),
+            Time(8, index % 60, 30),
+            Duration(days=index % 30, seconds=index % 3600),
+        )
+        return [values[column % 4] for column in range(width)]
+
+    return keys, row
+
+
+def _properties(index, width, text_size):
+    return {f"p{i}": (f"{'x' * text_size}-{index}" if i % 2 else index + i) for i in range(width)}
+
+
+def nodes(width=8, text_size=32, **_):
+    graph = Graph()
+
+    def row(index):
+        return [make_node(graph, index, ("Person",), _properties(index, width, text_size))]
+
+    return ["n"], row
+
+
+def relationships(width=8, text_size=32, **_):
+    graph = Graph()
+
+    def row(index):
+        start = make_node(graph, 2 * index, ("Person",), _properties(index, width, text_size))
+        end = make_node(graph, 2 * index + 1, ("Company",), _properties(index, width, text_size))
+        relationship = make_relationship(graph, index, start, end, "WORKS_AT", {"since": Date(2020, 1, 1)})
+        return [start, relationship, end]
+
+    return ["a", "r", "b"], row
+
+
+def paths(length=4, width=4, text_size=16, **_):
+    graph = Graph()
+
+    def row(index):
+        base = index * (length + 1)
+        chain = [make_node(graph, base + i, ("Stop",), _properties(base + i, width, text_size)) for i in range(length + 1)]
+        hops = [
+            make_relationship(graph, base + i, chain[i], chain[i + 1], "NEXT", {"order": i})
+            for i in range(length)
+        ]
+        return [Path(chain[0], *hops)]
+
+    return ["path"], row
+
+
+def nested(depth=5, **_):
+    def build(level, index):
+        if level == 0:
+            return [index, f"leaf-{index}", Duration(days=index % 7), Time(12, 30)]
+        return {"level": level, "children": [build(level - 1, index), build(level - 1, index + 1)]}
+
+    def row(index):
+        return [build(depth, index)]
+
+    return ["tree"], row
+
+
+WORKLOADS = {
+    "scalars": scalars,
+    "temporals": temporals,
+    "nodes": nodes,
+    "relationships": relationships,
+    "paths": paths,
+    "nested": nested,
+}
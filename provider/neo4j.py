@@ -1,6 +1,6 @@
 from dify_plugin import ToolProvider
-from neo4j import GraphDatabase
-from neo4j.exceptions import ServiceUnavailable, AuthError
+
+from tools.driver_registry import get_driver_registry
 
 
 class Neo4jProvider(ToolProvider):
@@ -8,6 +8,9 @@ class Neo4jProvider(ToolProvider):
         """
         Validate Neo4j connection credentials
         """
+        # neo4j 在首次校验时才导入，插件启动时不加载 driver
+        from neo4j.exceptions import ServiceUnavailable, AuthError
+
         uri = credentials.get("uri")
         username = credentials.get("username")
         password = credentials.get("password")
@@ -17,10 +20,9 @@ class Neo4jProvider(ToolProvider):
             raise ValueError("Missing required credentials: uri, username, or password")
         
         try:
-            # Try to connect to Neo4j
-            driver = GraphDatabase.driver(uri, auth=(username, password))
-            driver.verify_connectivity()
-            driver.close()
+            # Try to connect to Neo4j and keep the verified driver pooled
+            # so the first tool invocation skips the handshake
+            get_driver_registry().warm(uri, username, password, database)
         except AuthError as e:
             raise ValueError(f"Authentication failed: Invalid username or password - {str(e)}")
         except ServiceUnavailable as e:
@@ -0,0 +1,72 @@
+import asyncio
+
+from tools.async_engine import AsyncFanOutEngine
+
+
+class StubAsyncDriver:
+    created = 0
+
+    def __init__(self):
+        StubAsyncDriver.created += 1
+        self.closed = False
+
+    async def verify_connectivity(self):
+        await asyncio.sleep(0.01)
+
+    async def close(self):
+        self.closed = True
+
+
+def make_engine(**kwargs):
+    StubAsyncDriver.created = 0
+    return AsyncFanOutEngine(driver_factory=lambda *args: StubAsyncDriver(), **kwargs)
+
+
+def test_concurrent_acquires_share_one_driver():
+    engine = make_engine()
+    key = ("bolt://a", "neo4j", "digest", "neo4j")
+
+    async def acquire_many():
+        return await asyncio.gather(*(engine._acquire(key, "bolt://a", "neo4j", "pw") for _ in range(5)))
+
+    try:
+        entries = engine._submit(acquire_many())
+        assert StubAsyncDriver.created == 1
+        assert len({id(entry) for entry in entries}) == 1
+        assert entries[0].in_use == 5
+    finally:
+        engine.close_all()
+
+
+def test_invalidate_waits_for_running_fan_out():
+    engine = make_engine()
+    key = ("bolt://a", "neo4j", "digest", "neo4j")
+
+    async def scenario():
+        entry = await engine._acquire(key, "bolt://a", "neo4j", "pw")
+        await engine._close(key)
+        still_open = not entry.driver.closed
+        await engine._release(entry)
+        return still_open, entry.driver.closed
+
+    try:
+        assert engine._submit(scenario()) == (True, True)
+    finally:
+        engine.close_all()
+
+
+def test_idle_drivers_are_evicted():
+    engine = make_engine(idle_timeout=60)
+
+    async def scenario():
+        idle = await engine._acquire(("a",), "bolt://a", "neo4j", "pw")
+        await engine._release(idle)
+        idle.last_used -= 120
+        busy = await engine._acquire(("b",), "bolt://b", "neo4j", "pw")
+        await engine._release(busy)
+        return idle.driver.closed, list(engine._drivers)
+
+    try:
+        assert engine._submit(scenario()) == (True, [("b",)])
+    finally:
+        engine.close_all()
@@ -0,0 +1,57 @@
+import pytest
+
+from tools.cypher_utils import apply_result_limit, tokenize
+from tools.parameterizer import auto_parameterize
+
+
+def test_parameterizes_plain_literals():
+    query, params = auto_parameterize("MATCH (n:Person) WHERE n.name = 'Ann' AND n.age > 30 RETURN n")
+    assert query == "MATCH (n:Person) WHERE n.name = $p0 AND n.age > $p1 RETURN n"
+    assert params == (("p0", "Ann"), ("p1", 30))
+
+
+@pytest.mark.parametrize("bounds", ["{1,3}", "{2}", "{,3}", "{1,}"])
+def test_keeps_quantified_path_pattern_bounds(bounds):
+    query = f"MATCH ((a)-[:R]->(b)){bounds} RETURN a"
+    assert auto_parameterize(query) == (query, ())
+
+
+def test_parameterizes_subquery_after_variable_scope():
+    query, params = auto_parameterize("CALL (n) { MATCH (n)-->(m) WHERE m.x = 3 RETURN m } RETURN m")
+    assert query == "CALL (n) { MATCH (n)-->(m) WHERE m.x = $p0 RETURN m } RETURN m"
+    assert params == (("p0", 3),)
+
+
+@pytest.mark.parametrize("selector", ["SHORTEST 2", "ANY 3", "SHORTEST 2 GROUPS"])
+def test_keeps_path_selector_counts(selector):
+    query, params = auto_parameterize(f"MATCH {selector} (a)-->+(b) WHERE a.x = 5 RETURN b")
+    assert query == f"MATCH {selector} (a)-->+(b) WHERE a.x = $p0 RETURN b"
+    assert params == (("p0", 5),)
+
+
+def test_keeps_field_terminator():
+    query, params = auto_parameterize("LOAD CSV FROM 'file:///x.csv' AS row FIELDTERMINATOR ';' RETURN row")
+    assert query == "LOAD CSV FROM $p0 AS row FIELDTERMINATOR ';' RETURN row"
+    assert params == (("p0", "file:///x.csv"),)
+
+
+def test_octal_literal_is_one_token():
+    assert [t.text for t in tokenize("RETURN 0o17")] == ["RETURN", "0o17"]
+    query, params = auto_parameterize("MATCH (n) WHERE n.x = 0o17 RETURN n")
+    assert query == "MATCH (n) WHERE n.x = $p0 RETURN n"
+    assert params == (("p0", 15),)
+
+
+def test_keeps_variable_length_bounds_and_projection():
+    query = "MATCH (a)-[*1..3]->(b) RETURN b.x + 1"
+    assert auto_parameterize(query) == (query, ())
+
+
+def test_apply_result_limit_appends_and_lowers():
+    assert apply_result_limit("MATCH (n) RETURN n", 10) == ("MATCH (n) RETURN n\nLIMIT 10", True)
+    assert apply_result_limit("MATCH (n) RETURN n LIMIT 50", 10)[0] == "MATCH (n) RETURN n LIMIT 10"
+    assert apply_result_limit("CREATE (n) RETURN n", 10) == ("CREATE (n) RETURN n", False)
+
+
+def test_apply_result_limit_leaves_insert_alone():
+    assert apply_result_limit("INSERT (n:Person) RETURN n", 10) == ("INSERT (n:Person) RETURN n", False)
@@ -0,0 +1,49 @@
+from tools.driver_registry import DriverRegistry
+
+
+class StubDriver:
+    def __init__(self):
+        self.closed = False
+
+    def verify_connectivity(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def make_registry(**kwargs):
+    return DriverRegistry(driver_factory=lambda *args: StubDriver(), **kwargs)
+
+
+def test_invalidate_defers_close_until_last_release():
+    registry = make_registry()
+    with registry.acquire("bolt://a", "neo4j", "pw") as first:
+        with registry.acquire("bolt://a", "neo4j", "pw") as shared:
+            assert shared is first
+            registry.invalidate("bolt://a", "neo4j", "pw")
+            assert len(registry) == 0
+        assert not first.closed
+        with registry.acquire("bolt://a", "neo4j", "pw") as replacement:
+            assert replacement is not first
+    assert first.closed
+    assert not replacement.closed
+
+
+def test_invalidate_closes_unused_driver_at_once():
+    registry = make_registry()
+    with registry.acquire("bolt://a", "neo4j", "pw") as driver:
+        pass
+    registry.invalidate("bolt://a", "neo4j", "pw")
+    assert driver.closed
+
+
+def test_release_evicts_idle_drivers():
+    registry = make_registry(idle_timeout=60)
+    with registry.acquire("bolt://a", "neo4j", "pw") as idle:
+        pass
+    with registry.acquire("bolt://b", "neo4j", "pw"):
+        registry._entries[registry.make_key("bolt://a", "neo4j", "pw", "neo4j")].last_used -= 120
+        assert not idle.closed
+    assert idle.closed
+    assert len(registry) == 1
@@ -0,0 +1,282 @@
+import functools
+import itertools
+import random
+
+import pytest
+
+from tools.cypher_utils import tokenize
+from tools.pagination import (
+    PAGE_ID_COLUMN,
+    PAGE_KEY_COLUMN,
+    decode_token,
+    encode_token,
+    key_kind,
+    next_state,
+    plan_page,
+    query_fingerprint,
+)
+
+# 内存中的“数据库”：每行是表达式文本到取值的映射，只解释分页改写生成的语句形状
+_CLAUSES = ("WHERE", "RETURN", "ORDER", "SKIP", "LIMIT")
+
+
+class _Expression:
+    def __init__(self, tokens, row, parameters):
+        self.tokens = tokens
+        self.index = 0
+        self.row = row
+        self.parameters = parameters
+
+    def _peek(self, offset=0):
+        index = self.index + offset
+        return self.tokens[index] if index < len(self.tokens) else None
+
+    def _take(self):
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def _accept(self, word):
+        token = self._peek()
+        if token is not None and token.upper == word:
+            self.index += 1
+            return True
+        return False
+
+    def parse(self):
+        value = self._or()
+        assert self.index == len(self.tokens), self.tokens[self.index:]
+        return value
+
+    def _or(self):
+        value = self._and()
+        while self._accept("OR"):
+            other = self._and()
+            value = True if value is True or other is True else (None if value is None or other is None else False)
+        return value
+
+    def _and(self):
+        value = self._comparison()
+        while self._accept("AND"):
+            other = self._comparison()
+            value = False if value is False or other is False else (None if value is None or other is None else True)
+        return value
+
+    def _comparison(self):
+        left = self._postfix()
+        token = self._peek()
+        if token is None or token.text not in ("=", "<", ">"):
+            return left
+        operator = self._take().text
+        if self._peek() is not None and self._peek().text in ("=", ">"):
+            operator += self._take().text
+        right = self._postfix()
+        if left is None or right is None or isinstance(left, str) != isinstance(right, str):
+            return None
+        return {
+            "=": left == right, "<>": left != right, "<": left < right,
+            ">": left > right, "<=": left <= right, ">=": left >= right,
+        }[operator]
+
+    def _postfix(self):
+        value = self._atom()
+        if self._accept("IS"):
+            negated = self._accept("NOT")
+            assert self._accept("NULL")
+            return (value is not None) if negated else (value is None)
+        return value
+
+    def _atom(self):
+        token = self._take()
+        if token.text == "(":
+            value = self._or()
+            assert self._take().text == ")"
+            return value
+        if token.kind == "param":
+            return self.parameters[token.text[1:]]
+        if token.kind == "number":
+            return int(token.text)
+        if token.kind == "string":
+            return token.text[1:-1]
+        text = token.text
+        while self._peek() is not None and self._peek().text in (".", "("):
+            if self._take().text == ".":
+                text += "." + self._take().text
+            else:
+                text += "(" + self._take().text + ")"
+                assert self._take().text == ")"
+        return self.row[text]
+
+
+def _evaluate(tokens, row, parameters):
+    return _Expression(tokens, row, parameters).parse()
+
+
+def _split(tokens):
+    items, current = [], []
+    for token in tokens:
+        if token.text == "," and token.depth == 0:
+            items.append(current)
+            current = []
+        else:
+            current.append(token)
+    return items + [current]
+
+
+def _compare(left, right):
+    # 升序时 null 排在最后
+    if left is None or right is None:
+        return (left is None) - (right is None)
+    return (left > right) - (left < right)
+
+
+def execute(statement, parameters, rows, seed):
+    """
+    Run a paging statement: WHERE, RETURN aliases, ORDER BY, SKIP and LIMIT
+
+    Rows are shuffled first, so ties that the ORDER BY leaves open come back
+    in a different order on every call, like a real planner is free to do.
+    """
+    tokens = [t for t in tokenize(statement)]
+    clause_at = {}
+    for index, token in enumerate(tokens):
+        if token.depth == 0 and token.upper in _CLAUSES and token.upper not in clause_at:
+            clause_at[token.upper] = index
+    bounds = sorted(clause_at.values()) + [len(tokens)]
+
+    def clause(name, skip=1):
+        start = clause_at[name]
+        return tokens[start + skip:bounds[bounds.index(start) + 1]]
+
+    selected = list(rows)
+    random.Random(seed).shuffle(selected)
+    if "WHERE" in clause_at:
+        selected = [row for row in selected if _evaluate(clause("WHERE"), row, parameters) is True]
+
+    aliases = {}
+    for item in _split(clause("RETURN")):
+        if len(item) > 2 and item[-2].upper == "AS":
+            aliases[item[-1].text] = item[:-2]
+
+    if "ORDER" in clause_at:
+        order = []
+        for item in _split(clause("ORDER", skip=2)):
+            descending = item[-1].upper == "DESC"
+            order.append((item[:-1] if descending else item, descending))
+
+        def compare(left, right):
+            for expression, descending in order:
+                result = _compare(_evaluate(expression, left, parameters), _evaluate(expression, right, parameters))
+                if result:
+                    return -result if descending else result
+            return 0
+
+        selected.sort(key=functools.cmp_to_key(compare))
+    if "SKIP" in clause_at:
+        selected = selected[_evaluate(clause("SKIP"), {}, parameters):]
+    if "LIMIT" in clause_at:
+        selected = selected[:_evaluate(clause("LIMIT"), {}, parameters)]
+    return [
+        {**row, **{alias: _evaluate(expression, row, parameters) for alias, expression in aliases.items()}}
+        for row in selected
+    ]
+
+
+def read_all_pages(query, rows, page_size):
+    """
+    Follow continuation tokens the way the connector does; returns the plans and every row read
+    """
+    fingerprint = query_fingerprint(query)
+    token = None
+    plans, read = [], []
+    for seed in itertools.count():
+        assert seed < 100, "pages do not terminate"
+        state = decode_token(token, fingerprint) if token else None
+        plan = plan_page(query, page_size, state)
+        result = execute(plan.query, plan.parameters, rows, seed)
+        page = result[:plan.take]
+        plans.append(plan)
+        read += page
+        if not (len(result) > plan.take and plan.has_more_possible and page):
+            return plans, read
+        last = page[-1]
+        keyset = plan.mode == "keyset"
+        key_kinds = {key_kind(row[PAGE_KEY_COLUMN]) for row in page} if keyset else set()
+        state = next_state(
+            plan, state, fingerprint, len(page),
+            last[PAGE_KEY_COLUMN] if keyset else None, last[PAGE_ID_COLUMN] if keyset else None, key_kinds,
+        )
+        token = encode_token(state)
+
+
+def visible(rows, columns):
+    return sorted(tuple(repr(row[column]) for column in columns) for row in rows)
+
+
+NAMES = ["Ann", "Ann", "Bob", "Cy", "Cy", "Cy", "Dee", "Eve"]
+PEOPLE = [
+    {"n.name": name, "n.age": 20 + 3 * index, "elementId(n)": f"4:db:{index:02d}"}
+    for index, name in enumerate(NAMES)
+]
+# 每个人认识后面的三个人，一个排序节点对应多行
+KNOWS = [
+    {**person, "m.name": friend["n.name"], "elementId(m)": friend["elementId(n)"]}
+    for index, person in enumerate(PEOPLE)
+    for friend in (PEOPLE[(index + step) % len(PEOPLE)] for step in (1, 2, 3))
+]
+UNWOUND = [{**person, "x": x} for person in PEOPLE for x in (1, 2)]
+
+
+@pytest.mark.parametrize("query, rows, columns, mode", [
+    ("MATCH (n:Person) RETURN n.name ORDER BY n.name", PEOPLE, ["elementId(n)"], "keyset"),
+    ("MATCH (n:Person) WHERE n.age > 22 RETURN n.name ORDER BY n.name DESC", PEOPLE[1:], ["elementId(n)"], "keyset"),
+    ("MATCH (n:Person) RETURN n.name", PEOPLE, ["elementId(n)"], "skip"),
+    ("MATCH (n:Person)-[:KNOWS]->(m:Person) RETURN n.name, m.name ORDER BY n.name", KNOWS, ["elementId(n)", "elementId(m)"], "skip"),
+    ("MATCH (n:Person)-[:KNOWS]->(m:Person) RETURN n.name, m.name", KNOWS, ["elementId(n)", "elementId(m)"], "skip"),
+    ("UNWIND [1, 2] AS x MATCH (n:Person) RETURN n.name, x ORDER BY n.name", UNWOUND, ["elementId(n)", "x"], "skip"),
+])
+@pytest.mark.parametrize("page_size", [1, 2, 3, 5])
+def test_pages_chain_to_the_full_result(query, rows, columns, mode, page_size):
+    plans, read = read_all_pages(query, rows, page_size)
+    assert plans[0].mode == mode
+    assert all(plan.deterministic for plan in plans)
+    assert visible(read, columns) == visible(rows, columns)
+
+
+def test_keyset_falls_back_to_skip_after_null_keys():
+    people = PEOPLE + [{"n.name": None, "n.age": 99, "elementId(n)": f"4:db:{index}"} for index in (90, 91, 92)]
+    plans, read = read_all_pages("MATCH (n:Person) RETURN n.name ORDER BY n.name", people, 3)
+    assert [plan.mode for plan in plans][0] == "keyset" and plans[-1].mode == "skip"
+    assert visible(read, ["elementId(n)"]) == visible(people, ["elementId(n)"])
+
+
+@pytest.mark.parametrize("query", [
+    "MATCH (n:Person)-[:KNOWS]->(m:Person) RETURN n.name, m.name ORDER BY n.name",
+    "UNWIND [1, 2] AS x MATCH (n:Person) RETURN n.name, x ORDER BY n.name",
+    "MATCH (n:Person) MATCH (m:Person) RETURN n.name ORDER BY n.name",
+    "MATCH (n:Person), (m:Person) RETURN n.name ORDER BY n.name",
+    "CALL db.labels() YIELD label MATCH (n) RETURN n.name ORDER BY n.name",
+])
+def test_multiplied_rows_never_use_keyset(query):
+    assert plan_page(query, 10).mode == "skip"
+
+
+@pytest.mark.parametrize("query", [
+    "MATCH p = (n)-->(m) RETURN p",
+    "MATCH (a)-[r:R*1..3]->(b) RETURN a, b",
+    "MATCH ((a)-->(b)){1,3} RETURN a",
+    "CALL db.labels() YIELD label RETURN label",
+    "MATCH (n) WITH n MATCH (n)-->(m) RETURN n, m",
+])
+def test_unknown_row_identity_is_not_deterministic(query):
+    assert not plan_page(query, 10).deterministic
+
+
+def test_decode_token_checks_the_fingerprint():
+    fingerprint = query_fingerprint("MATCH (n) RETURN n")
+    token = encode_token({"fp": fingerprint, "mode": "skip", "offset": 10})
+    assert decode_token(token, fingerprint)["offset"] == 10
+    with pytest.raises(ValueError):
+        decode_token(token, query_fingerprint("MATCH (m) RETURN m"))
+    with pytest.raises(ValueError):
+        decode_token("not a token", fingerprint)
@@ -0,0 +1,56 @@
+import pytest
+
+from tools.query_classifier import classify_tokens, own_transactions
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("MATCH (n) RETURN n", None),
+    ("CALL db.labels()", "procedure"),
+    ("MATCH (n) CALL (n) { SET n.x = 1 } IN TRANSACTIONS OF 10 ROWS", "in_transactions"),
+    ("CALL { MATCH (n) RETURN n } RETURN n", None),
+])
+def test_own_transactions(query, expected):
+    assert own_transactions(query) == expected
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("MATCH (n) RETURN n", "read"),
+    ("CREATE (n)", "write"),
+    ("CALL db.labels()", "unknown"),
+    ("MATCH (n) CALL (n) { DETACH DELETE n } IN TRANSACTIONS", "write"),
+])
+def test_classify_tokens(query, expected):
+    assert classify_tokens(query) == expected
+
+
+@pytest.mark.parametrize("query", [
+    "MATCH (start)-->(n) RETURN start",
+    "MATCH (n) RETURN n.name AS rename",
+    "WITH 1 AS stop RETURN stop",
+    "MATCH (grant:Person) RETURN grant",
+])
+def test_admin_words_as_variables_are_reads(query):
+    assert classify_tokens(query) == "read"
+
+
+@pytest.mark.parametrize("query", [
+    "DROP INDEX person_name",
+    "STOP DATABASE sales",
+    "USE system START DATABASE sales",
+    "CYPHER 25 GRANT ROLE reader TO alice",
+    "SHOW TRANSACTIONS YIELD transactionId WHERE transactionId = 'x' TERMINATE TRANSACTIONS transactionId",
+])
+def test_admin_commands_are_writes(query):
+    assert classify_tokens(query) == "write"
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("INSERT (n:Person {name: $x})", "write"),
+    ("MATCH (a) INSERT (a)-[:KNOWS]->(:Person)", "write"),
+    ("SHOW INDEXES", "read"),
+    ("USE neo4j MATCH (n) RETURN n", "read"),
+    ("UPSERT (n:Person)", "unknown"),
+    ("(n) RETURN n", "unknown"),
+])
+def test_unrecognized_leading_clauses_are_unknown(query, expected):
+    assert classify_tokens(query) == expected
@@ -0,0 +1,84 @@
+from neo4j.exceptions import Neo4jError
+
+from tools.statement_pipeline import StatementPipeline, parse_statements
+
+
+def make_error(code="Neo.ClientError.Statement.SyntaxError"):
+    return Neo4jError._hydrate_neo4j(code=code, message="boom")
+
+
+class StubCounters:
+    def __getattr__(self, name):
+        return 0
+
+
+class StubSummary:
+    query_type = "w"
+    counters = StubCounters()
+
+    class server:
+        address = None
+
+
+class StubResult:
+    def consume(self):
+        return StubSummary()
+
+
+class StubTransaction:
+    def __init__(self, failing_query):
+        self.failing_query = failing_query
+
+    def run(self, query, parameters):
+        if query == self.failing_query:
+            raise make_error()
+        return StubResult()
+
+
+class StubSession:
+    def __init__(self, failing_query=None, fail_commit=False):
+        self.failing_query = failing_query
+        self.fail_commit = fail_commit
+        self.attempts = 0
+
+    def execute_write(self, work, *args):
+        self.attempts += 1
+        value = work(StubTransaction(self.failing_query), *args)
+        if self.fail_commit:
+            raise make_error("Neo.ClientError.Schema.ConstraintValidationFailed")
+        return value
+
+    execute_read = execute_write
+
+
+def make_pipeline(stop_on_error):
+    statements = parse_statements([
+        {"query": "CREATE (a)", "operation": "create"},
+        {"query": "CREATE (b)", "operation": "create"},
+        {"query": "MATCH (n) RETURN n"},
+    ])
+    return StatementPipeline(statements, lambda result: {}, stop_on_error)
+
+
+def test_run_failure_is_blamed_on_the_statement():
+    pipeline = make_pipeline(stop_on_error=False)
+    assert not pipeline.run(StubSession(failing_query="CREATE (b)"))
+    statuses = [(outcome["status"], outcome.get("phase")) for outcome in pipeline.results()]
+    assert statuses == [("success", None), ("error", "run"), ("success", None)]
+
+
+def test_commit_failure_is_reported_against_the_whole_group():
+    pipeline = make_pipeline(stop_on_error=False)
+    session = StubSession(fail_commit=True)
+    assert not pipeline.run(session)
+    statuses = [(outcome["status"], outcome.get("phase")) for outcome in pipeline.results()]
+    assert statuses == [("error", "commit"), ("error", "commit"), ("error", "commit")]
+    # 提交失败的组不会去掉某条语句后重跑
+    assert session.attempts == 2
+
+
+def test_commit_failure_with_stop_on_error_skips_the_rest():
+    pipeline = make_pipeline(stop_on_error=True)
+    assert not pipeline.run(StubSession(fail_commit=True))
+    statuses = [outcome["status"] for outcome in pipeline.results()]
+    assert statuses == ["error", "error", "skipped"]
@@ -0,0 +1,184 @@
+import datetime
+import io
+import json
+
+from tools.driver_registry import env_number
+from tools.serializer import default_serializer
+
+ARROW_FORMATS = ("arrow", "parquet")
+ARROW_MIME_TYPES = {
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+_FORMAT_NAMES = {"arrow": "arrow-stream", "parquet": "parquet"}
+_EXTENSIONS = {"arrow": "arrows", "parquet": "parquet"}
+# 每个分块（一个 record batch）的行数，内存占用与该值同阶
+DEFAULT_EXPORT_BATCH_ROWS = 65536
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_EPOCH_UTC = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+_NS = 1_000_000_000
+# pyarrow 可以直接推断类型的值
+_INFERRED_TYPES = (bool, int, float, str, bytes, list)
+# Parquet 不支持 month_day_nano_interval，含月份的时长改用同样三个字段的结构体
+_INTERVAL_FIELDS = ("months", "days", "nanoseconds")
+
+
+def export_batch_rows() -> int:
+    return env_number("NEO4J_EXPORT_BATCH_ROWS", DEFAULT_EXPORT_BATCH_ROWS)
+
+
+def arrow_available() -> bool:
+    """
+    Whether the optional pyarrow dependency is installed
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _epoch_nanoseconds(value) -> int:
+    native = value.to_native()
+    if native.tzinfo is not None:
+        delta = native.astimezone(datetime.timezone.utc) - _EPOCH_UTC
+    else:
+        delta = native - _EPOCH
+    # to_native 只保留到微秒，纳秒部分单独补上
+    nanoseconds = getattr(value, "nanosecond", native.microsecond * 1000) % 1000
+    return (delta.days * 86400 + delta.seconds) * _NS + delta.microseconds * 1000 + nanoseconds
+
+
+def _json_column(pa, values):
+    strings = [
+        None if value is None else json.dumps(default_serializer.serialize(value), ensure_ascii=False, separators=(",", ":"))
+        for value in values
+    ]
+    return pa.array(strings, type=pa.string())
+
+
+def _temporal_column(pa, values, sample, intervals: bool):
+    from neo4j.time import Date, DateTime, Duration, Time
+
+    present = [value for value in values if value is not None]
+    if isinstance(sample, DateTime):
+        aware = sample.tzinfo is not None
+        if not all(isinstance(value, DateTime) and (value.tzinfo is not None) == aware for value in present):
+            return None
+        # 带时区的值统一换算为 UTC
+        data = [None if value is None else _epoch_nanoseconds(value) for value in values]
+        return pa.array(data, type=pa.timestamp("ns", tz="UTC" if aware else None))
+    if isinstance(sample, Date):
+        if not all(type(value) is Date for value in present):
+            return None
+        return pa.array([None if value is None else value.to_native() for value in values], type=pa.date32())
+    if isinstance(sample, Time):
+        if not all(isinstance(value, Time) for value in present):
+            return None
+        # 保留本地时钟时间，时区偏移不写入
+        return pa.array([None if value is None else value.ticks for value in values], type=pa.time64("ns"))
+    if isinstance(sample, Duration):
+        if not all(isinstance(value, Duration) for value in present):
+            return None
+        if any(value.months for value in present):
+            # 含月份的时长没有固定长度，使用日历区间类型
+            data = [None if value is None else (value.months, value.days, value.seconds * _NS + value.nanoseconds) for value in values]
+            if intervals:
+                return pa.array(data, type=pa.month_day_nano_interval())
+            data = [None if item is None else dict(zip(_INTERVAL_FIELDS, item)) for item in data]
+            return pa.array(data, type=pa.struct([(name, pa.int64()) for name in _INTERVAL_FIELDS]))
+        data = [None if value is None else (value.days * 86400 + value.seconds) * _NS + value.nanoseconds for value in values]
+        return pa.array(data, type=pa.duration("ns"))
+    return None
+
+
+def to_arrow_column(values, intervals: bool = True):
+    """
+    Typed Arrow array for one column of raw driver values
+
+    Primitives and lists of primitives keep their types, Neo4j temporals map
+    to timestamp, date32, time64 and duration (or month_day_nano_interval
+    when months are involved; a months/days/nanoseconds struct when
+    ``intervals`` is False). Anything else, or a column mixing kinds, is
+    stored as JSON text.
+    """
+    import pyarrow as pa
+
+    sample = next((value for value in values if value is not None), None)
+    if sample is None:
+        return pa.nulls(len(values))
+    if isinstance(sample, _INFERRED_TYPES):
+        try:
+            return pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError):
+            return _json_column(pa, values)
+    column = _temporal_column(pa, values, sample, intervals)
+    return column if column is not None else _json_column(pa, values)
+
+
+class ArrowChunkWriter:
+    """
+    Collect raw rows and cut them into typed Arrow record batches
+
+    Every chunk is a self-contained Arrow IPC stream or Parquet file holding
+    one record batch. Column types are inferred per chunk, so chunks can be
+    read independently; pyarrow's concat_tables with type promotion joins
+    them into one table. Only the current chunk is buffered.
+    """
+
+    def __init__(self, output_format: str, batch_rows: int | None = None):
+        self.output_format = output_format
+        self.format = _FORMAT_NAMES[output_format]
+        self.mime_type = ARROW_MIME_TYPES[output_format]
+        self.batch_rows = batch_rows or export_batch_rows()
+        self.columns = []
+        self.rows = 0
+        self.chunks = 0
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+        self._pending = []
+
+    def add(self, row) -> bytes | None:
+        """
+        Append one row of raw values; returns a finished chunk once batch_rows is reached
+        """
+        self._pending.append(row)
+        self.rows += 1
+        if len(self._pending) >= self.batch_rows:
+            return self._cut()
+        return None
+
+    def flush(self) -> bytes | None:
+        """
+        Return the last, partially filled chunk (None if it is empty)
+        """
+        if not self._pending:
+            return None
+        return self._cut()
+
+    def _cut(self) -> bytes:
+        import pyarrow as pa
+
+        rows = self._pending
+        self._pending = []
+        # 按列转置后逐列构建类型化数组
+        intervals = self.output_format != "parquet"
+        arrays = [to_arrow_column(list(values), intervals) for values in zip(*rows)]
+        batch = pa.RecordBatch.from_arrays(arrays, names=[str(column) for column in self.columns])
+        buffer = io.BytesIO()
+        if self.output_format == "parquet":
+            import pyarrow.parquet as pq
+
+            pq.write_table(pa.Table.from_batches([batch]), buffer)
+        else:
+            with pa.ipc.new_stream(buffer, batch.schema) as stream:
+                stream.write_batch(batch)
+        chunk = buffer.getvalue()
+        self.chunks += 1
+        self.raw_bytes += batch.nbytes
+        self.compressed_bytes += len(chunk)
+        return chunk
+
+    def chunk_name(self, prefix: str = "export") -> str:
+        return f"{prefix}-{self.chunks:05d}.{_EXTENSIONS[self.output_format]}"
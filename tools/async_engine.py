@@ -0,0 +1,234 @@
+import asyncio
+import atexit
+import threading
+import time
+
+from tools.driver_registry import DEFAULT_DRIVER_IDLE_TIMEOUT, DriverRegistry, env_number, get_driver_registry
+
+DEFAULT_MAX_CONCURRENCY = 8
+
+
+class _AsyncDriverEntry:
+    __slots__ = ("driver", "last_used", "in_use", "retired")
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.last_used = time.monotonic()
+        self.in_use = 0
+        # 已失效，最后一个 fan-out 结束时关闭
+        self.retired = False
+
+
+class AsyncFanOutEngine:
+    """
+    Run independent read queries concurrently on pooled ``AsyncGraphDatabase``
+    drivers
+
+    Async drivers are bound to the event loop that created them, so the engine
+    owns one background loop thread and keeps one async driver per credentials
+    on it; synchronous callers submit a fan-out to that loop and block until
+    the merged results are ready. Concurrent fan-outs for the same
+    credentials share one driver creation, and drivers idle for longer than
+    ``NEO4J_DRIVER_IDLE_TIMEOUT`` are closed like their synchronous
+    counterparts.
+    """
+
+    def __init__(self, max_concurrency: int | None = None, driver_factory=None, idle_timeout: float | None = None):
+        self.max_concurrency = max_concurrency or env_number(
+            "NEO4J_FANOUT_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY
+        )
+        self.idle_timeout = idle_timeout or env_number(
+            "NEO4J_DRIVER_IDLE_TIMEOUT", DEFAULT_DRIVER_IDLE_TIMEOUT, float
+        )
+        # driver_factory(uri, username, password) -> async driver
+        self._driver_factory = driver_factory or self._create_driver
+        # 只在事件循环线程中访问，无需加锁
+        self._drivers: dict[tuple, _AsyncDriverEntry] = {}
+        # 每个 key 一把锁，同一凭证的并发 fan-out 只创建一个 driver
+        self._creating: dict[tuple, asyncio.Lock] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _create_driver(uri: str, username: str, password: str):
+        # neo4j 在首次使用时才导入，缩短插件冷启动时间
+        from neo4j import AsyncGraphDatabase
+
+        registry = get_driver_registry()
+        return AsyncGraphDatabase.driver(
+            uri,
+            auth=(username, password),
+            max_connection_pool_size=registry.max_connection_pool_size,
+            max_connection_lifetime=registry.max_connection_lifetime,
+        )
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="neo4j-fanout", daemon=True).start()
+                self._loop = loop
+        return self._loop
+
+    def _submit(self, coroutine, timeout: float | None = None):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._ensure_loop()).result(timeout)
+
+    async def _acquire(self, key: tuple, uri: str, username: str, password: str) -> _AsyncDriverEntry:
+        entry = self._drivers.get(key)
+        if entry is None:
+            lock = self._creating.setdefault(key, asyncio.Lock())
+            async with lock:
+                # 等待期间其他 fan-out 可能已经创建好 driver
+                entry = self._drivers.get(key)
+                if entry is None:
+                    driver = self._driver_factory(uri, username, password)
+                    try:
+                        await driver.verify_connectivity()
+                    except Exception:
+                        await driver.close()
+                        raise
+                    entry = self._drivers[key] = _AsyncDriverEntry(driver)
+        entry.in_use += 1
+        return entry
+
+    async def _release(self, entry: _AsyncDriverEntry) -> None:
+        entry.in_use -= 1
+        entry.last_used = time.monotonic()
+        if entry.retired and entry.in_use == 0:
+            await self._close_driver(entry)
+        await self._evict_idle()
+
+    async def _evict_idle(self) -> int:
+        deadline = time.monotonic() - self.idle_timeout
+        expired = [key for key, entry in self._drivers.items() if entry.in_use == 0 and entry.last_used < deadline]
+        for key in expired:
+            self._creating.pop(key, None)
+            await self._close_driver(self._drivers.pop(key))
+        return len(expired)
+
+    @staticmethod
+    async def _close_driver(entry: _AsyncDriverEntry) -> None:
+        try:
+            await entry.driver.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    async def _collect(tx, statement: dict, max_results: int):
+        result = await tx.run(statement["query"], statement["parameters"])
+        keys = await result.keys()
+        records = []
+        truncated = False
+        async for record in result:
+            if len(records) >= max_results:
+                truncated = True
+                break
+            records.append(record)
+        # 未读完的结果发送 DISCARD
+        summary = await result.consume()
+        return keys, records, truncated, summary
+
+    async def _fan_out(self, key, uri, username, password, database, statements, max_results, on_complete, max_concurrency, bookmarks):
+        from neo4j.exceptions import AuthError, Neo4jError
+
+        await self._evict_idle()
+        entry = await self._acquire(key, uri, username, password)
+        driver = entry.driver
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run_one(statement):
+            async with semaphore:
+                try:
+                    async with driver.session(database=database, fetch_size=max_results + 1, bookmarks=bookmarks) as session:
+                        keys, records, truncated, summary = await session.execute_read(
+                            self._collect, statement, max_results
+                        )
+                except AuthError:
+                    raise
+                except Neo4jError as e:
+                    return {
+                        "index": statement["index"],
+                        "status": "error",
+                        "error": {"code": e.code, "message": e.message},
+                    }
+            # 每条查询完成时立即序列化，不等待其他查询
+            return on_complete(statement, keys, records, truncated, summary)
+
+        try:
+            # gather 按输入顺序返回结果
+            return list(await asyncio.gather(*(run_one(statement) for statement in statements)))
+        finally:
+            await self._release(entry)
+
+    def run(self, uri: str, username: str, password: str, database: str, statements: list[dict], max_results: int, on_complete, max_concurrency: int | None = None, bookmarks=None) -> list[dict]:
+        """
+        Run the read statements concurrently and return outcomes in input order
+
+        on_complete(statement, keys, records, truncated, summary) -> dict is
+        called on the loop thread as each statement finishes. A failing
+        statement yields an error outcome without cancelling the others;
+        authentication failures propagate to the caller. Bookmarks from an
+        earlier write make every read wait until that write is visible.
+        """
+        key = DriverRegistry.make_key(uri, username, password, database)
+        limit = max(int(max_concurrency or self.max_concurrency), 1)
+        return self._submit(self._fan_out(
+            key, uri, username, password, database, statements, int(max_results), on_complete, limit, bookmarks
+        ))
+
+    async def _close(self, key: tuple | None = None) -> None:
+        if key is None:
+            entries = list(self._drivers.values())
+            self._drivers.clear()
+            self._creating.clear()
+            for entry in entries:
+                await self._close_driver(entry)
+            return
+        entry = self._drivers.pop(key, None)
+        if entry is None:
+            return
+        entry.retired = True
+        if entry.in_use == 0:
+            await self._close_driver(entry)
+
+    def invalidate(self, uri: str, username: str, password: str, database: str = "neo4j") -> None:
+        """
+        Drop the async driver for the given credentials (e.g. after an auth failure)
+
+        Fan-outs still running on the driver finish first; it is closed when
+        the last of them completes.
+        """
+        if self._loop is None:
+            return
+        self._submit(self._close(DriverRegistry.make_key(uri, username, password, database)))
+
+    def close_all(self) -> None:
+        """
+        Close every async driver and stop the loop thread
+        """
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close(), loop).result(5)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+
+
+_engine: AsyncFanOutEngine | None = None
+_engine_lock = threading.Lock()
+
+
+def get_fanout_engine() -> AsyncFanOutEngine:
+    """
+    Return the process-wide fan-out engine, creating it on first use
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = AsyncFanOutEngine()
+                atexit.register(_engine.close_all)
+    return _engine
@@ -0,0 +1,176 @@
+import json
+import re
+import time
+
+from tools.driver_registry import env_number
+
+DEFAULT_BATCH_SIZE = 1000
+MIN_BATCH_SIZE = 1
+# 单个事务提交时间低于该阈值时增大批次
+DEFAULT_TARGET_COMMIT_SECONDS = 1.0
+# 无法再缩小批次时，同一分块的最大重试次数及首次重试前的等待
+DEFAULT_MAX_RETRIES = 3
+RETRY_DELAY_SECONDS = 0.2
+
+COUNTER_FIELDS = (
+    "nodes_created",
+    "nodes_deleted",
+    "relationships_created",
+    "relationships_deleted",
+    "properties_set",
+    "labels_added",
+    "labels_removed",
+)
+
+_UNWIND_PREFIX = re.compile(r"^\s*UNWIND\s+\$rows\s+AS\s+row\b", re.IGNORECASE)
+
+
+def parse_rows(raw) -> list:
+    """
+    Parse batch rows from a JSON array or an NDJSON stream
+    """
+    if isinstance(raw, list):
+        return raw
+    if raw is None or not str(raw).strip():
+        raise ValueError("rows must be a JSON array or NDJSON lines")
+    text = str(raw).strip()
+    if text.startswith("["):
+        try:
+            rows = json.loads(text)
+        except ValueError as e:
+            raise ValueError(f"rows is not a valid JSON array: {e}")
+        if not isinstance(rows, list):
+            raise ValueError("rows must be a JSON array")
+        return rows
+    rows = []
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            rows.append(json.loads(line))
+        except ValueError as e:
+            raise ValueError(f"rows line {line_number} is not valid JSON: {e}")
+    return rows
+
+
+def build_batch_statement(template: str) -> str:
+    """
+    Prefix the Cypher template with ``UNWIND $rows AS row`` unless it already has it
+    """
+    if _UNWIND_PREFIX.match(template):
+        return template
+    return f"UNWIND $rows AS row\n{template}"
+
+
+def is_shrinkable_error(error: Exception) -> bool:
+    """
+    Errors that a smaller transaction may avoid: transient and memory errors
+    """
+    from neo4j.exceptions import Neo4jError, TransientError
+
+    if isinstance(error, TransientError):
+        return True
+    return isinstance(error, Neo4jError) and "Memory" in (error.code or "")
+
+
+class AdaptiveBatchSize:
+    """
+    Batch size that halves on transient/memory errors and doubles while
+    commits stay under half the target time, never growing back to a size
+    that failed
+    """
+
+    def __init__(self, initial: int, maximum: int | None = None, target_seconds: float | None = None):
+        self.size = max(int(initial), MIN_BATCH_SIZE)
+        self.maximum = maximum or self.size * 16
+        self.target_seconds = target_seconds or env_number(
+            "NEO4J_BATCH_TARGET_COMMIT_SECONDS", DEFAULT_TARGET_COMMIT_SECONDS, float
+        )
+        self.shrinks = 0
+        self.grows = 0
+
+    def on_success(self, elapsed: float) -> None:
+        if elapsed < self.target_seconds / 2 and self.size < self.maximum:
+            self.size = min(self.size * 2, self.maximum)
+            self.grows += 1
+
+    def on_failure(self) -> bool:
+        """
+        Halve the size; returns False when it cannot shrink any further
+        """
+        if self.size <= MIN_BATCH_SIZE:
+            return False
+        self.size = max(self.size // 2, MIN_BATCH_SIZE)
+        # 不再增长到曾经失败的大小
+        self.maximum = self.size
+        self.shrinks += 1
+        return True
+
+
+class BatchWriter:
+    """
+    Run rows through ``UNWIND $rows AS row ...`` in chunks, one explicit
+    write transaction per chunk, aggregating the write counters
+
+    Retries are handled here rather than by ``execute_write``: the driver
+    would keep replaying an oversized chunk for its whole retry window before
+    the batch size could shrink.
+    """
+
+    def __init__(self, template: str, rows: list, batch_size: int = DEFAULT_BATCH_SIZE, on_commit=None):
+        self.statement = build_batch_statement(template)
+        self.rows = rows
+        self.sizing = AdaptiveBatchSize(batch_size)
+        self.on_commit = on_commit
+        self.counters = dict.fromkeys(COUNTER_FIELDS, 0)
+        self.rows_committed = 0
+        self.chunks = 0
+        self.max_retries = env_number("NEO4J_BATCH_MAX_RETRIES", DEFAULT_MAX_RETRIES)
+        self.retries = 0
+
+    def _write_chunk(self, session, chunk):
+        # 未提交就退出 with 块时事务回滚
+        with session.begin_transaction() as tx:
+            summary = tx.run(self.statement, {"rows": chunk}).consume()
+            tx.commit()
+        return summary
+
+    def run(self, session) -> None:
+        """
+        Write every row; raises the last error once a chunk can neither shrink
+        nor be retried
+
+        Transient and memory errors halve the batch size straight away. Other
+        retryable errors, or shrinkable ones at the minimum size, replay the
+        chunk up to ``max_retries`` times with a doubling delay. Chunks
+        committed before an error stay committed; ``rows_committed`` tells the
+        caller how far the import got.
+        """
+        from neo4j.exceptions import DriverError, Neo4jError
+
+        position = 0
+        attempts = 0
+        while position < len(self.rows):
+            chunk = self.rows[position:position + self.sizing.size]
+            started = time.perf_counter()
+            try:
+                summary = self._write_chunk(session, chunk)
+            except (Neo4jError, DriverError) as e:
+                if isinstance(e, Neo4jError) and is_shrinkable_error(e) and self.sizing.on_failure():
+                    continue
+                if not e.is_retryable() or attempts >= self.max_retries:
+                    raise
+                time.sleep(RETRY_DELAY_SECONDS * 2 ** attempts)
+                attempts += 1
+                self.retries += 1
+                continue
+            attempts = 0
+            self.sizing.on_success(time.perf_counter() - started)
+
+            for field in COUNTER_FIELDS:
+                self.counters[field] += getattr(summary.counters, field)
+            position += len(chunk)
+            self.rows_committed = position
+            self.chunks += 1
+            if self.on_commit is not None:
+                self.on_commit(summary)
@@ -0,0 +1,154 @@
+import json
+from itertools import islice
+
+# 近似换算：英文文本平均每个 token 约 4 字节
+APPROX_BYTES_PER_TOKEN = 4
+# 响应中最多列出的被截断字段数
+MAX_CLIPPED_REPORTED = 20
+CLIP_MARKER = "…"
+
+
+def budget_bytes(max_bytes, max_tokens) -> int | None:
+    """
+    Effective byte budget from max_bytes and/or an approximate max_tokens
+    """
+    limits = []
+    if max_bytes:
+        limits.append(int(max_bytes))
+    if max_tokens:
+        limits.append(int(max_tokens) * APPROX_BYTES_PER_TOKEN)
+    return min(limits) if limits else None
+
+
+def _encoded_size(value) -> int:
+    return len(json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8"))
+
+
+class ResultBudget:
+    """
+    Running size of the serialized result against an optional byte budget
+
+    Every row is measured once, right after it is serialized, so the stream
+    can stop at the first row that would overflow the budget instead of
+    serializing everything and trimming afterwards. Long strings can be
+    clipped to ``max_string_length`` characters before the row is measured.
+    """
+
+    def __init__(self, max_bytes: int | None = None, max_string_length: int | None = None):
+        self.max_bytes = max_bytes
+        self.max_string_length = max_string_length
+        self.columns = None
+        self.reset()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes is not None or self.max_string_length is not None
+
+    def reset(self) -> None:
+        """
+        Start over, e.g. when a transaction function is retried
+        """
+        self.bytes_used = 0
+        self.rows = 0
+        self.clipped = []
+        self.clipped_count = 0
+        self.stopped = None
+
+    def start(self, columns=None) -> None:
+        """
+        Reset for a (possibly retried) transaction; columns label columnar rows
+        """
+        self.columns = list(columns) if columns is not None else None
+        self.reset()
+
+    def _clip(self, value, path: str):
+        limit = self.max_string_length
+        if isinstance(value, str):
+            if len(value) <= limit:
+                return value
+            self.clipped_count += 1
+            if len(self.clipped) < MAX_CLIPPED_REPORTED:
+                self.clipped.append({"row": self.rows, "field": path, "length": len(value)})
+            return value[:limit] + CLIP_MARKER
+        if isinstance(value, dict):
+            for key, item in value.items():
+                clipped = self._clip(item, f"{path}.{key}" if path else str(key))
+                if clipped is not item:
+                    value[key] = clipped
+        elif isinstance(value, list):
+            for index, item in enumerate(value):
+                clipped = self._clip(item, f"{path}[{index}]")
+                if clipped is not item:
+                    value[index] = clipped
+        return value
+
+    def _clip_row(self, row):
+        if isinstance(row, list) and self.columns is not None:
+            # columnar 行按列名标注字段
+            for index, item in enumerate(row):
+                clipped = self._clip(item, str(self.columns[index]) if index < len(self.columns) else f"[{index}]")
+                if clipped is not item:
+                    row[index] = clipped
+            return row
+        return self._clip(row, "")
+
+    def admit(self, row, graph_tables: tuple | None = None, marks: tuple | None = None) -> bool:
+        """
+        Clip and measure one serialized row; False when it does not fit
+
+        In graph output the entities the row added to the node and
+        relationship tables (those past ``marks``) are counted with it and
+        removed again if the row is rejected.
+        """
+        if self.max_string_length is not None:
+            self._clip_row(row)
+        size = _encoded_size(row) + 1
+        added = []
+        if graph_tables is not None:
+            for name, table, mark in zip(("nodes", "relationships"), graph_tables, marks):
+                count = len(table) - mark
+                # dict 保持插入顺序，新增的实体都在末尾
+                for key, entity in islice(reversed(table.items()), count):
+                    if self.max_string_length is not None:
+                        self._clip(entity, f"{name}.{key}")
+                    size += _encoded_size(entity) + len(key) + 4
+                added.append((table, count))
+
+        if self.max_bytes is not None and self.bytes_used + size > self.max_bytes:
+            for table, count in added:
+                for _ in range(count):
+                    table.popitem()
+            self.stopped = {
+                "reason": "max_bytes",
+                "row": self.rows,
+                "row_bytes": size,
+                "bytes_used": self.bytes_used,
+                "max_bytes": self.max_bytes,
+            }
+            return False
+        self.bytes_used += size
+        self.rows += 1
+        return True
+
+    def report(self) -> dict:
+        """
+        Budget block for the response: bytes used and where/why it stopped
+        """
+        report = {"max_bytes": self.max_bytes, "bytes_used": self.bytes_used, "rows": self.rows}
+        if self.max_string_length is not None:
+            report["max_string_length"] = self.max_string_length
+            report["clipped_fields"] = self.clipped
+            report["clipped_count"] = self.clipped_count
+        if self.stopped is not None:
+            report["stopped"] = self.stopped
+        return report
+
+    def message(self) -> str | None:
+        if self.stopped is None:
+            return None
+        stopped = self.stopped
+        return (
+            f"Stopped before row {stopped['row']}: it needs {stopped['row_bytes']} bytes and "
+            f"{stopped['bytes_used']} of max_bytes {stopped['max_bytes']} are used. "
+            "Project fewer properties, set max_string_length or raise the budget to see more."
+        )
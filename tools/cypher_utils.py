@@ -0,0 +1,287 @@
+import re
+from typing import NamedTuple
+
+# 词法规则：字符串、反引号标识符、注释、数字、参数、标识符、符号
+_TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<ws>\s+)
+  | (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+  | (?P<quoted>`(?:[^`]|``)*`)
+  | (?P<number>0x[0-9a-fA-F]+|0o[0-7]+|(?:\d+\.\d+|\d+)(?:[eE][+-]?\d+)?)
+  | (?P<param>\$(?:\w+|`(?:[^`]|``)*`))
+  | (?P<word>[A-Za-z_][\w]*)
+  | (?P<symbol>.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+_OPENING = {"(": ")", "[": "]", "{": "}"}
+_CLOSING = {")", "]", "}"}
+
+# 可能修改数据的子句，出现时不改写查询
+WRITE_CLAUSES = frozenset({"CREATE", "INSERT", "MERGE", "SET", "DELETE", "DETACH", "REMOVE", "FOREACH", "LOAD"})
+
+
+class Token(NamedTuple):
+    kind: str
+    text: str
+    start: int
+    end: int
+    depth: int
+
+    @property
+    def upper(self) -> str:
+        return self.text.upper()
+
+
+def tokenize(query: str) -> list[Token]:
+    """
+    Split a Cypher statement into tokens, skipping whitespace and comments
+
+    Each token records its bracket nesting depth so callers can tell
+    top-level clauses from those inside subqueries, maps and lists.
+    """
+    tokens = []
+    depth = 0
+    for match in _TOKEN_PATTERN.finditer(query):
+        kind = match.lastgroup
+        if kind in ("ws", "comment"):
+            continue
+        text = match.group()
+        if kind == "symbol" and text in _CLOSING:
+            depth = max(depth - 1, 0)
+        tokens.append(Token(kind, text, match.start(), match.end(), depth))
+        if kind == "symbol" and text in _OPENING:
+            depth += 1
+    return tokens
+
+
+def keyword_tokens(tokens: list[Token]) -> list[Token]:
+    """
+    Keep word tokens that can be clause keywords
+
+    Labels and relationship types (``:Set``), property keys (``n.delete``)
+    and map keys (``{create: 1}``) are dropped.
+    """
+    keywords = []
+    for index, token in enumerate(tokens):
+        if token.kind != "word":
+            continue
+        if index > 0 and tokens[index - 1].text in (":", "."):
+            continue
+        if index + 1 < len(tokens) and tokens[index + 1].text == ":":
+            continue
+        keywords.append(token)
+    return keywords
+
+
+def strip_statement(query: str) -> str:
+    """
+    Remove surrounding whitespace and trailing semicolons
+    """
+    return query.strip().rstrip(";").rstrip()
+
+
+def apply_result_limit(query: str, limit: int) -> tuple[str, bool]:
+    """
+    Push a row limit down into a read query
+
+    Appends ``LIMIT <limit>`` to the final top-level RETURN, or lowers an
+    existing trailing integer LIMIT. Returns the original query unchanged
+    (and ``False``) whenever the rewrite cannot be proven safe: multiple
+    statements, EXPLAIN/PROFILE, UNION, write clauses, no top-level RETURN or
+    a LIMIT/SKIP expression that is not a plain integer.
+    """
+    statement = strip_statement(query)
+    tokens = tokenize(statement)
+    if not tokens:
+        return query, False
+
+    top_level = [t for t in tokens if t.depth == 0]
+    keywords = keyword_tokens(tokens)
+    if top_level[0].upper in ("EXPLAIN", "PROFILE"):
+        return query, False
+    if any(t.text == ";" for t in tokens):
+        return query, False
+    if any(t.depth == 0 and t.upper == "UNION" for t in keywords):
+        return query, False
+    if WRITE_CLAUSES.intersection(t.upper for t in keywords):
+        return query, False
+
+    return_index = None
+    for index, token in enumerate(top_level):
+        if token.kind == "word" and token.upper == "RETURN":
+            return_index = index
+    if return_index is None:
+        return query, False
+
+    tail = top_level[return_index + 1:]
+    limit_positions = [i for i, t in enumerate(tail) if t.kind == "word" and t.upper == "LIMIT"]
+    if not limit_positions:
+        # 换行追加，避免被末尾的行注释吞掉
+        return f"{statement}\nLIMIT {limit}", True
+
+    position = limit_positions[-1]
+    remaining = tail[position + 1:]
+    if len(remaining) != 1 or remaining[0].kind != "number" or not remaining[0].text.isdigit():
+        return query, False
+
+    existing = remaining[0]
+    if int(existing.text) <= limit:
+        return statement, True
+    return f"{statement[:existing.start]}{limit}{statement[existing.end:]}", True
+
+
+def quote_identifier(name: str) -> str:
+    """
+    Backtick-quote a label, relationship type or property key
+    """
+    return "`" + name.replace("`", "``") + "`"
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form of a statement for cache keys and fingerprints
+
+    Comments are dropped, whitespace runs collapse to one space and trailing
+    semicolons are removed. Case and token adjacency are preserved because
+    Neo4j derives column names from the verbatim projection text.
+    """
+    tokens = tokenize(strip_statement(query))
+    parts = []
+    previous_end = None
+    for token in tokens:
+        if previous_end is not None and token.start > previous_end:
+            parts.append(" ")
+        parts.append(token.text)
+        previous_end = token.end
+    return "".join(parts)
+
+
+# 出现在这些 token 之后的 "{" 是子查询而不是 map
+_SUBQUERY_OPENERS = frozenset({"CALL", "EXISTS", "COUNT", "COLLECT", ")"})
+
+
+def _label_expression(tokens: list[Token], index: int, labels: set) -> bool:
+    """
+    Collect the labels of a label expression starting after the colon at index
+
+    Returns False for dynamic or parenthesised label expressions.
+    """
+    position = index + 1
+    while position < len(tokens):
+        token = tokens[position]
+        if token.text == "!":
+            position += 1
+            continue
+        if token.kind == "word":
+            labels.add(token.text)
+        elif token.kind == "quoted":
+            labels.add(token.text[1:-1].replace("``", "`"))
+        else:
+            return False
+        following = tokens[position + 1] if position + 1 < len(tokens) else None
+        if following is None or following.text not in ("|", "&", ":"):
+            return True
+        position += 2
+    return True
+
+
+def pattern_labels(query: str) -> frozenset | None:
+    """
+    Labels and relationship types a statement can touch, if statically known
+
+    Returns ``None`` when the answer is unknown: a node pattern without a label
+    whose variable is not labelled elsewhere, a dynamic label, a procedure
+    call, or a statement with no labels at all.
+    """
+    tokens = tokenize(strip_statement(query))
+    labels = set()
+    labelled_variables = set()
+    unlabelled_variables = []
+    brackets = []
+    for index, token in enumerate(tokens):
+        previous = tokens[index - 1] if index > 0 else None
+        following = tokens[index + 1] if index + 1 < len(tokens) else None
+        if token.kind == "word" and token.upper == "CALL" and following is not None and following.text not in ("{", "("):
+            return None
+
+        if token.text == ")" and _starts_untyped_relationship(tokens, index):
+            return None
+        if token.text in _OPENING:
+            is_subquery = token.text == "{" and previous is not None and previous.upper in _SUBQUERY_OPENERS
+            brackets.append("subquery" if is_subquery else token.text)
+            if token.text == "(" and following is not None and _is_node_pattern_start(tokens, index):
+                if following.text in (")", "{"):
+                    return None
+                if following.kind in ("word", "quoted") and tokens[index + 2].text != ":":
+                    unlabelled_variables.append(following.text)
+            continue
+        if token.text in _CLOSING:
+            if brackets:
+                brackets.pop()
+            continue
+
+        if token.text != ":" or previous is None:
+            continue
+        # map 中的冒号是键值分隔符，而不是标签
+        if brackets and brackets[-1] == "{" and previous.kind in ("word", "quoted"):
+            continue
+        if previous.kind in ("word", "quoted"):
+            # 只有模式中的标签才能说明变量绑定的节点类型，SET n:Label 不算
+            if brackets and brackets[-1] in ("(", "["):
+                labelled_variables.add(previous.text)
+        elif previous.text not in ("(", "["):
+            continue
+        if not _label_expression(tokens, index, labels):
+            return None
+
+    if not labels:
+        return None
+    if any(variable not in labelled_variables for variable in unlabelled_variables):
+        return None
+    return frozenset(labels)
+
+
+def _starts_untyped_relationship(tokens: list[Token], index: int) -> bool:
+    """
+    Whether the ")" at index is followed by a relationship without a type
+    """
+    position = index + 1
+    while position < len(tokens) and tokens[position].text in ("-", "<", ">"):
+        position += 1
+    if position == index + 1 or position >= len(tokens):
+        return False
+    if tokens[position].text == "(":
+        return True
+    if tokens[position].text != "[":
+        return False
+    opening_depth = tokens[position].depth
+    for token in tokens[position + 1:]:
+        if token.text == "]" and token.depth == opening_depth:
+            return True
+        if token.text == ":" and token.depth == opening_depth + 1:
+            return False
+    return True
+
+
+def _is_node_pattern_start(tokens: list[Token], index: int) -> bool:
+    """
+    Whether the "(" at index opens a node pattern rather than an expression
+    """
+    previous = tokens[index - 1] if index > 0 else None
+    # 函数调用：名称紧跟 "("
+    if previous is not None and previous.kind in ("word", "quoted") and previous.upper not in _PATTERN_PREFIXES:
+        return False
+    following = tokens[index + 1:index + 3]
+    if not following:
+        return False
+    if following[0].text in (")", ":", "{"):
+        return True
+    if following[0].kind in ("word", "quoted") and len(following) > 1:
+        return following[1].text in (")", ":", "{") or following[1].upper == "WHERE"
+    return False
+
+
+_PATTERN_PREFIXES = frozenset({"MATCH", "MERGE", "CREATE", "OPTIONAL", "WHERE", "AND", "OR", "NOT", "XOR", "RETURN", "WITH", "DELETE"})
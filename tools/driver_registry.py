@@ -0,0 +1,250 @@
+import atexit
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# 连接池默认配置，可通过环境变量覆盖
+DEFAULT_MAX_CONNECTION_POOL_SIZE = 100
+DEFAULT_MAX_CONNECTION_LIFETIME = 3600.0
+DEFAULT_DRIVER_IDLE_TIMEOUT = 600.0
+
+
+def env_number(name: str, default, cast=int):
+    """
+    Read a numeric setting from the environment, falling back to the default
+    """
+    raw = os.environ.get(name)
+    if raw is None or not raw.strip():
+        return default
+    try:
+        return cast(raw)
+    except ValueError:
+        return default
+
+
+class _DriverEntry:
+    __slots__ = ("driver", "last_used", "in_use", "verified", "retired")
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.last_used = time.monotonic()
+        self.in_use = 0
+        self.verified = False
+        # 已从注册表移除，最后一个借用方归还时关闭
+        self.retired = False
+
+
+class DriverRegistry:
+    """
+    Thread-safe registry that keeps one pooled Neo4j driver alive per
+    (uri, username, password hash, database) across tool invocations
+
+    Invalidated drivers that are still borrowed are retired rather than
+    closed, and closed when their last lease is released. Idle drivers are
+    evicted whenever a driver is acquired or released.
+    """
+
+    def __init__(
+        self,
+        max_connection_pool_size: int | None = None,
+        max_connection_lifetime: float | None = None,
+        idle_timeout: float | None = None,
+        driver_factory=None,
+    ):
+        self.max_connection_pool_size = max_connection_pool_size or env_number(
+            "NEO4J_MAX_CONNECTION_POOL_SIZE", DEFAULT_MAX_CONNECTION_POOL_SIZE
+        )
+        self.max_connection_lifetime = max_connection_lifetime or env_number(
+            "NEO4J_MAX_CONNECTION_LIFETIME", DEFAULT_MAX_CONNECTION_LIFETIME, float
+        )
+        self.idle_timeout = idle_timeout or env_number(
+            "NEO4J_DRIVER_IDLE_TIMEOUT", DEFAULT_DRIVER_IDLE_TIMEOUT, float
+        )
+        # driver_factory(uri, username, password) -> driver，默认使用 GraphDatabase
+        self._driver_factory = driver_factory
+        self._entries: dict[tuple, _DriverEntry] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @staticmethod
+    def make_key(uri: str, username: str, password: str, database: str) -> tuple:
+        """
+        Build the registry key; the password is only kept as a digest
+        """
+        password_hash = hashlib.sha256((password or "").encode("utf-8")).hexdigest()
+        return (uri, username, password_hash, database)
+
+    def _create_driver(self, uri: str, username: str, password: str):
+        if self._driver_factory is not None:
+            return self._driver_factory(uri, username, password)
+        # neo4j 在首次创建 driver 时才导入，缩短插件冷启动时间
+        from neo4j import GraphDatabase
+
+        return GraphDatabase.driver(
+            uri,
+            auth=(username, password),
+            max_connection_pool_size=self.max_connection_pool_size,
+            max_connection_lifetime=self.max_connection_lifetime,
+        )
+
+    def _get_entry(self, key: tuple, uri: str, username: str, password: str, timer=None) -> _DriverEntry:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Driver registry has been shut down")
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.in_use += 1
+                return entry
+
+        # 在锁外创建 driver，避免阻塞其他连接
+        if timer is not None:
+            with timer.phase("driver_create"):
+                created = _DriverEntry(self._create_driver(uri, username, password))
+        else:
+            created = _DriverEntry(self._create_driver(uri, username, password))
+        with self._lock:
+            entry = self._entries.setdefault(key, created)
+            entry.in_use += 1
+        if entry is not created:
+            created.driver.close()
+        return entry
+
+    def _verify(self, key: tuple, entry: _DriverEntry, timer=None) -> None:
+        if entry.verified:
+            return
+        try:
+            if timer is not None:
+                with timer.phase("verify_connectivity"):
+                    entry.driver.verify_connectivity()
+            else:
+                entry.driver.verify_connectivity()
+        except Exception:
+            self._discard(key, entry)
+            raise
+        entry.verified = True
+
+    def _release(self, entry: _DriverEntry) -> None:
+        with self._lock:
+            entry.in_use -= 1
+            entry.last_used = time.monotonic()
+            close = entry.retired and entry.in_use == 0
+        if close:
+            entry.driver.close()
+        self.evict_idle()
+
+    def _retire(self, key: tuple, entry: _DriverEntry | None = None) -> None:
+        """
+        Remove the entry for key; close it now if unused, else on its last release
+        """
+        with self._lock:
+            current = self._entries.get(key)
+            if entry is None:
+                entry = current
+            if entry is None or entry.retired:
+                return
+            if current is entry:
+                del self._entries[key]
+            entry.retired = True
+            close = entry.in_use == 0
+        if close:
+            entry.driver.close()
+
+    def _discard(self, key: tuple, entry: _DriverEntry) -> None:
+        self._retire(key, entry)
+
+    @contextmanager
+    def acquire(self, uri: str, username: str, password: str, database: str = "neo4j", timer=None):
+        """
+        Borrow the pooled driver for the given credentials
+
+        Connectivity is verified only when the driver is first created, so
+        repeated invocations skip the handshake and auth round-trip. An
+        optional PhaseTimer records driver creation and verification.
+        """
+        self.evict_idle()
+        key = self.make_key(uri, username, password, database)
+        entry = self._get_entry(key, uri, username, password, timer)
+        try:
+            self._verify(key, entry, timer)
+            yield entry.driver
+        finally:
+            self._release(entry)
+
+    def warm(self, uri: str, username: str, password: str, database: str = "neo4j") -> None:
+        """
+        Create and verify the driver ahead of the first tool invocation
+        """
+        with self.acquire(uri, username, password, database):
+            pass
+
+    def invalidate(self, uri: str, username: str, password: str, database: str = "neo4j") -> None:
+        """
+        Drop the driver for the given credentials (e.g. after an auth failure)
+
+        Invocations still holding the driver keep using it; it is closed when
+        the last of them releases it.
+        """
+        self._retire(self.make_key(uri, username, password, database))
+
+    def evict_idle(self) -> int:
+        """
+        Close drivers that have not been used for longer than idle_timeout
+        """
+        deadline = time.monotonic() - self.idle_timeout
+        with self._lock:
+            expired = [
+                key for key, entry in self._entries.items()
+                if entry.in_use == 0 and entry.last_used < deadline
+            ]
+            evicted = [self._entries.pop(key) for key in expired]
+        for entry in evicted:
+            entry.driver.close()
+        return len(evicted)
+
+    def close_all(self) -> None:
+        """
+        Close every pooled driver; called when the plugin process exits
+        """
+        with self._lock:
+            self._closed = True
+            entries = list(self._entries.values())
+            self._entries.clear()
+        for entry in entries:
+            try:
+                entry.driver.close()
+            except Exception:
+                pass
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+_registry: DriverRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def set_driver_registry(registry: DriverRegistry) -> DriverRegistry | None:
+    """
+    Replace the process-wide registry (used by the offline benchmarks);
+    returns the previous one, which the caller is responsible for closing
+    """
+    global _registry
+    with _registry_lock:
+        previous, _registry = _registry, registry
+    return previous
+
+
+def get_driver_registry() -> DriverRegistry:
+    """
+    Return the process-wide driver registry, creating it on first use
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = DriverRegistry()
+                atexit.register(_registry.close_all)
+    return _registry
@@ -0,0 +1,91 @@
+import gzip
+import io
+import json
+
+from tools.driver_registry import env_number
+
+# 每个分块压缩前的目标大小，内存占用与该值同阶，与总行数无关
+DEFAULT_EXPORT_CHUNK_BYTES = 4 * 1024 * 1024
+# 行先攒成小批再交给 gzip，减少逐行写入的调用开销
+_WRITE_BATCH_BYTES = 64 * 1024
+DEFAULT_EXPORT_MAX_ROWS = 1_000_000
+
+EXPORT_MIME_TYPE = "application/gzip"
+
+
+def export_chunk_bytes() -> int:
+    return env_number("NEO4J_EXPORT_CHUNK_BYTES", DEFAULT_EXPORT_CHUNK_BYTES)
+
+
+def export_max_rows() -> int:
+    return env_number("NEO4J_EXPORT_MAX_ROWS", DEFAULT_EXPORT_MAX_ROWS)
+
+
+class NDJSONChunkWriter:
+    """
+    Encode rows as gzip-compressed NDJSON, cut into self-contained chunks
+
+    Each chunk is a complete gzip member holding whole lines, so chunks can be
+    decompressed independently or concatenated into one valid .ndjson.gz.
+    Only the current chunk is buffered.
+    """
+
+    format = "ndjson+gzip"
+    mime_type = EXPORT_MIME_TYPE
+
+    def __init__(self, chunk_bytes: int | None = None, compresslevel: int = 6):
+        self.chunk_bytes = chunk_bytes or export_chunk_bytes()
+        self.compresslevel = compresslevel
+        self.rows = 0
+        self.chunks = 0
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+        self._open()
+
+    def _open(self) -> None:
+        self._buffer = io.BytesIO()
+        self._gzip = gzip.GzipFile(fileobj=self._buffer, mode="wb", compresslevel=self.compresslevel, mtime=0)
+        self._pending = 0
+        self._lines = []
+        self._batched = 0
+
+    def add(self, row) -> bytes | None:
+        """
+        Append one row; returns a finished chunk once the size target is reached
+        """
+        line = json.dumps(row, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+        self._lines.append(line)
+        self._batched += len(line)
+        self._pending += len(line)
+        self.raw_bytes += len(line)
+        self.rows += 1
+        if self._batched >= _WRITE_BATCH_BYTES:
+            self._write_lines()
+        if self._pending >= self.chunk_bytes:
+            return self._cut()
+        return None
+
+    def flush(self) -> bytes | None:
+        """
+        Return the last, partially filled chunk (None if it is empty)
+        """
+        if not self._pending:
+            return None
+        return self._cut()
+
+    def _write_lines(self) -> None:
+        self._gzip.write(b"".join(self._lines))
+        self._lines = []
+        self._batched = 0
+
+    def _cut(self) -> bytes:
+        self._write_lines()
+        self._gzip.close()
+        chunk = self._buffer.getvalue()
+        self.chunks += 1
+        self.compressed_bytes += len(chunk)
+        self._open()
+        return chunk
+
+    def chunk_name(self, prefix: str = "export") -> str:
+        return f"{prefix}-{self.chunks:05d}.ndjson.gz"
@@ -0,0 +1,234 @@
+import bisect
+import random
+import threading
+import time
+
+from tools.driver_registry import env_number
+
+# 默认关闭计时，热路径上只剩一次采样判断；需要时通过环境变量开启
+DEFAULT_TRACE_SAMPLE_RATE = 0.0
+
+SECONDS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROWS_BUCKETS = (1, 10, 100, 1000, 10_000, 100_000)
+BYTES_BUCKETS = (1024, 4096, 16_384, 65_536, 262_144, 1_048_576, 4_194_304, 16_777_216, 67_108_864)
+
+_HISTOGRAMS = {
+    "neo4j_connector_invocation_seconds": ("Wall time of one tool invocation", SECONDS_BUCKETS),
+    "neo4j_connector_phase_seconds": ("Wall time spent in each phase of an invocation", SECONDS_BUCKETS),
+    "neo4j_connector_server_seconds": ("Server-reported result_available_after / result_consumed_after", SECONDS_BUCKETS),
+    "neo4j_connector_rows_fetched": ("Records fetched from the result stream", ROWS_BUCKETS),
+    "neo4j_connector_bytes_serialized": ("Bytes of serialized rows measured by the result budget", BYTES_BUCKETS),
+}
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        # 最后一个位置对应 +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        total = 0
+        pairs = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            pairs.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return pairs
+
+
+class MetricsRegistry:
+    """
+    In-process histograms keyed by metric name and label set, exportable as
+    Prometheus text exposition or JSON
+    """
+
+    def __init__(self):
+        self._series: dict[tuple, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._series.get(key)
+            if histogram is None:
+                histogram = self._series[key] = Histogram(_HISTOGRAMS[name][1])
+            histogram.observe(value)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+    def export_json(self) -> dict:
+        with self._lock:
+            series = sorted(self._series.items())
+            metrics: dict[str, list] = {}
+            for (name, labels), histogram in series:
+                metrics.setdefault(name, []).append({
+                    "labels": dict(labels),
+                    "count": histogram.count,
+                    "sum": round(histogram.sum, 6),
+                    "buckets": dict(histogram.cumulative()),
+                })
+        return metrics
+
+    def export_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            series = sorted(self._series.items())
+            current = None
+            for (name, labels), histogram in series:
+                if name != current:
+                    lines.append(f"# HELP {name} {_HISTOGRAMS[name][0]}")
+                    lines.append(f"# TYPE {name} histogram")
+                    current = name
+                label_text = ",".join(f'{key}="{value}"' for key, value in labels)
+                prefix = label_text + "," if label_text else ""
+                for bound, count in histogram.cumulative():
+                    lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {count}')
+                suffix = f"{{{label_text}}}" if label_text else ""
+                lines.append(f"{name}_sum{suffix} {histogram.sum:.6f}")
+                lines.append(f"{name}_count{suffix} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    __slots__ = ("timer", "name", "started")
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timer.add(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class PhaseTimer:
+    """
+    Per-invocation phase timer; a disabled timer hands out a shared no-op
+    context manager so untraced calls pay almost nothing
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.phases: dict[str, float] = {}
+        self.values: dict[str, float] = {}
+        self.server: dict[str, float] = {}
+
+    def phase(self, name: str):
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, name)
+
+    def add(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def exclude(self, outer: str, inner: str) -> None:
+        """
+        Make outer exclusive of time already recorded under a nested phase
+        """
+        if outer in self.phases and inner in self.phases:
+            self.phases[outer] = max(self.phases[outer] - self.phases[inner], 0.0)
+
+    def timed(self, function, name: str):
+        """
+        Wrap a hot-path function so its cumulative time is recorded under name
+        """
+        if not self.enabled:
+            return function
+
+        def wrapper(*args):
+            started = time.perf_counter()
+            try:
+                return function(*args)
+            finally:
+                self.add(name, time.perf_counter() - started)
+
+        return wrapper
+
+    def record_summary(self, summary) -> None:
+        """
+        Keep the server-side timings (milliseconds) reported in the result summary
+        """
+        if not self.enabled:
+            return
+        for field in ("result_available_after", "result_consumed_after"):
+            value = getattr(summary, field, None)
+            if value is not None:
+                self.server[field] = value
+
+    def report(self, rows_fetched: int | None = None, bytes_serialized: int | None = None) -> dict:
+        """
+        The ``timings`` block for the response (phases in milliseconds)
+
+        ``bytes_serialized`` is taken from a size the caller already measured;
+        the payload is never encoded again just to report it.
+        """
+        report = {
+            "phases_ms": {name: round(seconds * 1000, 3) for name, seconds in self.phases.items()},
+            "elapsed_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            **self.server,
+        }
+        if rows_fetched is not None:
+            self.values["rows_fetched"] = rows_fetched
+            report["rows_fetched"] = rows_fetched
+        if bytes_serialized is not None:
+            self.values["bytes_serialized"] = bytes_serialized
+            report["bytes_serialized"] = bytes_serialized
+        return report
+
+    def finish(self, operation: str, registry: "MetricsRegistry | None" = None) -> None:
+        """
+        Fold this invocation into the process-wide histograms
+        """
+        if not self.enabled:
+            return
+        registry = registry or metrics
+        registry.observe("neo4j_connector_invocation_seconds", time.perf_counter() - self.started, operation=operation)
+        for name, seconds in self.phases.items():
+            registry.observe("neo4j_connector_phase_seconds", seconds, operation=operation, phase=name)
+        for field, milliseconds in self.server.items():
+            registry.observe("neo4j_connector_server_seconds", milliseconds / 1000, operation=operation, stage=field)
+        if "rows_fetched" in self.values:
+            registry.observe("neo4j_connector_rows_fetched", self.values["rows_fetched"], operation=operation)
+        if "bytes_serialized" in self.values:
+            registry.observe("neo4j_connector_bytes_serialized", self.values["bytes_serialized"], operation=operation)
+
+
+def start_timer(sample_rate: float | None = None) -> PhaseTimer:
+    """
+    Start a timer for one invocation, sampled at NEO4J_TRACE_SAMPLE_RATE
+    """
+    if sample_rate is None:
+        sample_rate = env_number("NEO4J_TRACE_SAMPLE_RATE", DEFAULT_TRACE_SAMPLE_RATE, float)
+    return PhaseTimer(sample_rate >= 1.0 or (sample_rate > 0 and random.random() < sample_rate))
+
+
+metrics = MetricsRegistry()
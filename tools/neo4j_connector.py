@@ -1,13 +1,41 @@
+from __future__ import annotations
+
+import json
+import time
 from collections.abc import Generator
-from typing import Any
-from neo4j import GraphDatabase
-from neo4j.exceptions import Neo4jError, ServiceUnavailable, AuthError
-from neo4j.time import DateTime, Date, Time, Duration
-from neo4j.graph import Node, Relationship
+from typing import TYPE_CHECKING, Any
 
 from dify_plugin import Tool
 from dify_plugin.entities.tool import ToolInvokeMessage
 
+from tools.arrow_writer import ARROW_FORMATS, ArrowChunkWriter, arrow_available
+from tools.async_engine import get_fanout_engine
+from tools.cypher_utils import apply_result_limit
+from tools.batch_writer import DEFAULT_BATCH_SIZE, BatchWriter, parse_rows
+from tools.budget import ResultBudget, budget_bytes
+from tools.driver_registry import get_driver_registry
+from tools.exporter import NDJSONChunkWriter, export_max_rows
+from tools.metrics import PhaseTimer, metrics, start_timer
+from tools.pagination import HIDDEN_COLUMNS, PAGE_ID_COLUMN, PAGE_KEY_COLUMN, PagePlan, decode_token, encode_token, key_kind, next_state, plan_page, query_fingerprint
+from tools.parameterizer import auto_parameterize, planning_stats
+from tools.plan_guard import GUARD_MODES, get_plan_guard, guard_mode, is_explainable, summarize_profile
+from tools.query_classifier import auto_route_default, explain_fallback_enabled, get_query_classifier, own_transactions
+from tools.result_cache import get_result_cache
+from tools.schema_cache import build_schema, get_schema_cache
+from tools.statement_pipeline import StatementPipeline, parse_statements
+from tools.serializer import Neo4jSerializer, default_serializer, dictionary_encode
+
+if TYPE_CHECKING:
+    from neo4j import Bookmarks
+
+OUTPUT_FORMATS = ["records", "graph", "columnar", *ARROW_FORMATS]
+# 与 neo4j.READ_ACCESS 相同；neo4j 在首次调用时才导入，缩短插件冷启动时间
+READ_ACCESS = "READ"
+# 执行前经过 EXPLAIN 开销检查的操作
+GUARDED_OPERATIONS = ("query", "create", "update", "delete", "write", "export")
+# 声明为写、但语句实际只读时可改走读路径的操作
+WRITE_OPERATIONS = ("create", "update", "delete", "write")
+
 
 class Neo4jConnectorTool(Tool):
     def _serialize_neo4j_value(self, value):
@@ -15,38 +43,108 @@ class Neo4jConnectorTool(Tool):
         Convert Neo4j-specific types to JSON-serializable types
         Handles: DateTime, Date, Time, Duration, Node, Relationship, and nested structures
         """
-        # Handle Neo4j temporal types
-        if isinstance(value, (DateTime, Date, Time)):
-            return value.iso_format()
-        elif isinstance(value, Duration):
-            # Convert Duration to ISO 8601 duration string
-            return str(value)
-        
-        # Handle Neo4j graph types
-        elif isinstance(value, Node):
-            return {
-                "id": value.id,
-                "labels": list(value.labels),
-                "properties": {k: self._serialize_neo4j_value(v) for k, v in value.items()}
-            }
-        elif isinstance(value, Relationship):
-            return {
-                "id": value.id,
-                "type": value.type,
-                "start_node": value.start_node.id if value.start_node else None,
-                "end_node": value.end_node.id if value.end_node else None,
-                "properties": {k: self._serialize_neo4j_value(v) for k, v in value.items()}
-            }
-        
-        # Handle nested structures recursively
-        elif isinstance(value, dict):
-            return {k: self._serialize_neo4j_value(v) for k, v in value.items()}
-        elif isinstance(value, list):
-            return [self._serialize_neo4j_value(item) for item in value]
-        
-        # Return other types as-is (str, int, float, bool, None)
-        else:
-            return value
+        return default_serializer.serialize(value)
+
+    def _make_serializer(self, output_format: str) -> Neo4jSerializer:
+        """
+        graph 模式需要每次调用独立的实例来记录去重后的节点与关系
+        """
+        if output_format == "graph":
+            return Neo4jSerializer(graph=True)
+        return default_serializer
+
+    def _graph_marks(self, serializer: Neo4jSerializer) -> tuple | None:
+        """
+        graph 模式下序列化前的节点与关系数，被预算拒绝的行新增的实体据此撤回
+        """
+        return (len(serializer.nodes), len(serializer.relationships)) if serializer.graph else None
+
+    def _admit_row(self, budget: ResultBudget, serializer: Neo4jSerializer, row, marks: tuple | None) -> bool:
+        """
+        按预算计入一行；False 表示该行超出预算，应停止读取
+        """
+        graph_tables = (serializer.nodes, serializer.relationships) if marks is not None else None
+        return budget.admit(row, graph_tables, marks)
+
+    def _parse_parameters(self, raw) -> dict:
+        """
+        解析 JSON 格式的查询参数
+        """
+        if raw is None or raw == "":
+            return {}
+        if isinstance(raw, dict):
+            return raw
+        try:
+            parameters = json.loads(raw)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"parameters must be a JSON object: {e}")
+        if not isinstance(parameters, dict):
+            raise ValueError("parameters must be a JSON object")
+        return parameters
+
+    def _parse_bookmarks(self, raw) -> Bookmarks | None:
+        """
+        解析上一次写操作返回的 bookmarks：JSON 数组或逗号分隔的字符串
+        """
+        if raw is None or raw == "":
+            return None
+        if isinstance(raw, str):
+            text = raw.strip()
+            if text.startswith("["):
+                try:
+                    raw = json.loads(text)
+                except ValueError as e:
+                    raise ValueError(f"bookmarks must be a JSON array of strings: {e}")
+            else:
+                raw = text.split(",")
+        if not isinstance(raw, list) or not all(isinstance(value, str) for value in raw):
+            raise ValueError("bookmarks must be a JSON array of strings")
+        values = [value.strip() for value in raw if value.strip()]
+        from neo4j import Bookmarks
+
+        return Bookmarks.from_raw_values(values) if values else None
+
+    def _bookmark_values(self, bookmarks) -> list[str]:
+        return sorted(bookmarks.raw_values) if bookmarks else []
+
+    def _server_address(self, summary) -> str | None:
+        """
+        处理该查询的服务器地址，用于观察集群中的负载分布
+        """
+        server = getattr(summary, "server", None)
+        return str(server.address) if server is not None and server.address else None
+
+    def _prepare_statement(self, query: str, parameters: dict, auto_parameterize_literals: bool) -> tuple[str, dict, int]:
+        """
+        可选地将字面量提取为参数，返回改写后的语句、合并后的参数和提取数量
+        """
+        if not auto_parameterize_literals:
+            return query, parameters, 0
+        rewritten, extracted = auto_parameterize(query)
+        # 与用户参数重名时放弃改写
+        if not extracted or any(name in parameters for name, _ in extracted):
+            return query, parameters, 0
+        return rewritten, {**parameters, **dict(extracted)}, len(extracted)
+
+    def _invalidate_after_write(self, cache_scope: tuple, query: str, counters) -> None:
+        get_result_cache().invalidate_for_write(cache_scope, query, counters)
+        get_schema_cache().invalidate_for_write(cache_scope, query, counters)
+
+    def _shape_results(self, rows: list, keys, serializer: Neo4jSerializer, output_format: str, dictionary_encoding: bool = False) -> dict:
+        """
+        按输出格式组装结果字段
+        """
+        if output_format == "columnar":
+            shaped = {"columns": list(keys), "rows": rows}
+            if dictionary_encoding:
+                dictionaries = dictionary_encode(shaped["columns"], rows)
+                if dictionaries:
+                    shaped["dictionaries"] = dictionaries
+            return shaped
+        shaped = {"results": rows}
+        if serializer.graph:
+            shaped.update(serializer.graph_tables())
+        return shaped
 
     def _invoke(self, tool_parameters: dict[str, Any]) -> Generator[ToolInvokeMessage, None, None]:
         """
@@ -61,11 +159,18 @@ class Neo4jConnectorTool(Tool):
 
         # 2. 获取查询参数
         operation_type = tool_parameters.get("operation_type", "query").lower()
-        query = tool_parameters.get("query", "").strip()
+        query = (tool_parameters.get("query") or "").strip()
         max_results = tool_parameters.get("max_results", 100)
+        limit_pushdown = tool_parameters.get("limit_pushdown", True)
+        output_format = (tool_parameters.get("output_format") or "records").lower()
+        dictionary_encoding = tool_parameters.get("dictionary_encoding", False)
+        use_cache = tool_parameters.get("use_cache", False)
+        cache_ttl = tool_parameters.get("cache_ttl", 60)
+        auto_parameterize_literals = tool_parameters.get("auto_parameterize", False)
+        max_string_length = tool_parameters.get("max_string_length")
 
         # 参数验证
-        if not query:
+        if not query and operation_type not in ("statements", "fanout", "metrics", "schema"):
             yield self.create_text_message("❌ Error: No query provided.")
             return
 
@@ -74,36 +179,228 @@ class Neo4jConnectorTool(Tool):
             return
 
         # 验证操作类型
-        valid_operations = ["query", "create", "update", "delete", "write"]
+        valid_operations = ["query", "create", "update", "delete", "write", "batch", "statements", "fanout", "metrics", "export", "profile", "schema"]
         if operation_type not in valid_operations:
             yield self.create_text_message(f"❌ Error: Invalid operation_type '{operation_type}'. Must be one of: {', '.join(valid_operations)}")
             return
 
-        # 限制最大结果数
-        if max_results > 1000:
-            max_results = 1000
+        if operation_type == "metrics":
+            # 导出进程内的耗时直方图
+            yield from self._export_metrics((tool_parameters.get("metrics_format") or "json").lower())
+            return
 
-        # 3. 连接并执行查询
-        driver = None
         try:
-            # 连接到 Neo4j
-            driver = GraphDatabase.driver(uri, auth=(username, password))
-            
-            # 验证连接
-            driver.verify_connectivity()
+            parameters = self._parse_parameters(tool_parameters.get("parameters"))
+            bookmarks = self._parse_bookmarks(tool_parameters.get("bookmarks"))
+        except ValueError as e:
+            yield self.create_text_message(f"❌ Error: {str(e)}")
+            return
 
-            # 根据操作类型执行不同的逻辑
-            if operation_type in ["create", "update", "delete", "write"]:
-                # 写操作：创建、更新、删除
-                yield from self._execute_write_operation(driver, database, query, operation_type)
-            else:
-                # 读操作：查询
-                yield from self._execute_read_operation(driver, database, query, max_results)
+        if output_format not in OUTPUT_FORMATS:
+            yield self.create_text_message(f"❌ Error: Invalid output_format '{output_format}'. Must be one of: {', '.join(OUTPUT_FORMATS)}")
+            return
+
+        cost_guard = (tool_parameters.get("cost_guard") or guard_mode()).lower()
+        if cost_guard not in GUARD_MODES:
+            yield self.create_text_message(f"❌ Error: Invalid cost_guard '{cost_guard}'. Must be one of: {', '.join(GUARD_MODES)}")
+            return
+
+        rows = None
+        batch_size = tool_parameters.get("batch_size") or DEFAULT_BATCH_SIZE
+        if operation_type == "batch":
+            try:
+                rows = parse_rows(tool_parameters.get("rows"))
+            except ValueError as e:
+                yield self.create_text_message(f"❌ Error: {str(e)}")
+                return
+
+        statements = None
+        stop_on_error = tool_parameters.get("stop_on_error", True)
+        if operation_type in ("statements", "fanout"):
+            try:
+                statements = parse_statements(tool_parameters.get("statements"))
+            except ValueError as e:
+                yield self.create_text_message(f"❌ Error: {str(e)}")
+                return
+            if operation_type == "fanout" and any(s["operation"] != "query" for s in statements):
+                yield self.create_text_message("❌ Error: fanout only runs read statements (operation 'query').")
+                return
+
+        # 分页：paginate 开启首页，continuation_token 恢复后续页
+        continuation_token = (tool_parameters.get("continuation_token") or "").strip()
+        paginate = tool_parameters.get("paginate", False) or bool(continuation_token)
+        if paginate and operation_type != "query":
+            yield self.create_text_message("❌ Error: pagination is only supported for the query operation.")
+            return
+
+        if operation_type == "export" and output_format == "graph":
+            yield self.create_text_message("❌ Error: export supports the records, columnar, arrow and parquet output formats.")
+            return
+        if output_format in ARROW_FORMATS:
+            if operation_type != "export":
+                yield self.create_text_message(f"❌ Error: the {output_format} output format is only supported by the export operation.")
+                return
+            # pyarrow 是可选依赖，只有 arrow/parquet 导出需要
+            if not arrow_available():
+                yield self.create_text_message(f"❌ Error: the {output_format} output format requires pyarrow. Install it with: pip install pyarrow")
+                return
+
+        # 限制最大结果数；export 逐块输出，内存占用与行数无关，上限可以高得多
+        max_results_cap = export_max_rows() if operation_type == "export" else 1000
+        if max_results > max_results_cap:
+            max_results = max_results_cap
+
+        page = None
+        if paginate:
+            # 指纹基于原始语句和参数，token 不能用于其他查询
+            fingerprint = query_fingerprint(query, parameters)
+            try:
+                state = decode_token(continuation_token, fingerprint) if continuation_token else None
+            except ValueError as e:
+                yield self.create_text_message(f"❌ Error: {str(e)}")
+                return
+            plan = plan_page(query, int(max_results), state)
+            if plan is None:
+                yield self.create_text_message("❌ Error: this query cannot be paginated; it needs a single read statement ending in RETURN without SKIP and with at most an integer LIMIT.")
+                return
+            page = (plan, state, fingerprint)
+
+        auto_route = tool_parameters.get("auto_route")
+        if auto_route is None:
+            auto_route = auto_route_default()
+
+        # 结果体积预算：max_tokens 按近似字节数换算，与 max_bytes 取较小者
+        budget = ResultBudget(
+            budget_bytes(tool_parameters.get("max_bytes"), tool_parameters.get("max_tokens")),
+            int(max_string_length) if max_string_length else None,
+        )
+
+        timer = start_timer()
+        try:
+            yield from self._dispatch(
+                timer, operation_type, uri, username, password, database, query, max_results, limit_pushdown,
+                output_format, dictionary_encoding, use_cache, cache_ttl, auto_parameterize_literals,
+                parameters, bookmarks, rows, batch_size, statements, stop_on_error, tool_parameters.get("max_concurrency"), page, cost_guard,
+                budget if budget.enabled else None, auto_route,
+            )
+        finally:
+            timer.finish(operation_type)
+
+    def _dispatch(self, timer: PhaseTimer, operation_type: str, uri: str, username: str, password: str, database: str, query: str, max_results: int, limit_pushdown: bool, output_format: str, dictionary_encoding: bool, use_cache: bool, cache_ttl: float, auto_parameterize_literals: bool, parameters: dict, bookmarks: Bookmarks | None, rows: list | None, batch_size: int, statements: list | None, stop_on_error: bool, max_concurrency: int | None, page: tuple | None = None, cost_guard: str = "off", budget: ResultBudget | None = None, auto_route: bool = False) -> Generator[ToolInvokeMessage, None, None]:
+        """
+        查找缓存、获取 driver 并按操作类型分发
+        """
+        from neo4j.exceptions import AuthError, Neo4jError, ServiceUnavailable
+
+        # 读结果缓存命中时无需连接数据库
+        cache_key = None
+        # 传入 bookmarks 表示需要读到某次写入之后的数据，不使用缓存；分页结果也不缓存
+        if use_cache and operation_type == "query" and bookmarks is None and page is None:
+            result_cache = get_result_cache()
+            cache_key = result_cache.make_key(
+                (uri, database), get_driver_registry().make_key(uri, username, password, database), query, parameters,
+                max_results=max_results, output_format=output_format,
+                dictionary_encoding=dictionary_encoding, limit_pushdown=limit_pushdown,
+                max_bytes=budget and budget.max_bytes, max_string_length=budget and budget.max_string_length,
+            )
+            cached = result_cache.get(cache_key)
+            if cached is not None:
+                yield self.create_json_message({**cached, "cache": {"hit": True, **result_cache.stats()}})
+                return
+
+        # 图模式摘要按数据库缓存，命中时同样无需连接
+        schema_key = None
+        if operation_type == "schema":
+            schema_key = ((uri, database), get_driver_registry().make_key(uri, username, password, database))
+            entry = get_schema_cache().get(schema_key)
+            if entry is not None:
+                yield self.create_json_message(self._schema_response(entry, cached=True))
+                return
+
+        # 3. 从进程级注册表获取连接（复用连接池，避免每次调用重新握手）
+        registry = get_driver_registry()
+        try:
+            if operation_type == "fanout":
+                # 并发读：由异步引擎管理自己的 driver，不占用同步连接池
+                yield from self._execute_fanout_operation(get_fanout_engine(), uri, username, password, database, statements, max_results, max_concurrency, output_format, dictionary_encoding, bookmarks=bookmarks)
+                return
+
+            with registry.acquire(uri, username, password, database, timer=timer) as driver:
+                verdict = None
+                if cost_guard != "off" and operation_type in GUARDED_OPERATIONS and is_explainable(query):
+                    # 执行前用 EXPLAIN 检查估算行数和高开销算子，判定结果按查询缓存
+                    with timer.phase("explain"):
+                        verdict = get_plan_guard().check(
+                            (uri, database), query,
+                            lambda: self._explain_plan(driver, database, query, parameters, operation_type, bookmarks),
+                            cost_guard,
+                        )
+                    if verdict.action == "reject":
+                        yield self.create_text_message(
+                            f"❌ Error: query rejected by the cost guard: {'; '.join(verdict.reasons)}. "
+                            "Add labels, relationship patterns, indexed predicates or a LIMIT and try again."
+                        )
+                        return
+
+                routing = None
+                if operation_type == "query" and page is None:
+                    # 只统计声明为读却包含写子句的语句，不改变执行方式
+                    get_query_classifier().classify((uri, database), query, operation_type)
+                elif operation_type in WRITE_OPERATIONS and auto_route:
+                    # 声明为写的只读语句改走读路径：受 max_results 限制，集群中可由只读副本执行
+                    explain = None
+                    if explain_fallback_enabled():
+                        explain = lambda: self._explain(driver, database, query, parameters, operation_type, bookmarks).query_type
+                    with timer.phase("classify"):
+                        classification = get_query_classifier().classify((uri, database), query, operation_type, explain)
+                    if classification.kind == "read":
+                        routing = {"declared": operation_type, "executed": "query", "source": classification.source}
+
+                # 根据操作类型执行不同的逻辑
+                if operation_type == "schema":
+                    # 图模式摘要：在一个读事务中批量读取并缓存
+                    operation = self._execute_schema_operation(driver, database, schema_key)
+                elif operation_type == "profile":
+                    # 性能分析：PROFILE 后回滚，不提交任何写入
+                    operation = self._execute_profile_operation(driver, database, query, parameters=parameters, bookmarks=bookmarks)
+                elif operation_type == "statements":
+                    # 多语句：同一会话内按读写分组执行
+                    operation = self._execute_statements_operation(driver, database, statements, max_results, stop_on_error, output_format, dictionary_encoding, cache_scope=(uri, database), bookmarks=bookmarks)
+                elif operation_type == "export":
+                    # 导出：流式写入 gzip NDJSON 分块
+                    operation = self._execute_export_operation(driver, database, query, max_results, output_format, parameters=parameters, auto_parameterize_literals=auto_parameterize_literals, bookmarks=bookmarks, timer=timer)
+                elif operation_type == "batch":
+                    # 批量写入：UNWIND $rows 分块提交
+                    operation = self._execute_batch_operation(driver, database, query, rows, batch_size, cache_scope=(uri, database), bookmarks=bookmarks)
+                elif operation_type in WRITE_OPERATIONS and routing is None:
+                    # 写操作：创建、更新、删除
+                    operation = self._execute_write_operation(driver, database, query, operation_type, output_format, dictionary_encoding, cache_scope=(uri, database), parameters=parameters, auto_parameterize_literals=auto_parameterize_literals, bookmarks=bookmarks, timer=timer)
+                elif page is not None:
+                    # 分页读：按 keyset 或 SKIP 改写后读取一页
+                    plan, state, fingerprint = page
+                    operation = self._execute_paged_read_operation(driver, database, plan, state, fingerprint, output_format, dictionary_encoding, parameters=parameters, auto_parameterize_literals=auto_parameterize_literals, bookmarks=bookmarks, timer=timer, budget=budget)
+                else:
+                    # 读操作：查询
+                    operation = self._execute_read_operation(driver, database, query, max_results, limit_pushdown, output_format, dictionary_encoding, cache_key=cache_key, cache_ttl=cache_ttl, parameters=parameters, auto_parameterize_literals=auto_parameterize_literals, bookmarks=bookmarks, timer=timer, budget=budget)
+
+                # 告警不阻止执行，附加在 JSON 响应中
+                for message in operation:
+                    payload = getattr(message.message, "json_object", None)
+                    if verdict is not None and verdict.reasons and isinstance(payload, dict):
+                        payload["cost_guard"] = verdict.as_dict()
+                    if routing is not None and isinstance(payload, dict):
+                        payload["routing"] = routing
+                    yield message
 
         except AuthError as e:
+            # 凭证失效时丢弃缓存的 driver
+            registry.invalidate(uri, username, password, database)
+            get_fanout_engine().invalidate(uri, username, password, database)
             yield self.create_text_message(f"❌ Authentication Error: Invalid username or password.\n{str(e)}")
         
         except ServiceUnavailable as e:
+            registry.invalidate(uri, username, password, database)
+            get_fanout_engine().invalidate(uri, username, password, database)
             yield self.create_text_message(f"❌ Connection Error: Cannot connect to Neo4j at {uri}\n{str(e)}")
         
         except Neo4jError as e:
@@ -114,42 +411,80 @@ class Neo4jConnectorTool(Tool):
             # 其他未预期的错误
             yield self.create_text_message(f"❌ Unexpected Error: {str(e)}")
 
-        finally:
-            # 确保关闭连接
-            if driver:
-                driver.close()
-
-    def _execute_read_operation(self, driver, database: str, query: str, max_results: int) -> Generator[ToolInvokeMessage, None, None]:
+    def _execute_read_operation(self, driver, database: str, query: str, max_results: int, limit_pushdown: bool = True, output_format: str = "records", dictionary_encoding: bool = False, cache_key: tuple | None = None, cache_ttl: float | None = None, parameters: dict | None = None, auto_parameterize_literals: bool = False, bookmarks: Bookmarks | None = None, timer: PhaseTimer | None = None, budget: ResultBudget | None = None) -> Generator[ToolInvokeMessage, None, None]:
         """
         执行读操作（查询）
+
+        limit_pushdown 模式下，将 LIMIT max_results+1 下推到服务端，并让
+        fetch_size 与之匹配，多取的一行用于精确判断是否截断；设置 budget 时
+        每行序列化后立即累计体积，超出预算即停止读取
         """
-        with driver.session(database=database) as session:
-            result = session.run(query)
-            
+        max_results = int(max_results)
+        timer = timer or PhaseTimer(enabled=False)
+        session_config = {"database": database, "default_access_mode": READ_ACCESS}
+        if bookmarks is not None:
+            session_config["bookmarks"] = bookmarks
+        pushed_down = False
+        with timer.phase("prepare"):
+            if limit_pushdown:
+                query, pushed_down = apply_result_limit(query, max_results + 1)
+                session_config["fetch_size"] = max_results + 1
+            # 先下推 LIMIT 再提取字面量，LIMIT 值也会成为参数
+            query, parameters, extracted = self._prepare_statement(query, parameters or {}, auto_parameterize_literals)
+
+        serializer = self._make_serializer(output_format)
+        serialize = serializer.serialize_row if output_format == "columnar" else serializer.serialize_record
+        serialize = timer.timed(serialize, "serialize")
+        def read_transaction(tx):
+            # 事务重试时清空上一次尝试记录的图实体
+            serializer.reset()
+            with timer.phase("run"):
+                result = tx.run(query, parameters)
+
             # 收集结果
             records = []
-            count = 0
-            
-            for record in result:
-                if count >= max_results:
-                    break
-                # Serialize Neo4j types to JSON-compatible format
-                record_dict = dict(record)
-                serialized_record = {k: self._serialize_neo4j_value(v) for k, v in record_dict.items()}
-                records.append(serialized_record)
-                count += 1
-            
-            # 获取查询统计信息
-            summary = result.consume()
-            
+            truncated = False
+            with timer.phase("stream"):
+                if budget is not None:
+                    budget.start(result.keys() if output_format == "columnar" else None)
+                marks = None
+                for record in result:
+                    if len(records) >= max_results:
+                        truncated = True
+                        break
+                    if budget is not None:
+                        marks = self._graph_marks(serializer)
+                    # Serialize Neo4j types to JSON-compatible format
+                    row = serialize(record)
+                    if budget is not None and not self._admit_row(budget, serializer, row, marks):
+                        truncated = True
+                        break
+                    records.append(row)
+
+            # 获取查询统计信息；对未读完的结果 consume 会发送 DISCARD，
+            # 服务端随即终止该结果流，不会再传输剩余记录
+            with timer.phase("consume"):
+                summary = result.consume()
+            return records, result.keys(), truncated, summary
+
+        with driver.session(**session_config) as session:
+            # execute_read 使用 READ 模式，集群中由 follower 或只读副本执行
+            records, keys, truncated, summary = session.execute_read(read_transaction)
+            count = len(records)
+            timer.exclude("stream", "serialize")
+            timer.record_summary(summary)
+
             # 构建响应
             response_data = {
                 "status": "success",
                 "operation": "query",
-                "results": records,
+                **self._shape_results(records, keys, serializer, output_format, dictionary_encoding),
                 "count": count,
                 "summary": {
                     "query_type": summary.query_type,
+                    "server": self._server_address(summary),
+                    "result_available_after": summary.result_available_after,
+                    "result_consumed_after": summary.result_consumed_after,
                     "counters": {
                         "nodes_created": summary.counters.nodes_created,
                         "nodes_deleted": summary.counters.nodes_deleted,
@@ -162,44 +497,200 @@ class Neo4jConnectorTool(Tool):
                 }
             }
             
+            if auto_parameterize_literals:
+                response_data["summary"]["parameterization"] = {
+                    "parameters_extracted": extracted,
+                    **planning_stats.record(query, summary.result_available_after),
+                }
+
+            if limit_pushdown:
+                response_data["limit_pushdown"] = pushed_down
+
             # 如果有更多结果被截断，添加提示
-            if count >= max_results:
+            if truncated:
                 response_data["truncated"] = True
                 response_data["message"] = f"Results limited to {max_results}. Increase max_results to see more."
+            if budget is not None:
+                response_data["budget"] = budget.report()
+                if budget.stopped is not None:
+                    response_data["message"] = budget.message()
+
+            if cache_key is not None:
+                result_cache = get_result_cache()
+                result_cache.put(cache_key, dict(response_data), query, cache_ttl)
+                response_data["cache"] = {"hit": False, **result_cache.stats()}
+
+            if timer.enabled:
+                response_data["timings"] = timer.report(rows_fetched=count, bytes_serialized=budget and budget.bytes_used)
 
             # 返回 JSON 结果
-            yield self.create_json_message(response_data)
+            with timer.phase("message"):
+                message = self.create_json_message(response_data)
+            yield message
+
+    def _execute_paged_read_operation(self, driver, database: str, plan: PagePlan, state: dict | None, fingerprint: str, output_format: str = "records", dictionary_encoding: bool = False, parameters: dict | None = None, auto_parameterize_literals: bool = False, bookmarks: Bookmarks | None = None, timer: PhaseTimer | None = None, budget: ResultBudget | None = None) -> Generator[ToolInvokeMessage, None, None]:
+        """
+        读取一页结果，并返回用于获取下一页的 continuation token
+
+        keyset 模式下语句额外返回排序键和 elementId 两个隐藏列，用作下一页的
+        起点，返回前从结果中移除
+        """
+        timer = timer or PhaseTimer(enabled=False)
+        session_config = {"database": database, "default_access_mode": READ_ACCESS, "fetch_size": plan.take + 1}
+        if bookmarks is not None:
+            session_config["bookmarks"] = bookmarks
+        with timer.phase("prepare"):
+            query, parameters, extracted = self._prepare_statement(plan.query, {**(parameters or {}), **plan.parameters}, auto_parameterize_literals)
+        hidden = len(HIDDEN_COLUMNS) if plan.mode == "keyset" else 0
+
+        serializer = self._make_serializer(output_format)
+        serialize = serializer.serialize_row if output_format == "columnar" else serializer.serialize_record
+        serialize = timer.timed(serialize, "serialize")
+        def read_transaction(tx):
+            serializer.reset()
+            with timer.phase("run"):
+                result = tx.run(query, parameters)
+
+            records = []
+            last = None
+            has_more = False
+            key_kinds = set()
+            with timer.phase("stream"):
+                if budget is not None:
+                    keys = result.keys()
+                    budget.start(keys[:len(keys) - hidden] if output_format == "columnar" else None)
+                marks = None
+                for record in result:
+                    if len(records) >= plan.take:
+                        has_more = True
+                        break
+                    if budget is not None:
+                        marks = self._graph_marks(serializer)
+                    row = serialize(record)
+                    # 移除隐藏列
+                    if hidden and output_format == "columnar":
+                        row = row[:-hidden]
+                    elif hidden:
+                        for column in HIDDEN_COLUMNS:
+                            row.pop(column, None)
+                    if budget is not None and not self._admit_row(budget, serializer, row, marks):
+                        # 下一页从最后一个返回的行之后继续
+                        has_more = True
+                        break
+                    records.append(row)
+                    last = record
+                    if hidden:
+                        key_kinds.add(key_kind(record[PAGE_KEY_COLUMN]))
 
-    def _execute_write_operation(self, driver, database: str, query: str, operation_type: str) -> Generator[ToolInvokeMessage, None, None]:
+            with timer.phase("consume"):
+                summary = result.consume()
+            keys = result.keys()
+            return records, keys[:len(keys) - hidden], last, has_more, key_kinds, summary
+
+        with driver.session(**session_config) as session:
+            records, keys, last, has_more, key_kinds, summary = session.execute_read(read_transaction)
+        count = len(records)
+        timer.exclude("stream", "serialize")
+        timer.record_summary(summary)
+
+        # 预算在本页中途停止时，剩余行一定存在
+        budget_stopped = budget is not None and budget.stopped is not None
+        has_more = budget_stopped or (has_more and plan.has_more_possible)
+        next_token = None
+        if has_more and count:
+            last_key = last[PAGE_KEY_COLUMN] if hidden else None
+            last_id = last[PAGE_ID_COLUMN] if hidden else None
+            next_token = encode_token(next_state(plan, state, fingerprint, count, last_key, last_id, key_kinds))
+
+        response_data = {
+            "status": "success",
+            "operation": "query",
+            **self._shape_results(records, keys, serializer, output_format, dictionary_encoding),
+            "count": count,
+            "next_token": next_token,
+            "pagination": {
+                "mode": plan.mode,
+                "offset": int((state or {}).get("offset", 0)),
+                "page_size": plan.take,
+                "has_more": has_more,
+            },
+            "summary": {
+                "query_type": summary.query_type,
+                "server": self._server_address(summary),
+                "result_available_after": summary.result_available_after,
+                "result_consumed_after": summary.result_consumed_after,
+            },
+        }
+        if auto_parameterize_literals:
+            response_data["summary"]["parameterization"] = {"parameters_extracted": extracted}
+        if not plan.deterministic:
+            response_data["pagination"]["warning"] = (
+                "The query has no stable row order, so pages may repeat or skip rows. "
+                "Add an ORDER BY on a unique property, or avoid CALL, path and variable-length relationship variables "
+                "and clauses before a WITH so every row can be told apart."
+            )
+        if has_more:
+            response_data["message"] = f"Returned {count} row(s). Pass next_token as continuation_token to fetch the next page."
+        if budget is not None:
+            response_data["budget"] = budget.report()
+            if budget_stopped:
+                response_data["message"] = budget.message() + (" " + response_data["message"] if count else "")
+
+        if timer.enabled:
+            response_data["timings"] = timer.report(rows_fetched=count, bytes_serialized=budget and budget.bytes_used)
+
+        with timer.phase("message"):
+            message = self.create_json_message(response_data)
+        yield message
+
+    def _execute_write_operation(self, driver, database: str, query: str, operation_type: str, output_format: str = "records", dictionary_encoding: bool = False, cache_scope: tuple | None = None, parameters: dict | None = None, auto_parameterize_literals: bool = False, bookmarks: Bookmarks | None = None, timer: PhaseTimer | None = None) -> Generator[ToolInvokeMessage, None, None]:
         """
         执行写操作（创建、更新、删除）
         """
-        with driver.session(database=database) as session:
+        timer = timer or PhaseTimer(enabled=False)
+        with timer.phase("prepare"):
+            query, parameters, extracted = self._prepare_statement(query, parameters or {}, auto_parameterize_literals)
+        serializer = self._make_serializer(output_format)
+        serialize = serializer.serialize_row if output_format == "columnar" else serializer.serialize_record
+        serialize = timer.timed(serialize, "serialize")
+        with driver.session(database=database, bookmarks=bookmarks) as session:
             # 使用写事务执行操作
             def write_transaction(tx):
-                result = tx.run(query)
+                # 事务重试时清空上一次尝试记录的图实体
+                serializer.reset()
+                result = tx.run(query, parameters)
                 
                 # 先收集返回的记录（如果有 RETURN 子句）
                 records = []
                 for record in result:
                     # Serialize Neo4j types to JSON-compatible format
-                    record_dict = dict(record)
-                    serialized_record = {k: self._serialize_neo4j_value(v) for k, v in record_dict.items()}
-                    records.append(serialized_record)
+                    records.append(serialize(record))
                 
                 # 然后获取统计信息
                 summary = result.consume()
                 
-                return records, summary
+                return records, result.keys(), summary
             
-            # 执行写事务
-            records, summary = session.execute_write(write_transaction)
+            # 执行写事务（包含提交）
+            with timer.phase("transaction"):
+                records, keys, summary = session.execute_write(write_transaction)
+            timer.exclude("transaction", "serialize")
+            timer.record_summary(summary)
+
+            # 写入后使同一数据库的读缓存和图模式摘要失效
+            if cache_scope is not None:
+                self._invalidate_after_write(cache_scope, query, summary.counters)
             
             # 构建响应
             response_data = {
                 "status": "success",
                 "operation": operation_type,
                 "query_type": summary.query_type,
+                "server": self._server_address(summary),
+                "result_available_after": summary.result_available_after,
+                "result_consumed_after": summary.result_consumed_after,
+                # 后续读操作传入这些 bookmarks 即可读到本次写入
+                "bookmarks": self._bookmark_values(session.last_bookmarks()),
                 "counters": {
                     "nodes_created": summary.counters.nodes_created,
                     "nodes_deleted": summary.counters.nodes_deleted,
@@ -211,9 +702,15 @@ class Neo4jConnectorTool(Tool):
                 }
             }
             
+            if auto_parameterize_literals:
+                response_data["parameterization"] = {
+                    "parameters_extracted": extracted,
+                    **planning_stats.record(query, summary.result_available_after),
+                }
+
             # 如果有返回结果，添加到响应中
             if records:
-                response_data["results"] = records
+                response_data.update(self._shape_results(records, keys, serializer, output_format, dictionary_encoding))
                 response_data["count"] = len(records)
             
             # 添加操作成功的消息
@@ -225,6 +722,322 @@ class Neo4jConnectorTool(Tool):
             }
             
             response_data["message"] = operation_messages.get(operation_type, "✅ Operation completed successfully")
+
+            if timer.enabled:
+                response_data["timings"] = timer.report(rows_fetched=len(records))
             
             # 返回 JSON 结果
-            yield self.create_json_message(response_data)
+            with timer.phase("message"):
+                message = self.create_json_message(response_data)
+            yield message
+
+    def _execute_batch_operation(self, driver, database: str, query: str, rows: list, batch_size: int, cache_scope: tuple | None = None, bookmarks: Bookmarks | None = None) -> Generator[ToolInvokeMessage, None, None]:
+        """
+        执行批量写入：将 rows 分块，每块以 UNWIND $rows AS row 在独立的写事务中提交
+        """
+        def on_commit(summary):
+            if cache_scope is not None:
+                self._invalidate_after_write(cache_scope, writer.statement, summary.counters)
+
+        writer = BatchWriter(query, rows, int(batch_size), on_commit=on_commit)
+        from neo4j.exceptions import Neo4jError
+
+        started = time.perf_counter()
+        error = None
+        with driver.session(database=database, bookmarks=bookmarks) as session:
+            try:
+                writer.run(session)
+            except Neo4jError as e:
+                error = e
+            last_bookmarks = session.last_bookmarks()
+        elapsed = time.perf_counter() - started
+
+        response_data = {
+            "status": "success" if error is None else "partial",
+            "operation": "batch",
+            "rows": len(rows),
+            "rows_committed": writer.rows_committed,
+            "chunks": writer.chunks,
+            "batch_size": writer.sizing.size,
+            "batch_size_shrinks": writer.sizing.shrinks,
+            "batch_size_grows": writer.sizing.grows,
+            "retries": writer.retries,
+            "counters": writer.counters,
+            "elapsed_ms": round(elapsed * 1000, 3),
+            "rows_per_second": round(writer.rows_committed / elapsed, 1) if elapsed > 0 else None,
+            "bookmarks": self._bookmark_values(last_bookmarks),
+        }
+        if error is None:
+            response_data["message"] = f"✅ Imported {writer.rows_committed} row(s) in {writer.chunks} chunk(s)"
+        else:
+            # 已提交的块不会回滚，报告导入进度
+            response_data["message"] = f"⚠️ Batch stopped after {writer.rows_committed} of {len(rows)} row(s): {error.message}"
+            response_data["error"] = {"code": error.code, "message": error.message}
+
+        yield self.create_json_message(response_data)
+
+    def _execute_statements_operation(self, driver, database: str, statements: list[dict], max_results: int, stop_on_error: bool = True, output_format: str = "records", dictionary_encoding: bool = False, cache_scope: tuple | None = None, bookmarks: Bookmarks | None = None) -> Generator[ToolInvokeMessage, None, None]:
+        """
+        在同一会话中依次执行多条语句，连续的写语句共用一个写事务，连续的读语句共用一个读事务
+        """
+        max_results = int(max_results)
+
+        def collect_rows(result):
+            serializer = self._make_serializer(output_format)
+            serialize = serializer.serialize_row if output_format == "columnar" else serializer.serialize_record
+            rows = []
+            truncated = False
+            for record in result:
+                if len(rows) >= max_results:
+                    truncated = True
+                    break
+                rows.append(serialize(record))
+            collected = self._shape_results(rows, result.keys(), serializer, output_format, dictionary_encoding)
+            collected["count"] = len(rows)
+            if truncated:
+                collected["truncated"] = True
+            return collected
+
+        def on_write(query, summary):
+            if cache_scope is not None:
+                self._invalidate_after_write(cache_scope, query, summary.counters)
+
+        pipeline = StatementPipeline(statements, collect_rows, stop_on_error, on_write)
+        with driver.session(database=database, bookmarks=bookmarks) as session:
+            succeeded = pipeline.run(session)
+            last_bookmarks = session.last_bookmarks()
+
+        results = pipeline.results()
+        failures = sum(1 for outcome in results if outcome["status"] == "error")
+        response_data = {
+            "status": "success" if succeeded else ("error" if stop_on_error else "partial"),
+            "operation": "statements",
+            "statements": results,
+            "count": len(results),
+            "transactions": pipeline.transactions,
+            "bookmarks": self._bookmark_values(last_bookmarks),
+        }
+        if succeeded:
+            response_data["message"] = f"✅ Executed {len(results)} statement(s)"
+        else:
+            response_data["message"] = f"⚠️ {failures} of {len(statements)} statement(s) failed"
+
+        yield self.create_json_message(response_data)
+
+    def _execute_fanout_operation(self, engine, uri: str, username: str, password: str, database: str, statements: list[dict], max_results: int, max_concurrency: int | None = None, output_format: str = "records", dictionary_encoding: bool = False, bookmarks: Bookmarks | None = None) -> Generator[ToolInvokeMessage, None, None]:
+        """
+        并发执行多条相互独立的读查询，按输入顺序合并结果
+        """
+        max_results = int(max_results)
+        # 与单条读查询一样下推 LIMIT max_results+1
+        pushed = [{**statement, "query": apply_result_limit(statement["query"], max_results + 1)[0]} for statement in statements]
+
+        def on_complete(statement, keys, records, truncated, summary):
+            serializer = self._make_serializer(output_format)
+            serialize = serializer.serialize_row if output_format == "columnar" else serializer.serialize_record
+            rows = [serialize(record) for record in records]
+            outcome = self._shape_results(rows, keys, serializer, output_format, dictionary_encoding)
+            outcome["count"] = len(rows)
+            if truncated:
+                outcome["truncated"] = True
+            outcome.update({
+                "index": statement["index"],
+                "status": "success",
+                "query_type": summary.query_type,
+                "server": self._server_address(summary),
+            })
+            return outcome
+
+        started = time.perf_counter()
+        results = engine.run(uri, username, password, database, pushed, max_results, on_complete, max_concurrency, bookmarks)
+        elapsed = time.perf_counter() - started
+
+        failures = sum(1 for outcome in results if outcome["status"] == "error")
+        response_data = {
+            "status": "success" if not failures else "partial",
+            "operation": "fanout",
+            "statements": results,
+            "count": len(results),
+            "max_concurrency": int(max_concurrency or engine.max_concurrency),
+            "elapsed_ms": round(elapsed * 1000, 3),
+        }
+        if failures:
+            response_data["message"] = f"⚠️ {failures} of {len(results)} statement(s) failed"
+        else:
+            response_data["message"] = f"✅ Ran {len(results)} statement(s) concurrently"
+
+        yield self.create_json_message(response_data)
+
+    def _execute_export_operation(self, driver, database: str, query: str, max_rows: int, output_format: str = "records", parameters: dict | None = None, auto_parameterize_literals: bool = False, bookmarks: Bookmarks | None = None, timer: PhaseTimer | None = None) -> Generator[ToolInvokeMessage, None, None]:
+        """
+        执行导出：从结果游标逐条序列化，写入 gzip 压缩的 NDJSON 分块，
+        每满一块即以 blob 消息返回，不在内存中保留全部结果
+
+        arrow/parquet 格式直接按列收集驱动返回的原始值，每块构建一个类型化的
+        record batch，不经过 JSON 序列化
+        """
+        max_rows = int(max_rows)
+        timer = timer or PhaseTimer(enabled=False)
+        session_config = {"database": database, "default_access_mode": READ_ACCESS}
+        if bookmarks is not None:
+            session_config["bookmarks"] = bookmarks
+        with timer.phase("prepare"):
+            query, pushed_down = apply_result_limit(query, max_rows + 1)
+            query, parameters, extracted = self._prepare_statement(query, parameters or {}, auto_parameterize_literals)
+
+        if output_format in ARROW_FORMATS:
+            writer = ArrowChunkWriter(output_format)
+            serialize = tuple
+        else:
+            writer = NDJSONChunkWriter()
+            serialize = default_serializer.serialize_row if output_format == "columnar" else default_serializer.serialize_record
+        serialize = timer.timed(serialize, "serialize")
+        count = 0
+        truncated = False
+        with driver.session(**session_config) as session:
+            # 事务函数无法在中途产出消息，这里使用显式的读事务
+            with session.begin_transaction() as tx:
+                with timer.phase("run"):
+                    result = tx.run(query, parameters)
+                if output_format == "columnar":
+                    # columnar 的第一行是列名，之后每行为按位置排列的数组
+                    writer.add({"columns": list(result.keys())})
+                elif output_format in ARROW_FORMATS:
+                    writer.columns = list(result.keys())
+                for record in result:
+                    if count >= max_rows:
+                        truncated = True
+                        break
+                    chunk = writer.add(serialize(record))
+                    count += 1
+                    if chunk is not None:
+                        yield self.create_blob_message(chunk, {"mime_type": writer.mime_type, "filename": writer.chunk_name()})
+                summary = result.consume()
+            timer.record_summary(summary)
+
+        chunk = writer.flush()
+        if chunk is not None:
+            yield self.create_blob_message(chunk, {"mime_type": writer.mime_type, "filename": writer.chunk_name()})
+
+        response_data = {
+            "status": "success",
+            "operation": "export",
+            "format": writer.format,
+            "output_format": output_format,
+            "count": count,
+            "chunks": writer.chunks,
+            "raw_bytes": writer.raw_bytes,
+            "compressed_bytes": writer.compressed_bytes,
+            "summary": {
+                "query_type": summary.query_type,
+                "server": self._server_address(summary),
+                "result_available_after": summary.result_available_after,
+                "result_consumed_after": summary.result_consumed_after,
+            },
+            "limit_pushdown": pushed_down,
+        }
+        if auto_parameterize_literals:
+            response_data["summary"]["parameterization"] = {"parameters_extracted": extracted}
+        if truncated:
+            response_data["truncated"] = True
+            response_data["message"] = f"Export limited to {max_rows} rows. Increase max_results to export more."
+        else:
+            response_data["message"] = f"✅ Exported {count} row(s) in {writer.chunks} chunk(s)"
+        if timer.enabled:
+            response_data["timings"] = timer.report(rows_fetched=count)
+            response_data["timings"]["bytes_serialized"] = writer.raw_bytes
+            timer.values["bytes_serialized"] = writer.raw_bytes
+
+        yield self.create_json_message(response_data)
+
+    def _explain_plan(self, driver, database: str, query: str, parameters: dict, operation_type: str, bookmarks: Bookmarks | None = None) -> dict | None:
+        """
+        运行 EXPLAIN 获取执行计划，不执行查询本身
+        """
+        return self._explain(driver, database, query, parameters, operation_type, bookmarks).plan
+
+    def _explain(self, driver, database: str, query: str, parameters: dict, operation_type: str, bookmarks: Bookmarks | None = None):
+        """
+        运行 EXPLAIN 并返回结果摘要（执行计划与 query_type）
+        """
+        session_config = {"database": database}
+        if operation_type in ("query", "export"):
+            session_config["default_access_mode"] = READ_ACCESS
+        if bookmarks is not None:
+            session_config["bookmarks"] = bookmarks
+        with driver.session(**session_config) as session:
+            return session.run(f"EXPLAIN {query}", parameters).consume()
+
+    def _execute_profile_operation(self, driver, database: str, query: str, parameters: dict | None = None, bookmarks: Bookmarks | None = None) -> Generator[ToolInvokeMessage, None, None]:
+        """
+        执行 PROFILE 并返回各算子的 db hits 与页缓存统计
+
+        语句在显式事务中完整执行后回滚，写语句也不会提交。CALL { } IN TRANSACTIONS
+        会自行提交，直接拒绝；过程调用可能在自己的事务中提交，不声称已回滚
+        """
+        own = own_transactions(query)
+        if own == "in_transactions":
+            yield self.create_text_message(
+                "❌ Error: profile cannot run CALL { ... } IN TRANSACTIONS: its inner transactions commit on their own "
+                "and cannot be rolled back. Profile the subquery body instead."
+            )
+            return
+
+        with driver.session(database=database, bookmarks=bookmarks) as session:
+            tx = session.begin_transaction()
+            try:
+                result = tx.run(f"PROFILE {query}", parameters or {})
+                # consume 会让服务端执行完整个查询，统计才完整
+                summary = result.consume()
+            finally:
+                tx.rollback()
+
+        profile = summarize_profile(summary.profile)
+        response_data = {
+            "status": "success",
+            "operation": "profile",
+            "query_type": summary.query_type,
+            "server": self._server_address(summary),
+            "result_available_after": summary.result_available_after,
+            "result_consumed_after": summary.result_consumed_after,
+            **profile,
+            "rolled_back": own is None,
+            "message": f"✅ Profiled {len(profile['operators'])} operator(s), {profile['totals']['db_hits']} db hit(s); the transaction was rolled back",
+        }
+        if own == "procedure":
+            response_data["message"] += ", but procedures may commit transactions of their own, so their writes may persist"
+        yield self.create_json_message(response_data)
+
+    def _execute_schema_operation(self, driver, database: str, schema_key: tuple) -> Generator[ToolInvokeMessage, None, None]:
+        """
+        读取标签、关系类型、采样的属性类型、索引和约束，生成紧凑的摘要并缓存
+        """
+        with driver.session(database=database, default_access_mode=READ_ACCESS) as session:
+            schema = session.execute_read(build_schema)
+        entry = get_schema_cache().put(schema_key, schema)
+        yield self.create_json_message(self._schema_response(entry, cached=False))
+
+    def _schema_response(self, entry, cached: bool) -> dict:
+        return {
+            "status": "success",
+            "operation": "schema",
+            "schema": entry.schema,
+            "text": entry.text,
+            "cache": {"hit": cached, "age_seconds": round(time.monotonic() - entry.created_at, 1), **get_schema_cache().stats()},
+        }
+
+    def _export_metrics(self, metrics_format: str) -> Generator[ToolInvokeMessage, None, None]:
+        """
+        以 Prometheus 文本或 JSON 导出耗时直方图
+        """
+        if metrics_format == "prometheus":
+            yield self.create_text_message(metrics.export_prometheus() + get_query_classifier().export_prometheus())
+        elif metrics_format == "json":
+            yield self.create_json_message({
+                "status": "success",
+                "operation": "metrics",
+                "metrics": metrics.export_json(),
+                "classifier": get_query_classifier().stats(),
+            })
+        else:
+            yield self.create_text_message(f"❌ Error: Invalid metrics_format '{metrics_format}'. Must be one of: json, prometheus")
@@ -0,0 +1,365 @@
+import base64
+import hashlib
+import json
+from typing import NamedTuple
+
+from tools.cypher_utils import WRITE_CLAUSES, apply_result_limit, keyword_tokens, normalize_query, strip_statement, tokenize
+
+TOKEN_VERSION = 1
+PAGE_KEY_COLUMN = "__page_key"
+PAGE_ID_COLUMN = "__page_id"
+HIDDEN_COLUMNS = (PAGE_KEY_COLUMN, PAGE_ID_COLUMN)
+
+_CLAUSE_STARTS = frozenset({"MATCH", "OPTIONAL", "WITH", "UNWIND", "CALL"})
+_AGGREGATES = frozenset({"COUNT", "COLLECT", "SUM", "AVG", "MIN", "MAX", "PERCENTILECONT", "PERCENTILEDISC", "STDEV", "STDEVP"})
+_DIRECTIONS = {"ASC": False, "ASCENDING": False, "DESC": True, "DESCENDING": True}
+# 紧跟在模式变量之后的记号
+_VARIABLE_FOLLOWERS = frozenset({":", ")", "]", "{", "WHERE", "IS"})
+# keyset 只能用可以原样作为参数传回的键值
+_KEYSET_TYPES = (str, int, float)
+
+
+class PagePlan(NamedTuple):
+    mode: str
+    query: str
+    parameters: dict
+    take: int
+    has_more_possible: bool
+    # False 时页序不确定，翻页可能重复或遗漏行
+    deterministic: bool = True
+
+
+def query_fingerprint(query: str, parameters: dict | None = None) -> str:
+    """
+    Fingerprint of the statement text and parameters a token belongs to
+    """
+    material = normalize_query(query) + "\x00" + json.dumps(parameters or {}, sort_keys=True, default=str)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()[:16]
+
+
+def encode_token(state: dict) -> str:
+    raw = json.dumps({"v": TOKEN_VERSION, **state}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_token(token: str, fingerprint: str) -> dict:
+    """
+    Decode a continuation token and check that it belongs to this query
+    """
+    try:
+        padded = token.strip() + "=" * (-len(token.strip()) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise ValueError("continuation_token is not a valid token")
+    if not isinstance(state, dict) or state.get("v") != TOKEN_VERSION or state.get("mode") not in ("keyset", "skip"):
+        raise ValueError("continuation_token is not a valid token")
+    if state.get("fp") != fingerprint:
+        raise ValueError("continuation_token was issued for a different query or parameters")
+    return state
+
+
+class _Shape(NamedTuple):
+    statement: str
+    return_token: object
+    items_end: int
+    order_token: object | None
+    order_item: tuple | None
+    order_end: int
+    descending: bool
+    where_token: object | None
+    limit_value: int | None
+    limit_token: object | None
+    keyset: bool
+    tiebreak: tuple
+    deterministic: bool
+
+
+def _pattern_variables(tokens: list, start: int, end: int) -> list[str] | None:
+    """
+    Node and relationship variables a MATCH pattern binds to single entities
+
+    None when the pattern binds a path, a variable-length relationship or a
+    quantified path pattern group, whose values are lists or paths.
+    """
+    span = [t for t in tokens if start < t.start < end]
+    names = []
+    for index, token in enumerate(span[:-1]):
+        if token.kind != "word":
+            continue
+        if token.depth == 0 and span[index + 1].text == "=":
+            return None
+        if index == 0:
+            continue
+        opener = span[index - 1]
+        if opener.text not in ("(", "[") or span[index + 1].upper not in _VARIABLE_FOLLOWERS:
+            continue
+        if opener.depth != 0:
+            return None
+        if opener.text == "[":
+            close = next(i for i in range(index, len(span)) if span[i].text == "]" and span[i].depth == 0)
+            after = next((t for t in span[close + 1:] if t.text not in ("-", ">", "<")), None)
+            if any(t.text == "*" for t in span[index:close]) or (after is not None and after.text in ("{", "+", "*")):
+                return None
+        if token.text not in names:
+            names.append(token.text)
+    return names
+
+
+def _analyze(query: str) -> _Shape | None:
+    """
+    Locate the final RETURN, its ORDER BY and LIMIT, and decide whether a
+    keyset rewrite is possible; None when the statement cannot be paged
+    """
+    statement = strip_statement(query)
+    tokens = tokenize(statement)
+    if not tokens or any(t.text == ";" for t in tokens):
+        return None
+    top_level = [t for t in tokens if t.depth == 0]
+    keywords = keyword_tokens(tokens)
+    keyword_ids = {id(t) for t in keywords}
+    if top_level[0].upper in ("EXPLAIN", "PROFILE"):
+        return None
+    if any(t.depth == 0 and t.upper == "UNION" for t in keywords):
+        return None
+    if WRITE_CLAUSES.intersection(t.upper for t in keywords):
+        return None
+
+    top_keywords = [t for t in top_level if id(t) in keyword_ids]
+    returns = [i for i, t in enumerate(top_keywords) if t.upper == "RETURN"]
+    if not returns:
+        return None
+    return_position = returns[-1]
+    return_token = top_keywords[return_position]
+    tail = [t for t in top_level if t.start > return_token.start]
+    tail_keywords = [t for t in tail if id(t) in keyword_ids]
+    if any(t.upper in ("SKIP", "OFFSET") for t in tail_keywords):
+        return None
+
+    limit_token = next((t for t in tail_keywords if t.upper == "LIMIT"), None)
+    limit_value = None
+    if limit_token is not None:
+        remaining = [t for t in tail if t.start > limit_token.start]
+        if len(remaining) != 1 or remaining[0].kind != "number" or not remaining[0].text.isdigit():
+            return None
+        limit_value = int(remaining[0].text)
+
+    order_token = next((t for t in tail_keywords if t.upper == "ORDER"), None)
+    items_end_token = order_token or limit_token
+    items = [t for t in tail if items_end_token is None or t.start < items_end_token.start]
+    if not items:
+        return None
+    items_end = items[-1].end
+
+    # ORDER BY 的各项（到 LIMIT 为止）
+    order_item = None
+    order_end = items_end
+    descending = False
+    keyset = True
+    if order_token is None:
+        keyset = False
+    else:
+        order_tokens = [t for t in tail if t.start > order_token.start and (limit_token is None or t.start < limit_token.start)]
+        if order_tokens and order_tokens[0].upper == "BY":
+            order_tokens = order_tokens[1:]
+        if order_tokens:
+            order_end = order_tokens[-1].end
+        if order_tokens and order_tokens[-1].upper in _DIRECTIONS:
+            descending = _DIRECTIONS[order_tokens[-1].upper]
+            order_tokens = order_tokens[:-1]
+        if (
+            len(order_tokens) == 3
+            and order_tokens[0].kind in ("word", "quoted")
+            and order_tokens[1].text == "."
+            and order_tokens[2].kind in ("word", "quoted")
+        ):
+            order_item = (order_tokens[0], order_tokens[2])
+        else:
+            keyset = False
+
+    # 投影中有 DISTINCT 或聚合时，追加的隐藏列和排序项会改变结果
+    all_items = [t for t in tokens if return_token.start < t.start < items_end]
+    projection_ok = items[0].upper != "DISTINCT"
+    for index, token in enumerate(all_items[:-1]):
+        if token.kind == "word" and token.upper in _AGGREGATES and all_items[index + 1].text == "(":
+            projection_ok = False
+    # 被投影别名遮蔽的变量在 ORDER BY 中指向别名
+    aliases = {all_items[index + 1].text for index, t in enumerate(all_items[:-1]) if t.upper == "AS"}
+
+    # RETURN 前的最后一个子句必须是 MATCH，谓词才能进入它的 WHERE 并使用索引
+    where_token = None
+    match_token = None
+    preceding = top_keywords[:return_position]
+    clauses = [
+        (i, t) for i, t in enumerate(preceding)
+        if t.upper in _CLAUSE_STARTS and not (t.upper == "WITH" and i > 0 and preceding[i - 1].upper in ("STARTS", "ENDS"))
+    ]
+    if clauses and clauses[-1][1].upper == "MATCH" and not (clauses[-1][0] > 0 and preceding[clauses[-1][0] - 1].upper == "OPTIONAL"):
+        match_token = clauses[-1][1]
+        where_token = next((t for t in preceding[clauses[-1][0]:] if t.upper == "WHERE"), None)
+
+    # 行由哪些变量区分：最后一个 WITH 之后各 MATCH 绑定的实体和 UNWIND 的变量。
+    # WITH 之前有会产生多行的子句或出现 CALL 时无法确定，页序不确定
+    withs = [position for position, (_, t) in enumerate(clauses) if t.upper == "WITH"]
+    scoped = clauses[withs[-1] + 1:] if withs else clauses
+    earlier = clauses[:withs[-1]] if withs else []
+    variables = None
+    if projection_ok and not any(t.upper != "WITH" for _, t in earlier) and not any(t.upper == "CALL" for _, t in scoped):
+        variables = []
+        for position, (index, token) in enumerate(scoped):
+            end = scoped[position + 1][1].start if position + 1 < len(scoped) else return_token.start
+            if token.upper == "UNWIND":
+                alias = [t for t in tokens if token.start < t.start < end and t.depth == 0]
+                names = [alias[-1].text] if len(alias) >= 2 and alias[-2].upper == "AS" else None
+                template = "{}"
+            elif token.upper == "MATCH":
+                clause_where = next((t for t in preceding[index:] if t.upper == "WHERE" and t.start < end), None)
+                names = _pattern_variables(tokens, token.start, clause_where.start if clause_where else end)
+                template = "elementId({})"
+            else:
+                continue
+            # 被投影别名遮蔽的变量无法在 ORDER BY 中引用
+            if names is None or aliases.intersection(names):
+                variables = None
+                break
+            variables += [template.format(name) for name in names if template.format(name) not in variables]
+
+    # 只有单个节点模式、没有其他产生多行的子句时，排序变量才唯一确定一行，
+    # keyset 的 (键, elementId) 游标才不会漏掉并列的行
+    if keyset and variables is not None and match_token is not None and [t.upper for _, t in scoped] == ["MATCH"]:
+        pattern_end = where_token.start if where_token is not None else return_token.start
+        pattern = [t for t in top_level if match_token.start < t.start < pattern_end]
+        keyset = [t.text for t in pattern] == ["(", ")"] and variables == [f"elementId({order_item[0].text})"]
+    else:
+        keyset = False
+
+    # 按全部变量排序时页序确定；否则退回到最后一个 MATCH 的第一个节点，只能减少不确定性
+    deterministic = variables is not None
+    tiebreak = tuple(variables or ())
+    if variables is None and projection_ok and match_token is not None:
+        first = next((
+            t.text for index, t in enumerate(tokens)
+            if match_token.start < t.start < return_token.start and t.kind == "word" and t.depth == 1
+            and tokens[index - 1].text == "(" and tokens[index + 1].upper in _VARIABLE_FOLLOWERS
+        ), None)
+        if first is not None and first not in aliases:
+            tiebreak = (f"elementId({first})",)
+
+    return _Shape(statement, return_token, items_end, order_token, order_item, order_end, descending, where_token, limit_value, limit_token, keyset, tiebreak, deterministic)
+
+
+def _keyset_statement(shape: _Shape, after: dict | None) -> str:
+    statement = shape.statement
+    variable, key = shape.order_item
+    key_text = f"{variable.text}.{key.text}"
+    id_text = f"elementId({variable.text})"
+    direction = " DESC" if shape.descending else ""
+    comparison = "<" if shape.descending else ">"
+
+    edits = []
+    # ORDER BY 追加 elementId 作为并列时的次序
+    edits.append((shape.order_end, f", {id_text}{direction}"))
+    edits.append((shape.items_end, f", {key_text} AS {PAGE_KEY_COLUMN}, {id_text} AS {PAGE_ID_COLUMN}"))
+    if after is not None:
+        # 范围条件可以走索引，第二个条件只用于跳过并列的已读行。与上一个键
+        # 无法比较的行（null 或其他类型）比较结果为 null，最后一个分支保留
+        # 它们；已读的行都与该键同类型（见 next_state），这些行只会排在后面
+        predicate = (
+            f"({key_text} {comparison}= ${PAGE_KEY_COLUMN} AND "
+            f"({key_text} {comparison} ${PAGE_KEY_COLUMN} OR {id_text} {comparison} ${PAGE_ID_COLUMN}))"
+            f" OR ({key_text} {comparison} ${PAGE_KEY_COLUMN}) IS NULL"
+        )
+        if shape.where_token is not None:
+            edits.append((shape.where_token.end, " ("))
+            edits.append((shape.return_token.start, f") AND ({predicate})\n"))
+        else:
+            edits.append((shape.return_token.start, f"WHERE {predicate}\n"))
+
+    for position, text in sorted(edits, key=lambda edit: edit[0], reverse=True):
+        statement = statement[:position] + text + statement[position:]
+    return statement
+
+
+def _skip_statement(shape: _Shape) -> str:
+    statement = shape.statement
+    # 同一位置的插入按列表顺序，后插入的排在前面
+    edits = []
+    if shape.limit_token is not None:
+        edits.append((shape.limit_token.start, "SKIP $__page_skip "))
+    else:
+        edits.append((len(statement), "\nSKIP $__page_skip"))
+    if shape.tiebreak:
+        # SKIP 需要确定的行序：追加区分各行的变量作为排序项
+        # 与 keyset 页的次序一致，模式切换时页边界不变
+        direction = " DESC" if shape.keyset and shape.descending else ""
+        order_text = ", ".join(f"{item}{direction}" for item in shape.tiebreak)
+        if shape.order_token is not None:
+            edits.append((shape.order_end, f", {order_text}"))
+        else:
+            edits.append((shape.items_end, f"\nORDER BY {order_text}"))
+    for position, text in sorted(edits, key=lambda edit: edit[0], reverse=True):
+        statement = statement[:position] + text + statement[position:]
+    return statement
+
+
+def plan_page(query: str, page_size: int, state: dict | None = None) -> PagePlan | None:
+    """
+    Rewrite a read statement to fetch one page
+
+    A keyset page is used when the final RETURN is ordered by a single
+    ``variable.property`` and that variable is the only thing producing rows
+    (one node pattern, no other MATCH, UNWIND or CALL): the next page filters
+    on the last key (with ``elementId`` breaking ties) instead of skipping
+    rows. Otherwise the page uses ``SKIP``, ordered after any ORDER BY by
+    every variable that tells rows apart (``elementId`` of matched entities,
+    UNWIND values). When those variables cannot be determined (CALL, paths,
+    variable-length relationships, clauses before a WITH) the page order is
+    not deterministic. Returns None when the statement cannot be paged.
+    """
+    shape = _analyze(query)
+    if shape is None:
+        return None
+    state = state or {}
+    offset = int(state.get("offset", 0))
+    remaining = None if shape.limit_value is None else max(shape.limit_value - offset, 0)
+    take = page_size if remaining is None else min(page_size, remaining)
+    has_more_possible = remaining is None or remaining > take
+
+    mode = state.get("mode") or ("keyset" if shape.keyset else "skip")
+    if mode == "keyset" and shape.keyset:
+        after = {PAGE_KEY_COLUMN: state["key"], PAGE_ID_COLUMN: state["id"]} if "key" in state else None
+        statement = _keyset_statement(shape, after)
+        parameters = after or {}
+    else:
+        mode = "skip"
+        statement = _skip_statement(shape)
+        parameters = {"__page_skip": offset}
+
+    statement, _ = apply_result_limit(statement, take + 1 if has_more_possible else take)
+    return PagePlan(mode, statement, parameters, take, has_more_possible, shape.deterministic)
+
+
+def key_kind(value) -> str | None:
+    """
+    Comparison class of a keyset key: "string", "number" or None
+    """
+    if isinstance(value, bool) or not isinstance(value, _KEYSET_TYPES):
+        return None
+    return "string" if isinstance(value, str) else "number"
+
+
+def next_state(plan: PagePlan, state: dict | None, fingerprint: str, rows: int, last_key=None, last_id=None, key_kinds: set | None = None) -> dict:
+    """
+    State for the token of the following page
+
+    ``key_kinds`` are the key classes seen on this page. Keyset paging
+    continues only while every key read so far has the same class, so rows
+    that cannot be compared with the last key (nulls, other types) are known
+    to come after it.
+    """
+    offset = int((state or {}).get("offset", 0)) + rows
+    kind = key_kind(last_key)
+    previous = key_kind((state or {}).get("key")) if state and "key" in state else kind
+    if plan.mode == "keyset" and kind is not None and previous == kind and (key_kinds is None or key_kinds == {kind}):
+        return {"fp": fingerprint, "mode": "keyset", "offset": offset, "key": last_key, "id": last_id}
+    # 键值为空、类型混杂或无法作为参数传回时，后续页退回到 SKIP
+    return {"fp": fingerprint, "mode": "skip", "offset": offset}
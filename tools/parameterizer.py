@@ -0,0 +1,170 @@
+import re
+import threading
+from functools import lru_cache
+
+from tools.cypher_utils import keyword_tokens, normalize_query, tokenize
+
+# 这些语句中的字面量不能替换为参数（schema 和管理命令）
+_UNSUPPORTED_STATEMENTS = frozenset({"SHOW", "DROP", "ALTER", "GRANT", "DENY", "REVOKE", "START", "STOP", "TERMINATE", "USE"})
+_SCHEMA_OBJECTS = frozenset({"INDEX", "CONSTRAINT", "DATABASE", "ALIAS", "USER", "ROLE", "COMPOSITE", "FULLTEXT", "RANGE", "TEXT", "POINT", "LOOKUP", "VECTOR", "BTREE"})
+# RETURN 投影中的字面量决定列名，遇到这些关键字时投影结束
+_PROJECTION_END = frozenset({"ORDER", "SKIP", "OFFSET", "LIMIT", "UNION"})
+# 路径选择器的数量（SHORTEST 2、ANY 3）必须是字面量
+_PATH_SELECTORS = frozenset({"SHORTEST", "ANY", "ALL"})
+
+_ESCAPES = {"\\": "\\", "'": "'", '"': '"', "n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f"}
+_ESCAPE_PATTERN = re.compile(r"\\(u[0-9a-fA-F]{4}|U[0-9a-fA-F]{8}|.)", re.DOTALL)
+
+
+def _unescape(literal: str) -> str | None:
+    """
+    Decode a Cypher string literal, or None for escapes we do not understand
+    """
+    body = literal[1:-1]
+    unknown = False
+
+    def replace(match):
+        nonlocal unknown
+        escape = match.group(1)
+        if escape[0] in "uU" and len(escape) > 1:
+            return chr(int(escape[1:], 16))
+        if escape in _ESCAPES:
+            return _ESCAPES[escape]
+        unknown = True
+        return escape
+
+    value = _ESCAPE_PATTERN.sub(replace, body)
+    return None if unknown else value
+
+
+def _quantifier_ranges(tokens: list) -> list[tuple[int, int]]:
+    """
+    Spans of quantified path pattern bounds such as ``((a)-->(b)){1,3}``
+
+    A ``{`` right after ``)`` holding only numbers and commas is a
+    quantifier; ``CALL (x) { ... }`` subqueries hold clauses instead.
+    """
+    ranges = []
+    for index, token in enumerate(tokens[1:], 1):
+        if token.text != "{" or tokens[index - 1].text != ")":
+            continue
+        end = index + 1
+        while end < len(tokens) and (tokens[end].kind == "number" or tokens[end].text == ","):
+            end += 1
+        if end < len(tokens) and tokens[end].text == "}":
+            ranges.append((token.start, tokens[end].end))
+    return ranges
+
+
+def _number(text: str):
+    if text.lower().startswith("0x"):
+        return int(text, 16)
+    if text.lower().startswith("0o"):
+        return int(text, 8)
+    if any(c in text for c in ".eE"):
+        return float(text)
+    return int(text)
+
+
+@lru_cache(maxsize=512)
+def auto_parameterize(query: str) -> tuple[str, tuple]:
+    """
+    Rewrite string and number literals into ``$p0 … $pn`` parameters
+
+    Returns the rewritten statement and a tuple of (name, value) pairs; the
+    rewrite is memoized per query text. Literals are left in place where
+    parameters are not allowed or would change the result: schema and admin
+    commands, variable-length bounds, quantified path pattern bounds, path
+    selector counts (``SHORTEST 2``), ``FIELDTERMINATOR`` and RETURN
+    projections (Neo4j derives column names from the projection text).
+    """
+    tokens = tokenize(query)
+    keywords = {id(t) for t in keyword_tokens(tokens)}
+    first_words = [t.upper for t in tokens[:3] if id(t) in keywords]
+    if first_words and first_words[0] in ("EXPLAIN", "PROFILE"):
+        first_words = first_words[1:]
+    if first_words and (
+        first_words[0] in _UNSUPPORTED_STATEMENTS
+        or (first_words[0] in ("CREATE", "DROP") and len(first_words) > 1 and first_words[1] in _SCHEMA_OBJECTS)
+    ):
+        return query, ()
+
+    quantifiers = _quantifier_ranges(tokens)
+    parts = []
+    parameters = []
+    position = 0
+    in_projection = False
+    projection_depth = 0
+    for index, token in enumerate(tokens):
+        if id(token) in keywords:
+            if token.upper == "RETURN":
+                in_projection = True
+                projection_depth = token.depth
+            elif token.upper in _PROJECTION_END or token.depth < projection_depth:
+                in_projection = False
+            continue
+        if token.text == "}" and token.depth < projection_depth:
+            in_projection = False
+        if in_projection or token.kind not in ("string", "number"):
+            continue
+        previous = tokens[index - 1].text if index > 0 else ""
+        following = tokens[index + 1].text if index + 1 < len(tokens) else ""
+        # 变长关系的跳数（*1..3）必须是字面量
+        if token.kind == "number" and (previous in ("*", ".") or following == "."):
+            continue
+        if index > 0 and id(tokens[index - 1]) in keywords:
+            keyword = tokens[index - 1].upper
+            if (token.kind == "number" and keyword in _PATH_SELECTORS) or keyword == "FIELDTERMINATOR":
+                continue
+        if any(start < token.start < end for start, end in quantifiers):
+            continue
+        value = _unescape(token.text) if token.kind == "string" else _number(token.text)
+        if value is None:
+            continue
+        name = f"p{len(parameters)}"
+        parts.append(query[position:token.start])
+        parts.append(f"${name}")
+        position = token.end
+        parameters.append((name, value))
+
+    if not parameters:
+        return query, ()
+    parts.append(query[position:])
+    return "".join(parts), tuple(parameters)
+
+
+class PlanningStats:
+    """
+    Track time-to-first-record per query shape to estimate planning savings
+
+    The first execution of a shape pays for planning; later executions of the
+    same parameterized text should hit the server's plan cache, so the drop in
+    ``result_available_after`` approximates the planning time saved.
+    """
+
+    def __init__(self, max_shapes: int = 1024):
+        self.max_shapes = max_shapes
+        self._shapes: dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def record(self, query: str, available_after: int | None) -> dict:
+        """
+        Record one execution and return the measurement for the response
+        """
+        shape = normalize_query(query)
+        with self._lock:
+            stats = self._shapes.get(shape)
+            if stats is None:
+                if len(self._shapes) >= self.max_shapes:
+                    self._shapes.pop(next(iter(self._shapes)))
+                stats = self._shapes[shape] = [0, available_after]
+            stats[0] += 1
+            executions, first = stats
+        measurement = {"shape_executions": executions, "result_available_after_ms": available_after}
+        if executions > 1 and first is not None and available_after is not None:
+            measurement["first_available_after_ms"] = first
+            measurement["estimated_planning_saved_ms"] = max(first - available_after, 0)
+        return measurement
+
+
+planning_stats = PlanningStats()
@@ -0,0 +1,227 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, NamedTuple
+
+from tools.cypher_utils import normalize_query, strip_statement, tokenize
+from tools.driver_registry import env_number
+
+GUARD_MODES = ("off", "warn", "reject")
+# 检查需要额外一次 EXPLAIN 往返，默认关闭，按需开启
+DEFAULT_GUARD_MODE = "off"
+DEFAULT_MAX_ESTIMATED_ROWS = 1_000_000
+# 通常意味着全库扫描或笛卡尔积的算子
+DEFAULT_FLAGGED_OPERATORS = ("AllNodesScan", "CartesianProduct")
+DEFAULT_MAX_ENTRIES = 1024
+# 新建索引后计划会变化，判定结果只保留一段时间
+DEFAULT_TTL = 300.0
+
+
+def guard_mode() -> str:
+    mode = os.environ.get("NEO4J_COST_GUARD", "").strip().lower()
+    return mode if mode in GUARD_MODES else DEFAULT_GUARD_MODE
+
+
+def flagged_operators() -> frozenset:
+    raw = os.environ.get("NEO4J_COST_GUARD_OPERATORS")
+    if raw is None or not raw.strip():
+        return frozenset(DEFAULT_FLAGGED_OPERATORS)
+    return frozenset(name.strip() for name in raw.split(",") if name.strip())
+
+
+def is_explainable(query: str) -> bool:
+    """
+    Whether EXPLAIN can be prefixed: a single statement not already EXPLAIN/PROFILE
+    """
+    tokens = tokenize(strip_statement(query))
+    if not tokens or any(t.text == ";" for t in tokens):
+        return False
+    return tokens[0].upper not in ("EXPLAIN", "PROFILE")
+
+
+def _operator_name(plan: dict) -> str:
+    # 5.x 起算子名带有运行时后缀，如 AllNodesScan@neo4j
+    return str(plan.get("operatorType", "")).split("@")[0]
+
+
+def _arguments(plan: dict) -> dict:
+    return plan.get("args") or plan.get("arguments") or {}
+
+
+def _walk(plan: dict, depth: int = 0):
+    yield plan, depth
+    for child in plan.get("children") or ():
+        yield from _walk(child, depth + 1)
+
+
+class PlanFacts(NamedTuple):
+    operators: tuple
+    estimated_rows: float
+
+
+def plan_facts(plan: dict | None) -> PlanFacts:
+    """
+    Distinct operator names and the largest row estimate in an EXPLAIN plan
+    """
+    if not plan:
+        return PlanFacts((), 0.0)
+    operators = []
+    estimated_rows = 0.0
+    for node, _ in _walk(plan):
+        name = _operator_name(node)
+        if name and name not in operators:
+            operators.append(name)
+        estimate = _arguments(node).get("EstimatedRows")
+        if isinstance(estimate, (int, float)):
+            estimated_rows = max(estimated_rows, float(estimate))
+    return PlanFacts(tuple(operators), estimated_rows)
+
+
+class PlanVerdict(NamedTuple):
+    action: str
+    reasons: list
+    operators: tuple
+    estimated_rows: float
+    cached: bool
+
+    def as_dict(self) -> dict:
+        return {
+            "action": self.action,
+            "reasons": self.reasons,
+            "operators": list(self.operators),
+            "estimated_rows": round(self.estimated_rows),
+            "cached": self.cached,
+        }
+
+
+class _PlanEntry:
+    __slots__ = ("facts", "expires_at")
+
+    def __init__(self, facts, expires_at):
+        self.facts = facts
+        self.expires_at = expires_at
+
+
+class PlanGuard:
+    """
+    Pre-flight cost check of a statement using its EXPLAIN plan
+
+    The operators and row estimate of each plan are kept in an LRU keyed by
+    (uri, database) and the normalized statement, so a repeated query is
+    judged without another round trip. Thresholds are applied on every check,
+    so changing them takes effect for cached plans too.
+    """
+
+    def __init__(self, max_entries: int | None = None, ttl: float | None = None):
+        self.max_entries = max_entries or env_number("NEO4J_PLAN_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+        self.ttl = ttl or env_number("NEO4J_PLAN_CACHE_TTL", DEFAULT_TTL, float)
+        self.max_estimated_rows = env_number("NEO4J_COST_GUARD_MAX_ROWS", DEFAULT_MAX_ESTIMATED_ROWS, float)
+        self.flagged_operators = flagged_operators()
+        self._entries: OrderedDict[tuple, _PlanEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejections = 0
+        self.warnings = 0
+
+    def check(self, scope: tuple, query: str, explain: Callable[[], dict | None], mode: str) -> PlanVerdict:
+        """
+        Judge a statement, calling explain() only when its plan is not cached
+        """
+        key = (scope, normalize_query(query))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                facts = entry.facts
+            else:
+                facts = None
+                self.misses += 1
+
+        cached = facts is not None
+        if facts is None:
+            # EXPLAIN 在锁外执行，并发的相同查询可能各自执行一次
+            facts = plan_facts(explain())
+            with self._lock:
+                self._entries[key] = _PlanEntry(facts, now + self.ttl)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+
+        reasons = [f"plan contains {name}" for name in facts.operators if name in self.flagged_operators]
+        if facts.estimated_rows > self.max_estimated_rows:
+            reasons.append(f"estimated {round(facts.estimated_rows)} rows exceeds the limit of {round(self.max_estimated_rows)}")
+        action = mode if reasons else "allow"
+        with self._lock:
+            if action == "reject":
+                self.rejections += 1
+            elif action == "warn":
+                self.warnings += 1
+        return PlanVerdict(action, reasons, facts.operators, facts.estimated_rows, cached)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "warnings": self.warnings,
+                "rejections": self.rejections,
+            }
+
+
+def summarize_profile(profile: dict | None) -> dict:
+    """
+    Flatten a PROFILE tree into per-operator rows with db-hit and page-cache totals
+    """
+    operators = []
+    totals = {"db_hits": 0, "page_cache_hits": 0, "page_cache_misses": 0}
+    for node, depth in _walk(profile or {}):
+        if not node:
+            continue
+        arguments = _arguments(node)
+        row = {
+            "operator": _operator_name(node),
+            "depth": depth,
+            "details": arguments.get("Details"),
+            "rows": node.get("rows", arguments.get("Rows")),
+            "estimated_rows": arguments.get("EstimatedRows"),
+            "db_hits": node.get("dbHits", arguments.get("DbHits", 0)),
+            "page_cache_hits": node.get("pageCacheHits", arguments.get("PageCacheHits", 0)),
+            "page_cache_misses": node.get("pageCacheMisses", arguments.get("PageCacheMisses", 0)),
+            "time_ms": round(node.get("time", arguments.get("Time", 0)) / 1_000_000, 3),
+        }
+        for name in totals:
+            totals[name] += row[name] or 0
+        operators.append(row)
+    lookups = totals["page_cache_hits"] + totals["page_cache_misses"]
+    totals["page_cache_hit_ratio"] = round(totals["page_cache_hits"] / lookups, 4) if lookups else None
+    return {"operators": operators, "totals": totals}
+
+
+_guard: PlanGuard | None = None
+_guard_lock = threading.Lock()
+
+
+def get_plan_guard() -> PlanGuard:
+    """
+    Return the process-wide plan guard, creating it on first use
+    """
+    global _guard
+    if _guard is None:
+        with _guard_lock:
+            if _guard is None:
+                _guard = PlanGuard()
+    return _guard
@@ -0,0 +1,250 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, NamedTuple
+
+from tools.cypher_utils import WRITE_CLAUSES, keyword_tokens, strip_statement, tokenize
+from tools.driver_registry import env_number
+
+DEFAULT_MAX_ENTRIES = 1024
+# 管理命令：索引、约束、数据库、用户和权限的变更，只在语句开头识别
+_ADMIN_KEYWORDS = frozenset({"DROP", "ALTER", "GRANT", "DENY", "REVOKE", "START", "STOP", "TERMINATE", "RENAME", "ENABLE", "DEALLOCATE", "REALLOCATE"})
+# 只读语句可以用来开头的子句；其他未知的开头交给 EXPLAIN 判断
+_READ_LEADING_KEYWORDS = frozenset({"MATCH", "OPTIONAL", "WITH", "UNWIND", "RETURN", "CALL", "SHOW", "LET", "FILTER", "FINISH"})
+# EXPLAIN 返回的 query_type 中只有 "r" 表示只读
+_READ_ONLY_QUERY_TYPE = "r"
+_FALSE_VALUES = ("0", "false", "off", "no")
+
+
+def auto_route_default() -> bool:
+    return os.environ.get("NEO4J_AUTO_ROUTE_READS", "true").strip().lower() not in _FALSE_VALUES
+
+
+def explain_fallback_enabled() -> bool:
+    return os.environ.get("NEO4J_CLASSIFIER_EXPLAIN", "true").strip().lower() not in _FALSE_VALUES
+
+
+def _leading_keyword(tokens: list) -> str | None:
+    """
+    The statement's first clause keyword, after CYPHER options and USE <graph>
+    """
+    index = 0
+    while index < len(tokens):
+        token = tokens[index]
+        if token.kind != "word":
+            return None
+        if token.upper == "CYPHER":
+            index += 1
+            # CYPHER 25、CYPHER runtime=slotted 等选项
+            while index < len(tokens):
+                if tokens[index].kind == "number":
+                    index += 1
+                elif index + 2 < len(tokens) and tokens[index + 1].text == "=":
+                    index += 3
+                else:
+                    break
+            continue
+        if token.upper == "USE":
+            index += 2
+            # 复合数据库名 a.b
+            while index + 1 < len(tokens) and tokens[index].text == ".":
+                index += 2
+            continue
+        return token.upper
+    return None
+
+
+def _is_admin(tokens: list, keywords: list) -> bool:
+    if _leading_keyword(tokens) in _ADMIN_KEYWORDS:
+        return True
+    # SHOW TRANSACTIONS ... TERMINATE TRANSACTIONS 组合在顶层出现
+    keyword_ids = {id(t) for t in keywords}
+    return any(
+        token.upper == "TERMINATE" and token.depth == 0 and id(token) in keyword_ids
+        and index + 1 < len(tokens) and tokens[index + 1].upper in ("TRANSACTION", "TRANSACTIONS")
+        for index, token in enumerate(tokens)
+    )
+
+
+def _call_kinds(tokens: list, keyword_ids: set) -> tuple[bool, bool]:
+    """
+    (CALL { ... } IN TRANSACTIONS, procedure call) found among the tokens
+    """
+    in_transactions = procedure_call = False
+    for index, token in enumerate(tokens):
+        if id(token) not in keyword_ids:
+            continue
+        following = tokens[index + 1:index + 4]
+        # IN [n] [CONCURRENT] TRANSACTIONS 在独立的事务中提交，不能放进读事务
+        if token.upper == "IN" and any(id(t) in keyword_ids and t.upper == "TRANSACTIONS" for t in following):
+            in_transactions = True
+        # CALL 后紧跟过程名（而不是子查询的 "{" 或 "("）
+        if token.upper == "CALL" and following and following[0].kind in ("word", "quoted"):
+            procedure_call = True
+    return in_transactions, procedure_call
+
+
+def own_transactions(query: str) -> str | None:
+    """
+    Why a statement may commit outside the caller's transaction, if it can
+
+    "in_transactions" for ``CALL { ... } IN TRANSACTIONS`` and "procedure"
+    for procedure calls, which may open and commit transactions of their own.
+    """
+    tokens = tokenize(strip_statement(query))
+    in_transactions, procedure_call = _call_kinds(tokens, {id(t) for t in keyword_tokens(tokens)})
+    if in_transactions:
+        return "in_transactions"
+    return "procedure" if procedure_call else None
+
+
+def classify_tokens(query: str) -> str:
+    """
+    "read", "write" or "unknown" for a statement, from its tokens alone
+
+    Write clauses, CALL { ... } IN TRANSACTIONS and administration commands
+    (recognized only as the leading clause, so variables such as ``start``
+    do not count) make a statement a write. Procedure calls may write, and multiple
+    statements, EXPLAIN/PROFILE and statements opening with a clause not known
+    to read are not judged, so those are unknown.
+    """
+    tokens = tokenize(strip_statement(query))
+    if not tokens or any(t.text == ";" for t in tokens):
+        return "unknown"
+    if tokens[0].upper in ("EXPLAIN", "PROFILE"):
+        return "unknown"
+    keywords = keyword_tokens(tokens)
+    words = {t.upper for t in keywords}
+    if WRITE_CLAUSES.intersection(words) or _is_admin(tokens, keywords):
+        return "write"
+
+    in_transactions, procedure_call = _call_kinds(tokens, {id(t) for t in keywords})
+    if in_transactions:
+        return "write"
+    if procedure_call or _leading_keyword(tokens) not in _READ_LEADING_KEYWORDS:
+        return "unknown"
+    return "read"
+
+
+class Classification(NamedTuple):
+    kind: str
+    source: str
+    cached: bool
+
+
+class QueryClassifier:
+    """
+    Cached read/write classification of single statements
+
+    The tokenizer decides most statements; when it cannot (procedure calls),
+    an optional EXPLAIN reports the planner's query_type. Results are kept in
+    an LRU keyed by (uri, database) and the statement text. Every check is
+    counted against the operation the caller declared, so statements labelled
+    as writes that only read, and reads that write, show up as
+    misclassifications.
+    """
+
+    def __init__(self, max_entries: int | None = None):
+        self.max_entries = max_entries or env_number("NEO4J_CLASSIFIER_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+        self._entries: OrderedDict[tuple, tuple] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.explained = 0
+        self.checked: dict[str, int] = {}
+        self.misclassified: dict[str, int] = {}
+
+    def classify(self, scope: tuple, query: str, declared: str, explain: Callable[[], str | None] | None = None) -> Classification:
+        """
+        Classify a statement, calling explain() only when the tokens are inconclusive
+        """
+        key = (scope, query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        cached = entry is not None and not (entry[0] == "unknown" and explain is not None)
+        if not cached:
+            kind, source = classify_tokens(query), "tokens"
+            if kind == "unknown" and explain is not None:
+                # EXPLAIN 在锁外执行，只规划不执行
+                query_type = explain()
+                if query_type:
+                    kind, source = ("read" if query_type == _READ_ONLY_QUERY_TYPE else "write"), "explain"
+                with self._lock:
+                    self.explained += 1
+            entry = (kind, source)
+            with self._lock:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        kind, source = entry
+        self._record(declared, kind)
+        return Classification(kind, source, cached)
+
+    def _record(self, declared: str, kind: str) -> None:
+        actual = "query" if kind == "read" else "write"
+        expected = "query" if declared == "query" else "write"
+        with self._lock:
+            self.checked[declared] = self.checked.get(declared, 0) + 1
+            if kind != "unknown" and actual != expected:
+                label = f"{declared}->{kind}"
+                self.misclassified[label] = self.misclassified.get(label, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "explained": self.explained,
+                "checked": dict(self.checked),
+                "misclassified": dict(self.misclassified),
+            }
+
+    def export_prometheus(self) -> str:
+        """
+        Misclassification counters in Prometheus text exposition format
+        """
+        with self._lock:
+            checked = sorted(self.checked.items())
+            misclassified = sorted(self.misclassified.items())
+        lines = [
+            "# HELP neo4j_connector_classified_total Statements classified, by declared operation",
+            "# TYPE neo4j_connector_classified_total counter",
+        ]
+        lines += [f'neo4j_connector_classified_total{{declared="{declared}"}} {count}' for declared, count in checked]
+        lines += [
+            "# HELP neo4j_connector_misclassified_total Statements whose declared operation did not match what they do",
+            "# TYPE neo4j_connector_misclassified_total counter",
+        ]
+        for label, count in misclassified:
+            declared, actual = label.split("->")
+            lines.append(f'neo4j_connector_misclassified_total{{declared="{declared}",actual="{actual}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+_classifier: QueryClassifier | None = None
+_classifier_lock = threading.Lock()
+
+
+def get_query_classifier() -> QueryClassifier:
+    """
+    Return the process-wide query classifier, creating it on first use
+    """
+    global _classifier
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                _classifier = QueryClassifier()
+    return _classifier
@@ -0,0 +1,173 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from tools.cypher_utils import keyword_tokens, normalize_query, pattern_labels, tokenize
+from tools.driver_registry import env_number
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+DEFAULT_TTL = 60.0
+
+# 出现这些子句时写操作可能修改已存在的实体，只能整体失效
+_MUTATING_CLAUSES = frozenset({"SET", "REMOVE", "DELETE", "DETACH", "MERGE", "FOREACH", "CALL"})
+
+
+def _approximate_size(value) -> int:
+    return len(json.dumps(value, ensure_ascii=False, default=str))
+
+
+class _CacheEntry:
+    __slots__ = ("value", "size", "expires_at", "scope", "labels")
+
+    def __init__(self, value, size, expires_at, scope, labels):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.scope = scope
+        self.labels = labels
+
+
+class ResultCache:
+    """
+    In-process LRU cache for read results, bounded by entry count and
+    approximate byte size, with a per-entry TTL
+
+    Entries are scoped to (uri, database) so writes can invalidate them, either
+    wholesale or only those touching the labels a write changed.
+    """
+
+    def __init__(self, max_entries: int | None = None, max_bytes: int | None = None):
+        self.max_entries = max_entries or env_number("NEO4J_RESULT_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+        self.max_bytes = max_bytes or env_number("NEO4J_RESULT_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+        self._entries: OrderedDict[tuple, _CacheEntry] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(scope: tuple, identity: tuple, query: str, parameters: dict | None = None, **options) -> tuple:
+        """
+        Build a cache key from the normalized query text, parameters and options
+
+        identity is the driver registry key, so a cached result is only served
+        to callers presenting the same credentials.
+        """
+        encoded_parameters = json.dumps(parameters or {}, sort_keys=True, default=str)
+        encoded_options = tuple(sorted(options.items()))
+        return (scope, identity, normalize_query(query), encoded_parameters, encoded_options)
+
+    def get(self, key: tuple):
+        """
+        Return the cached value or None, counting a hit or miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def put(self, key: tuple, value, query: str, ttl: float | None = None) -> bool:
+        """
+        Store a value; results larger than the byte budget are not cached
+        """
+        size = _approximate_size(value)
+        if size > self.max_bytes:
+            return False
+        entry = _CacheEntry(value, size, time.monotonic() + (ttl or DEFAULT_TTL), key[0], pattern_labels(query))
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+        return True
+
+    def _remove(self, key: tuple) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def invalidate(self, scope: tuple, labels: frozenset | None = None) -> int:
+        """
+        Drop entries for the scope; with labels, only entries that may touch them
+        """
+        with self._lock:
+            stale = [
+                key for key, entry in self._entries.items()
+                if entry.scope == scope and (labels is None or entry.labels is None or entry.labels & labels)
+            ]
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def invalidate_for_write(self, scope: tuple, query: str, counters) -> int:
+        """
+        Invalidate after a write, scoped by label when the counters allow it
+
+        Label-scoped invalidation is only used for pure creations: no deletions
+        or label removals in the counters and no clause that could modify
+        existing entities. Anything else invalidates the whole scope.
+        """
+        if not self._entries or not counters.contains_updates:
+            return 0
+        labels = None
+        if not (counters.nodes_deleted or counters.relationships_deleted or counters.labels_removed):
+            keywords = {token.upper for token in keyword_tokens(tokenize(query))}
+            if not keywords & _MUTATING_CLAUSES:
+                labels = pattern_labels(query)
+        return self.invalidate(scope, labels)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Hit-rate and eviction counters
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+
+_cache: ResultCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> ResultCache:
+    """
+    Return the process-wide result cache, creating it on first use
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResultCache()
+    return _cache
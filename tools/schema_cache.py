@@ -0,0 +1,245 @@
+import threading
+import time
+
+from tools.cypher_utils import pattern_labels, quote_identifier
+from tools.driver_registry import env_number
+
+DEFAULT_TTL = 300.0
+DEFAULT_SAMPLE_SIZE = 100
+# 每种关系类型最多保留的起止标签组合
+MAX_PATTERNS_PER_TYPE = 5
+
+_SHOW_INDEXES = (
+    "SHOW INDEXES YIELD name, type, entityType, labelsOrTypes, properties, state "
+    "WHERE type <> 'LOOKUP' RETURN name, type, entityType, labelsOrTypes, properties, state"
+)
+_SHOW_CONSTRAINTS = "SHOW CONSTRAINTS YIELD name, type, entityType, labelsOrTypes, properties RETURN name, type, entityType, labelsOrTypes, properties"
+
+
+def schema_sample_size() -> int:
+    return env_number("NEO4J_SCHEMA_SAMPLE_SIZE", DEFAULT_SAMPLE_SIZE)
+
+
+def value_type(value) -> str:
+    """
+    Cypher type name of a property value
+    """
+    if isinstance(value, bool):
+        return "BOOLEAN"
+    if isinstance(value, int):
+        return "INTEGER"
+    if isinstance(value, float):
+        return "FLOAT"
+    if isinstance(value, str):
+        return "STRING"
+    if isinstance(value, (list, tuple)):
+        inner = sorted({value_type(item) for item in value})
+        return f"LIST<{'|'.join(inner) or 'ANY'}>"
+    from neo4j.spatial import Point
+    from neo4j.time import Date, DateTime, Duration, Time
+
+    if isinstance(value, DateTime):
+        return "DATETIME" if value.tzinfo is not None else "LOCAL DATETIME"
+    if isinstance(value, Date):
+        return "DATE"
+    if isinstance(value, Time):
+        return "TIME" if value.tzinfo is not None else "LOCAL TIME"
+    if isinstance(value, Duration):
+        return "DURATION"
+    if isinstance(value, Point):
+        return "POINT"
+    if isinstance(value, (bytes, bytearray)):
+        return "BYTES"
+    return type(value).__name__.upper()
+
+
+def _merge_types(properties: dict, sample: dict) -> None:
+    for key, value in sample.items():
+        properties.setdefault(key, set()).add(value_type(value))
+
+
+def _format_types(properties: dict) -> dict:
+    return {key: "|".join(sorted(types)) for key, types in sorted(properties.items())}
+
+
+def _sample_statement(labels: list, types: list) -> str:
+    """
+    One UNION ALL statement sampling every label and relationship type
+    """
+    parts = []
+    for index, label in enumerate(labels):
+        parts.append(
+            f"MATCH (n:{quote_identifier(label)}) WITH n LIMIT $sample "
+            f"RETURN 'label' AS kind, $labels[{index}] AS name, properties(n) AS properties, [] AS start, [] AS end"
+        )
+    for index, rel_type in enumerate(types):
+        parts.append(
+            f"MATCH (a)-[r:{quote_identifier(rel_type)}]->(b) WITH a, r, b LIMIT $sample "
+            f"RETURN 'type' AS kind, $types[{index}] AS name, properties(r) AS properties, labels(a) AS start, labels(b) AS end"
+        )
+    return "\nUNION ALL\n".join(parts)
+
+
+def _describe_index(row) -> str:
+    entity = f"(:{'|'.join(row['labelsOrTypes'] or [])})" if row["entityType"] == "NODE" else f"()-[:{'|'.join(row['labelsOrTypes'] or [])}]-()"
+    text = f"{row['type']} {row['name']} FOR {entity} ON ({', '.join(row['properties'] or [])})"
+    if row.get("state") not in (None, "ONLINE"):
+        text += f" [{row['state']}]"
+    return text
+
+
+def build_schema(tx, sample_size: int | None = None) -> dict:
+    """
+    Collect labels, relationship types, sampled property types, indexes and
+    constraints inside one read transaction
+    """
+    sample_size = sample_size or schema_sample_size()
+    labels = sorted(tx.run("CALL db.labels() YIELD label RETURN label").value())
+    types = sorted(tx.run("CALL db.relationshipTypes() YIELD relationshipType RETURN relationshipType").value())
+
+    label_properties = {label: {} for label in labels}
+    type_properties = {rel_type: {} for rel_type in types}
+    patterns = {rel_type: [] for rel_type in types}
+    if labels or types:
+        result = tx.run(_sample_statement(labels, types), {"sample": sample_size, "labels": labels, "types": types})
+        for record in result:
+            if record["kind"] == "label":
+                _merge_types(label_properties[record["name"]], record["properties"])
+                continue
+            _merge_types(type_properties[record["name"]], record["properties"])
+            pattern = f"(:{':'.join(record['start'])})-[:{record['name']}]->(:{':'.join(record['end'])})"
+            if pattern not in patterns[record["name"]] and len(patterns[record["name"]]) < MAX_PATTERNS_PER_TYPE:
+                patterns[record["name"]].append(pattern)
+
+    indexes = [_describe_index(record) for record in tx.run(_SHOW_INDEXES)]
+    constraints = [_describe_index(record) for record in tx.run(_SHOW_CONSTRAINTS)]
+    return {
+        "labels": {label: _format_types(properties) for label, properties in label_properties.items()},
+        "relationship_types": {rel_type: _format_types(properties) for rel_type, properties in type_properties.items()},
+        "patterns": [pattern for rel_type in types for pattern in patterns[rel_type]],
+        "indexes": indexes,
+        "constraints": constraints,
+        "sample_size": sample_size,
+    }
+
+
+def render_schema(schema: dict) -> str:
+    """
+    Compact text form of a schema summary for use in a prompt
+    """
+    def properties(types: dict) -> str:
+        return " {" + ", ".join(f"{key}: {value}" for key, value in types.items()) + "}" if types else ""
+
+    lines = ["Node labels:"]
+    lines += [f"(:{label}{properties(types)})" for label, types in schema["labels"].items()]
+    lines.append("Relationship types:")
+    lines += [f"[:{rel_type}{properties(types)}]" for rel_type, types in schema["relationship_types"].items()]
+    if schema["patterns"]:
+        lines.append("Patterns:")
+        lines += schema["patterns"]
+    if schema["indexes"]:
+        lines.append("Indexes:")
+        lines += schema["indexes"]
+    if schema["constraints"]:
+        lines.append("Constraints:")
+        lines += schema["constraints"]
+    return "\n".join(lines)
+
+
+class _SchemaEntry:
+    __slots__ = ("schema", "text", "names", "created_at", "expires_at")
+
+    def __init__(self, schema, text, created_at, expires_at):
+        self.schema = schema
+        self.text = text
+        self.names = frozenset(schema["labels"]) | frozenset(schema["relationship_types"])
+        self.created_at = created_at
+        self.expires_at = expires_at
+
+
+class SchemaCache:
+    """
+    Per-database schema summaries with a TTL
+
+    Keys are ((uri, database), driver identity). Writes invalidate a scope
+    when their counters show labels, relationship types, indexes or
+    constraints may have changed.
+    """
+
+    def __init__(self, ttl: float | None = None):
+        self.ttl = ttl or env_number("NEO4J_SCHEMA_CACHE_TTL", DEFAULT_TTL, float)
+        self._entries: dict[tuple, _SchemaEntry] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: tuple) -> _SchemaEntry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= time.monotonic():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry
+
+    def put(self, key: tuple, schema: dict) -> _SchemaEntry:
+        now = time.monotonic()
+        entry = _SchemaEntry(schema, render_schema(schema), now, now + self.ttl)
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def invalidate(self, scope: tuple) -> int:
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == scope]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+        return len(stale)
+
+    def invalidate_for_write(self, scope: tuple, query: str, counters) -> int:
+        """
+        Invalidate after a write that may have changed labels or relationship types
+
+        Pure property updates keep the summary. Creations keep it when every
+        label and type the statement names is already known; deletions, label
+        removals and index or constraint changes always invalidate.
+        """
+        if not self._entries or not counters.contains_updates:
+            return 0
+        structural = (
+            counters.nodes_deleted or counters.relationships_deleted or counters.labels_removed
+            or counters.indexes_added or counters.indexes_removed
+            or counters.constraints_added or counters.constraints_removed
+        )
+        if not structural:
+            if not (counters.labels_added or counters.relationships_created):
+                return 0
+            names = pattern_labels(query)
+            with self._lock:
+                entries = [entry for key, entry in self._entries.items() if key[0] == scope]
+            if names is not None and all(names <= entry.names for entry in entries):
+                return 0
+        return self.invalidate(scope)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "invalidations": self.invalidations}
+
+
+_cache: SchemaCache | None = None
+_cache_lock = threading.Lock()
+
+
+def get_schema_cache() -> SchemaCache:
+    """
+    Return the process-wide schema cache, creating it on first use
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SchemaCache()
+    return _cache
@@ -0,0 +1,282 @@
+# 处理器类别
+_PASSTHROUGH = 0
+_CONVERT = 1
+_LIST = 2
+_DICT = 3
+_NODE = 4
+_RELATIONSHIP = 5
+_PATH = 6
+
+_PRIMITIVE_TYPES = (str, int, float, bool, type(None))
+
+
+def _iso_format(value):
+    return value.iso_format()
+
+
+# 类型分派表，由所有序列化器实例共享；Neo4j 的时间与图类型在首次遇到时
+# 由 _resolve 加入，导入本模块时不加载 neo4j
+_DISPATCH: dict[type, tuple[int, object]] = {
+    str: (_PASSTHROUGH, None),
+    int: (_PASSTHROUGH, None),
+    float: (_PASSTHROUGH, None),
+    bool: (_PASSTHROUGH, None),
+    type(None): (_PASSTHROUGH, None),
+    list: (_LIST, None),
+    dict: (_DICT, None),
+}
+
+
+def _resolve(value_type: type) -> tuple[int, object]:
+    """
+    Resolve a type missing from the table by its MRO and cache the result
+
+    Neo4j temporal and graph types are resolved here the first time each is
+    seen; relationship types are distinct subclasses per relationship type
+    name, so every name is resolved once.
+    """
+    if issubclass(value_type, _PRIMITIVE_TYPES):
+        handler = _DISPATCH[value_type] = (_PASSTHROUGH, None)
+        return handler
+
+    # 能遇到这些类型时 neo4j 已经加载，这里的导入只是查表
+    from neo4j.graph import Node, Path, Relationship
+    from neo4j.time import Date, DateTime, Duration, Time
+
+    if issubclass(value_type, (DateTime, Date, Time)):
+        handler = (_CONVERT, _iso_format)
+    elif issubclass(value_type, Duration):
+        handler = (_CONVERT, str)
+    elif issubclass(value_type, Node):
+        handler = (_NODE, None)
+    elif issubclass(value_type, Relationship):
+        handler = (_RELATIONSHIP, None)
+    elif issubclass(value_type, Path):
+        handler = (_PATH, None)
+    elif issubclass(value_type, dict):
+        handler = (_DICT, None)
+    elif issubclass(value_type, list):
+        handler = (_LIST, None)
+    else:
+        # 其他类型原样返回
+        handler = (_PASSTHROUGH, None)
+    _DISPATCH[value_type] = handler
+    return handler
+
+
+class Neo4jSerializer:
+    """
+    Convert Neo4j-specific types to JSON-serializable types
+
+    Dispatches on the exact type of each value through a cached table and walks
+    nested lists, dicts, nodes and relationships with an explicit stack instead
+    of recursion. Primitive values and primitive-only lists are returned as-is.
+
+    With ``graph=True`` each node and relationship is encoded once into the
+    ``nodes``/``relationships`` tables keyed by ``element_id`` and values only
+    hold ``{"node": element_id}`` / ``{"relationship": element_id}`` references.
+    Use a fresh instance per invocation in that mode.
+    """
+
+    def __init__(self, graph: bool = False):
+        self.graph = graph
+        # graph 模式下按 element_id 去重的节点与关系表
+        self.nodes: dict[str, dict] = {}
+        self.relationships: dict[str, dict] = {}
+
+    def _is_primitive_list(self, values: list) -> bool:
+        table = _DISPATCH
+        for item in values:
+            handler = table.get(type(item))
+            if handler is None or handler[0] != _PASSTHROUGH:
+                return False
+        return True
+
+    def serialize(self, value):
+        """
+        Serialize a single value
+        """
+        table = _DISPATCH
+        kind, convert = table.get(type(value)) or _resolve(type(value))
+        if kind == _PASSTHROUGH:
+            return value
+        if kind == _CONVERT:
+            return convert(value)
+
+        root = [None]
+        stack = [(value, root, 0)]
+        while stack:
+            source, target, slot = stack.pop()
+            kind, convert = table.get(type(source)) or _resolve(type(source))
+
+            if kind == _PASSTHROUGH:
+                target[slot] = source
+            elif kind == _CONVERT:
+                target[slot] = convert(source)
+            elif kind == _LIST:
+                if self._is_primitive_list(source):
+                    target[slot] = source
+                    continue
+                items = list(source)
+                target[slot] = items
+                pending = []
+                for index, item in enumerate(items):
+                    handler = table.get(type(item)) or _resolve(type(item))
+                    if handler[0] == _CONVERT:
+                        items[index] = handler[1](item)
+                    elif handler[0] != _PASSTHROUGH:
+                        pending.append((item, items, index))
+                # 逆序入栈，使嵌套值按原顺序处理
+                stack.extend(reversed(pending))
+            elif kind == _PATH:
+                path_nodes = [None] * len(source.nodes)
+                path_relationships = [None] * len(source.relationships)
+                target[slot] = {"nodes": path_nodes, "relationships": path_relationships}
+                pending = [(node, path_nodes, index) for index, node in enumerate(source.nodes)]
+                pending.extend(
+                    (relationship, path_relationships, index)
+                    for index, relationship in enumerate(source.relationships)
+                )
+                stack.extend(reversed(pending))
+            else:
+                if kind == _DICT:
+                    entries = source.items()
+                    properties = target[slot] = {}
+                elif self.graph:
+                    entries, properties = self._encode_graph_entity(kind, source, target, slot)
+                elif kind == _NODE:
+                    entries = source.items()
+                    properties = {}
+                    target[slot] = {
+                        "id": source.id,
+                        "labels": list(source.labels),
+                        "properties": properties,
+                    }
+                else:
+                    entries = source.items()
+                    properties = {}
+                    start_node = source.start_node
+                    end_node = source.end_node
+                    target[slot] = {
+                        "id": source.id,
+                        "type": source.type,
+                        "start_node": start_node.id if start_node is not None else None,
+                        "end_node": end_node.id if end_node is not None else None,
+                        "properties": properties,
+                    }
+                pending = []
+                for key, item in entries:
+                    handler = table.get(type(item)) or _resolve(type(item))
+                    if handler[0] == _PASSTHROUGH:
+                        properties[key] = item
+                    elif handler[0] == _CONVERT:
+                        properties[key] = handler[1](item)
+                    else:
+                        # 先占位以保持键的顺序
+                        properties[key] = None
+                        pending.append((item, properties, key))
+                if pending:
+                    stack.extend(reversed(pending))
+        return root[0]
+
+    def _encode_graph_entity(self, kind: int, source, target, slot):
+        """
+        Write a reference into the target and register the entity once
+
+        Returns the property entries still to be walked, which are empty when
+        the entity has already been encoded during this invocation.
+        """
+        element_id = source.element_id
+        if kind == _NODE:
+            target[slot] = {"node": element_id}
+            if element_id in self.nodes:
+                return (), None
+            properties = {}
+            self.nodes[element_id] = {"labels": list(source.labels), "properties": properties}
+        else:
+            target[slot] = {"relationship": element_id}
+            if element_id in self.relationships:
+                return (), None
+            properties = {}
+            start_node = source.start_node
+            end_node = source.end_node
+            self.relationships[element_id] = {
+                "type": source.type,
+                "start_node": start_node.element_id if start_node is not None else None,
+                "end_node": end_node.element_id if end_node is not None else None,
+                "properties": properties,
+            }
+        return source.items(), properties
+
+    def reset(self) -> None:
+        """
+        Forget entities encoded so far (e.g. before a transaction retry)
+        """
+        self.nodes = {}
+        self.relationships = {}
+
+    def graph_tables(self) -> dict:
+        """
+        Return the deduplicated node and relationship tables
+        """
+        return {"nodes": self.nodes, "relationships": self.relationships}
+
+    def serialize_record(self, record) -> dict:
+        """
+        Serialize a driver record straight from ``record.items()``
+        """
+        table = _DISPATCH
+        serialized = {}
+        for key, value in record.items():
+            handler = table.get(type(value)) or _resolve(type(value))
+            if handler[0] == _PASSTHROUGH:
+                serialized[key] = value
+            elif handler[0] == _CONVERT:
+                serialized[key] = handler[1](value)
+            else:
+                serialized[key] = self.serialize(value)
+        return serialized
+
+    def serialize_row(self, record) -> list:
+        """
+        Serialize a driver record into a positional row for columnar output
+        """
+        table = _DISPATCH
+        row = list(record)
+        for index, value in enumerate(row):
+            handler = table.get(type(value)) or _resolve(type(value))
+            if handler[0] == _CONVERT:
+                row[index] = handler[1](value)
+            elif handler[0] != _PASSTHROUGH:
+                row[index] = self.serialize(value)
+        return row
+
+
+def dictionary_encode(columns: list, rows: list[list]) -> dict[str, list]:
+    """
+    Dictionary-encode string columns that contain repeated values
+
+    Only columns whose values are all strings (or null) are encoded, so an
+    integer in an encoded column is always an index into its dictionary.
+    Rows are rewritten in place; returns ``{column: [distinct values]}``.
+    """
+    dictionaries = {}
+    for index, column in enumerate(columns):
+        values = [row[index] for row in rows]
+        non_null = [value for value in values if value is not None]
+        if not non_null or not all(type(value) is str for value in non_null):
+            continue
+        distinct = dict.fromkeys(non_null)
+        if len(distinct) == len(non_null):
+            continue
+        positions = {value: position for position, value in enumerate(distinct)}
+        for row in rows:
+            value = row[index]
+            if value is not None:
+                row[index] = positions[value]
+        dictionaries[column] = list(distinct)
+    return dictionaries
+
+
+# 进程级共享实例，类型分派表在多次调用间复用
+default_serializer = Neo4jSerializer()
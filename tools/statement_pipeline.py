@@ -0,0 +1,165 @@
+import json
+
+from tools.batch_writer import COUNTER_FIELDS
+
+READ_OPERATIONS = ("query",)
+WRITE_OPERATIONS = ("create", "update", "delete", "write")
+
+
+def parse_statements(raw) -> list[dict]:
+    """
+    Parse the ordered statement list: ``[{query, parameters, operation}, ...]``
+    """
+    if isinstance(raw, list):
+        items = raw
+    else:
+        if raw is None or not str(raw).strip():
+            raise ValueError("statements must be a non-empty JSON array")
+        try:
+            items = json.loads(raw)
+        except ValueError as e:
+            raise ValueError(f"statements is not valid JSON: {e}")
+    if not isinstance(items, list) or not items:
+        raise ValueError("statements must be a non-empty JSON array")
+
+    statements = []
+    for index, item in enumerate(items):
+        if isinstance(item, str):
+            item = {"query": item}
+        if not isinstance(item, dict) or not str(item.get("query") or "").strip():
+            raise ValueError(f"statements[{index}] must be an object with a query")
+        operation = str(item.get("operation") or "query").lower()
+        if operation not in READ_OPERATIONS + WRITE_OPERATIONS:
+            raise ValueError(f"statements[{index}] has invalid operation '{operation}'")
+        parameters = item.get("parameters") or {}
+        if not isinstance(parameters, dict):
+            raise ValueError(f"statements[{index}].parameters must be a JSON object")
+        statements.append({
+            "index": index,
+            "query": item["query"].strip(),
+            "parameters": parameters,
+            "operation": operation,
+        })
+    return statements
+
+
+def group_statements(statements: list[dict]) -> list[tuple[bool, list[dict]]]:
+    """
+    Group consecutive statements by access mode: ``[(is_write, [statements])]``
+    """
+    groups = []
+    for statement in statements:
+        is_write = statement["operation"] in WRITE_OPERATIONS
+        if groups and groups[-1][0] == is_write:
+            groups[-1][1].append(statement)
+        else:
+            groups.append((is_write, [statement]))
+    return groups
+
+
+def counters_to_dict(counters) -> dict:
+    return {field: getattr(counters, field) for field in COUNTER_FIELDS}
+
+
+class StatementPipeline:
+    """
+    Run an ordered list of statements in one session
+
+    Consecutive writes share one write transaction and consecutive reads one
+    read transaction. When a statement fails its transaction is rolled back;
+    with ``stop_on_error`` the remaining statements are skipped, otherwise the
+    group is re-run without the failed statement and execution continues.
+    A failure at commit cannot be pinned on one statement, so it is reported
+    against every statement of the group and the group is not re-run.
+    """
+
+    def __init__(self, statements: list[dict], collect_rows, stop_on_error: bool = True, on_write=None):
+        # collect_rows(result) -> dict，负责序列化单条语句的结果
+        self.statements = statements
+        self.collect_rows = collect_rows
+        self.stop_on_error = stop_on_error
+        self.on_write = on_write
+        self.outcomes: dict[int, dict] = {}
+        self.transactions = 0
+
+    def _run_group(self, tx, group: list[dict], position: list[int]) -> list[dict]:
+        outcomes = []
+        for offset, statement in enumerate(group):
+            position[0] = offset
+            result = tx.run(statement["query"], statement["parameters"])
+            outcome = self.collect_rows(result)
+            summary = result.consume()
+            outcome.update({
+                "index": statement["index"],
+                "operation": statement["operation"],
+                "status": "success",
+                "query_type": summary.query_type,
+                "server": str(summary.server.address) if summary.server.address else None,
+                "counters": counters_to_dict(summary.counters),
+            })
+            outcomes.append((outcome, summary))
+        # 所有语句都已执行完，之后的错误来自提交
+        position[0] = len(group)
+        return outcomes
+
+    def run(self, session) -> bool:
+        """
+        Execute every group; returns False if any statement failed
+        """
+        from neo4j.exceptions import Neo4jError
+
+        failed = False
+        for is_write, group in group_statements(self.statements):
+            pending = list(group)
+            while pending:
+                position = [0]
+                execute = session.execute_write if is_write else session.execute_read
+                self.transactions += 1
+                try:
+                    outcomes = execute(self._run_group, pending, position)
+                except Neo4jError as e:
+                    failed = True
+                    error = {"code": e.code, "message": e.message}
+                    if position[0] >= len(pending):
+                        # 提交失败：整组回滚，无法归咎于某一条语句
+                        for statement in pending:
+                            self._record_error(statement, error, "commit")
+                        if self.stop_on_error:
+                            self._mark_remaining(self.statements, "skipped")
+                            return False
+                        pending = []
+                        continue
+                    self._record_error(pending[position[0]], error, "run")
+                    if self.stop_on_error:
+                        self._mark_remaining(pending[:position[0]], "rolled_back")
+                        self._mark_remaining(self.statements, "skipped")
+                        return False
+                    pending = pending[:position[0]] + pending[position[0] + 1:]
+                    continue
+                for outcome, summary in outcomes:
+                    self.outcomes[outcome["index"]] = outcome
+                    if is_write and self.on_write is not None:
+                        self.on_write(self.statements[outcome["index"]]["query"], summary)
+                pending = []
+        return not failed
+
+    def _record_error(self, statement: dict, error: dict, phase: str) -> None:
+        self.outcomes[statement["index"]] = {
+            "index": statement["index"],
+            "operation": statement["operation"],
+            "status": "error",
+            "phase": phase,
+            "error": error,
+        }
+
+    def _mark_remaining(self, statements: list[dict], status: str) -> None:
+        for statement in statements:
+            if statement["index"] not in self.outcomes:
+                self.outcomes[statement["index"]] = {
+                    "index": statement["index"],
+                    "operation": statement["operation"],
+                    "status": status,
+                }
+
+    def results(self) -> list[dict]:
+        return [self.outcomes[statement["index"]] for statement in self.statements if statement["index"] in self.outcomes]